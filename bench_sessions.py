@@ -0,0 +1,136 @@
+"""Measure session memory: bytes per ConversationMemory at scale.
+
+    python bench_sessions.py [--sessions 1000000] [--turns 8] [--baseline-sessions 20000]
+
+Builds --sessions sessions, each after --turns exchanges drawn from realistic
+questions and graph topics, and reports traced heap bytes per session (the
+memory object alone, and with its `sessions` entry and id key) plus the
+JSON size stored in Redis. The previous dict-based layout (full reply text,
+message dicts, datetimes, sets) is measured on --baseline-sessions and scaled,
+since a million of those doesn't fit in a small machine.
+"""
+import argparse
+import gc
+import json
+import random
+import time
+import tracemalloc
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+
+from fishing_chatbot import ConversationMemory
+
+QUESTIONS = [
+    "when is the best time to catch hilsa", "where can i find catfish", "is murky water good for fishing",
+    "what net should i use for salmon", "why is hilsa scarce this year", "what can i catch this month",
+    "does heavy rain affect fishing", "tell me about current net", "compare hilsa and catfish", "yes",
+]
+TOPICS = ["Hilsa", "Catfish", "Salmon", "Monsoon", "Winter", "Murky Water", "Current Net", "Kurigram"]
+INTENTS = ["season_timing", "location", "water_condition", "gear_equipment", "causes", "calendar",
+           "effects", "general_info", "comparison", "affirmative"]
+REPLY = ("{topic} is best caught during Monsoon. Best conditions: Amavasya, Boisakh.\n\n"
+         "Should I tell you about the best locations?\n\nThat reminds me, you might also want to know about {other}.")
+
+
+class LegacyConversationMemory:
+    """The layout before compaction, for comparison"""
+
+    def __init__(self):
+        self.messages = []
+        self.entities_discussed = set()
+        self.topics_discussed = set()
+        self.current_topic = None
+        self.user_goals = []
+        self.questions_asked = []
+        self.stage = "greeting"
+        self.user_preferences = {}
+        self.last_intent = None
+        self.clarification_needed = False
+        self.offered_topic = None
+
+    def add_message(self, role: str, content: str, intent: str = None):
+        self.messages.append({"role": role, "content": content, "intent": intent, "timestamp": datetime.now()})
+        if len(self.messages) > 10:
+            self.messages = self.messages[-10:]
+
+
+def fresh(text: str) -> str:
+    """A new string object, as a request body or graph result would be"""
+    return "".join(list(text))
+
+
+def converse_compact(memory: ConversationMemory, rng: random.Random, turns: int):
+    for _ in range(turns):
+        k = rng.randrange(len(QUESTIONS))
+        memory.update_stage()
+        memory.discuss(fresh(TOPICS[k % len(TOPICS)]))
+        memory.offered_topic = fresh(TOPICS[(k + 1) % len(TOPICS)])
+        memory.add_turn(fresh(QUESTIONS[k]), INTENTS[k])
+        memory.last_intent = INTENTS[k]
+        memory.add_topic(memory.current_topic)
+
+
+def converse_legacy(memory: LegacyConversationMemory, rng: random.Random, turns: int):
+    for _ in range(turns):
+        k = rng.randrange(len(QUESTIONS))
+        topic, other = fresh(TOPICS[k % len(TOPICS)]), fresh(TOPICS[(k + 1) % len(TOPICS)])
+        memory.current_topic = topic
+        memory.entities_discussed.add(topic)
+        memory.offered_topic = other
+        memory.add_message("user", fresh(QUESTIONS[k]), INTENTS[k])
+        memory.add_message("assistant", REPLY.format(topic=topic, other=other), INTENTS[k])
+        memory.last_intent = INTENTS[k]
+        memory.topics_discussed.add(topic)
+
+
+def encode_compact(memory: ConversationMemory) -> str:
+    """As SessionStore.save writes it"""
+    return json.dumps(memory.to_state(), ensure_ascii=False, separators=(",", ":"))
+
+
+def encode_legacy(memory: LegacyConversationMemory) -> str:
+    return json.dumps(vars(memory), ensure_ascii=False, separators=(",", ":"),
+                      default=lambda value: sorted(value) if isinstance(value, set) else str(value))
+
+
+def measure(factory, converse, encode, count: int, turns: int, seed: int = 7):
+    """(bytes per memory object, bytes per sessions entry including it, mean stored JSON size)"""
+    rng = random.Random(seed)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    memories = []
+    for _ in range(count):
+        memory = factory()
+        converse(memory, rng, turns)
+        memories.append(memory)
+    objects = tracemalloc.get_traced_memory()[0] - before
+    now = time.time()
+    sessions = OrderedDict((str(uuid.uuid4()), (now, memory)) for memory in memories)
+    total = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    list_overhead = 8 * count  # the `memories` list itself isn't part of a session
+    sample = memories[:: max(1, count // 1000)]
+    stored = sum(len(encode(memory).encode()) for memory in sample) / len(sample)
+    del sessions, memories
+    return (objects - list_overhead) / count, (total - list_overhead) / count, stored
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bytes per chat session at scale")
+    parser.add_argument("--sessions", type=int, default=1_000_000)
+    parser.add_argument("--turns", type=int, default=8)
+    parser.add_argument("--baseline-sessions", type=int, default=20_000)
+    args = parser.parse_args()
+
+    rows = [
+        (f"compact x{args.sessions}", args.sessions,
+         measure(ConversationMemory, converse_compact, encode_compact, args.sessions, args.turns)),
+        (f"legacy x{args.baseline_sessions}", args.baseline_sessions,
+         measure(LegacyConversationMemory, converse_legacy, encode_legacy, args.baseline_sessions, args.turns)),
+    ]
+    print(f"{args.turns} turns per session")
+    print(f"{'layout':<22}{'object B':>10}{'+ entry B':>11}{'JSON B':>10}{'at 1M sessions':>16}")
+    for name, _, (objects, total, stored) in rows:
+        print(f"{name:<22}{objects:>10.0f}{total:>11.0f}{stored:>10.0f}{total * 1e6 / 2**20:>13.0f} MiB")
@@ -0,0 +1,105 @@
+"""Build fingerprinted, precompressed frontend assets.
+
+    python build_assets.py [--src static] [--out dist]
+
+Every non-HTML file is copied as name.<hash>.ext (plus its original name), HTML
+references are rewritten to the fingerprinted names, and each text asset gets
+.gz and (when the brotli package is installed) .br siblings. The server serves
+dist/ when it exists, picking the precompressed variant by Accept-Encoding.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import shutil
+
+try:
+    import brotli
+except ImportError:  # Brotli variants are optional; gzip is always built
+    brotli = None
+
+COMPRESSIBLE = (".html", ".css", ".js", ".svg", ".json", ".txt")
+MIN_COMPRESS_SIZE = 256
+HASH_LENGTH = 10
+
+
+def fingerprint(rel_path: str, content: bytes) -> str:
+    """styles.css -> styles.<hash>.css"""
+    digest = hashlib.sha256(content).hexdigest()[:HASH_LENGTH]
+    stem, ext = os.path.splitext(rel_path)
+    return f"{stem}.{digest}{ext}"
+
+
+def compress(path: str):
+    """Write .gz/.br siblings for text assets big enough to benefit"""
+    if not path.endswith(COMPRESSIBLE) or os.path.getsize(path) < MIN_COMPRESS_SIZE:
+        return
+    with open(path, "rb") as f:
+        data = f.read()
+    with open(path + ".gz", "wb") as f:
+        # mtime=0 keeps the output byte-identical across builds
+        f.write(gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        with open(path + ".br", "wb") as f:
+            f.write(brotli.compress(data, quality=11))
+
+
+def rewrite_references(html: str, manifest: dict) -> str:
+    """Point src/href attributes at the fingerprinted names"""
+    for original, hashed in manifest.items():
+        for prefix in ("", "./", "/"):
+            for quote in ('"', "'"):
+                html = html.replace(f"{quote}{prefix}{original}{quote}", f"{quote}{prefix}{hashed}{quote}")
+    return html
+
+
+def build(src: str, out: str) -> dict:
+    if os.path.isdir(out):
+        shutil.rmtree(out)
+
+    manifest = {}
+    html_files = []
+    for root, _, files in os.walk(src):
+        for name in files:
+            full = os.path.join(root, name)
+            rel = os.path.relpath(full, src).replace(os.sep, "/")
+            if name.endswith(".html"):
+                html_files.append(rel)
+                continue
+            with open(full, "rb") as f:
+                content = f.read()
+            hashed = fingerprint(rel, content)
+            manifest[rel] = hashed
+            # Keep the original name too so external links keep working
+            for target in (rel, hashed):
+                dest = os.path.join(out, target)
+                os.makedirs(os.path.dirname(dest), exist_ok=True)
+                with open(dest, "wb") as f:
+                    f.write(content)
+                compress(dest)
+
+    for rel in html_files:
+        with open(os.path.join(src, rel), encoding="utf-8", newline="") as f:
+            html = f.read()
+        dest = os.path.join(out, rel)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        with open(dest, "w", encoding="utf-8", newline="") as f:
+            f.write(rewrite_references(html, manifest))
+        compress(dest)
+
+    with open(os.path.join(out, "asset-manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+if __name__ == "__main__":
+    here = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Fingerprint and precompress frontend assets")
+    parser.add_argument("--src", default=os.path.join(here, "static"))
+    parser.add_argument("--out", default=os.path.join(here, "dist"))
+    args = parser.parse_args()
+
+    manifest = build(args.src, args.out)
+    print(f"Built {len(manifest)} fingerprinted assets into {args.out}"
+          + ("" if brotli else " (brotli not installed: gzip only)"))
@@ -1,1237 +1,4488 @@
-from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse, JSONResponse
-from neo4j import GraphDatabase
-from pydantic import BaseModel
-from typing import List, Dict, Optional, Tuple
-from difflib import SequenceMatcher
-import random
-from datetime import datetime
-from googletrans import Translator
-from fastapi.staticfiles import StaticFiles
-import os
-import glob
-import pymongo
-
-app = FastAPI()
-from fastapi.middleware.cors import CORSMiddleware
-
-MONGODB_URI = os.getenv("MONGODB_URI")  # Loads from Render env var
-client = pymongo.MongoClient(MONGODB_URI)
-db = client["fishermen_chatbot"]
-feedback_collection = db["feedbacks"]
-
-class Feedback(BaseModel):
-    type: str
-    message: str
-    reason: Optional[str] = None
-    comments: Optional[str] = None
-
-@app.post("/feedback")
-async def save_feedback(feedback: Feedback):
-    feedback_dict = feedback.dict()
-    feedback_dict["timestamp"] = datetime.now()
-    feedback_collection.insert_one(feedback_dict)
-    return {"status": "saved"}
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Use "*" for testing; replace with your GitHub Pages URL (e.g., "https://chickensanwich.github.io/Fishermen-chatbot") in production for security
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-# Create directory to store audio responses
-
-
-# Delete old files (older than 5 files)
-
-# Neo4j details
-NEO4J_URI = "neo4j+s://faf9224e.databases.neo4j.io"
-NEO4J_USER = "neo4j"
-NEO4J_PASSWORD = "rXJTlDcO9IOalRVAjZQcwgeFFcIWgmm2oTIdsjc67Ww"
-driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
-
-# Enhanced session management
-sessions = {}
-
-class ChatRequest(BaseModel):
-    message: str
-
-# conversational Enhancments
-
-class ConversationMemory:
-    """Track conversation state and context"""
-    def __init__(self):
-        self.messages = []
-        self.entities_discussed = set()
-        self.topics_discussed = set()
-        self.current_topic = None
-        self.user_goals = []  # Inferred goals
-        self.questions_asked = []
-        self.stage = "greeting"  # greeting, exploring, deep_dive, closing
-        self.user_preferences = {}
-        self.last_intent = None
-        self.clarification_needed = False
-        
-    def add_message(self, role: str, content: str, intent: str = None):
-        self.messages.append({
-            "role": role,
-            "content": content,
-            "intent": intent,
-            "timestamp": datetime.now()
-        })
-        if len(self.messages) > 10:
-            self.messages = self.messages[-10:]  # Keep last 10
-    
-    def update_stage(self):
-        """Update conversation stage based on history"""
-        msg_count = len(self.messages)
-        if msg_count <= 2:
-            self.stage = "greeting"
-        elif msg_count <= 6:
-            self.stage = "exploring"
-        elif msg_count <= 12:
-            self.stage = "deep_dive"
-        else:
-            self.stage = "expert"
-
-class Synonyms:
-    """Handle word variations and synonyms"""
-    
-    SYNONYM_MAP = {
-        "when": ["when", "what time", "timing", "best time", "season", "period"],
-        "where": ["where", "location", "place", "area", "spot", "region", "find"],
-        "catch": ["catch", "fishing", "fish", "get", "find", "harvest", "hunt"],
-        "hilsa": ["hilsa", "ilish", "ilisha", "ilish fish"],
-        "catfish": ["catfish", "cat fish", "magur"],
-        "salmon": ["salmon", "salmon fish"],
-        "season": ["season", "time", "period", "month"],
-        "water": ["water", "river", "stream", "pond", "lake"],
-        "net": ["net", "jal", "nets", "fishing net"],
-        "good": ["good", "best", "ideal", "perfect", "suitable", "right"],
-        "bad": ["bad", "avoid", "not good", "unsuitable", "wrong"],
-        "why": ["why", "reason", "cause", "how come"],
-        "what": ["what", "which", "tell me"],
-        "equipment": ["equipment", "gear", "tools", "stuff", "things"],
-        "cost": ["cost", "price", "money", "expense", "income"],
-        "murky": ["murky", "dirty", "unclear", "muddy", "cloudy"],
-        "clean": ["clean", "clear", "pure", "fresh"]
-    }
-    
-    @staticmethod
-    def normalize(word: str) -> str:
-        """Convert word to canonical form"""
-        word_lower = word.lower().strip()
-        for canonical, variations in Synonyms.SYNONYM_MAP.items():
-            if word_lower in variations:
-                return canonical
-        return word_lower
-    
-    @staticmethod
-    def expand_query(query: str) -> List[str]:
-        """Expand query with synonyms"""
-        words = query.lower().split()
-        expanded = [query]
-        
-        for word in words:
-            normalized = Synonyms.normalize(word)
-            if normalized != word and normalized in Synonyms.SYNONYM_MAP:
-                # Add variation
-                new_query = query.lower().replace(word, normalized)
-                expanded.append(new_query)
-        
-        return expanded
-
-class FuzzyMatcher:
-    """Handle typos and fuzzy matching"""
-    
-    KNOWN_ENTITIES = {
-        "fish": ["hilsa", "catfish", "salmon", "mother fish", "fish fry"],
-        "seasons": ["monsoon", "winter", "summer", "spring", "autumn"],
-        "months": ["boisakh", "joishtho", "falgun"],
-        "locations": ["kurigram", "freshwater", "saltwater"],
-        "conditions": ["murky", "clean", "tide", "current", "amavasya"],
-        "gear": ["net", "darki", "current net", "rod", "tackle"]
-    }
-    
-    @staticmethod
-    def fuzzy_match(word: str, threshold: float = 0.75) -> Tuple[str, str, float]:
-        """Find best fuzzy match for a word"""
-        word_lower = word.lower().strip()
-        best_match = None
-        best_category = None
-        best_score = 0
-        
-        for category, entities in FuzzyMatcher.KNOWN_ENTITIES.items():
-            for entity in entities:
-                # Calculate similarity
-                score = SequenceMatcher(None, word_lower, entity).ratio()
-                
-                # Also check if word is contained in entity or vice versa
-                if word_lower in entity or entity in word_lower:
-                    score = max(score, 0.8)
-                
-                if score > best_score and score >= threshold:
-                    best_match = entity
-                    best_category = category
-                    best_score = score
-        
-        return best_match, best_category, best_score
-    
-    @staticmethod
-    def correct_message(message: str) -> str:
-        """Auto-correct typos in message"""
-        words = message.split()
-        corrected = []
-        
-        for word in words:
-            match, category, score = FuzzyMatcher.fuzzy_match(word, threshold=0.8)
-            if match and score > 0.85:
-                corrected.append(match)
-            else:
-                corrected.append(word)
-        
-        return " ".join(corrected)
-
-class QuestionAnalyzer:
-    """Analyze question structure and type"""
-    
-    @staticmethod
-    def classify_question_type(message: str) -> str:
-        """Determine question type"""
-        msg_lower = message.lower().strip()
-        
-        # Yes/No questions
-        if msg_lower.startswith(("is ", "are ", "can ", "should ", "do ", "does ", "will ")):
-            return "yes_no"
-        
-        # Temporal (when)
-        if msg_lower.startswith(("when ", "what time", "which season", "which month")):
-            return "temporal"
-        
-        # Location (where)
-        if msg_lower.startswith(("where ", "which place", "which location")):
-            return "location"
-        
-        # Reason (why)
-        if msg_lower.startswith(("why ", "how come", "what causes", "what makes")):
-            return "reason"
-        
-        # Method (how)
-        if msg_lower.startswith(("how ", "what way", "what method")):
-            return "method"
-        
-        # Choice (which)
-        if msg_lower.startswith(("which ", "what ", "which one")):
-            return "choice"
-        
-        return "general"
-    
-    @staticmethod
-    def detect_negation(message: str) -> Tuple[bool, List[str]]:
-        """Detect negative questions"""
-        negation_words = ["not", "don't", "dont", "avoid", "shouldn't", "shouldnt", 
-                         "can't", "cant", "never", "no", "bad"]
-        
-        words = message.lower().split()
-        for i, word in enumerate(words):
-            if word in negation_words:
-                context = words[max(0, i-1):min(len(words), i+4)]
-                return True, context
-        
-        return False, []
-    
-    @staticmethod
-    def extract_comparison(message: str) -> Optional[Tuple[str, str]]:
-        """Extract entities being compared"""
-        msg_lower = message.lower()
-        
-        comparison_patterns = [
-            ("vs", "vs"),
-            ("versus", "versus"),
-            ("or", "or"),
-            ("and", "and"),
-            ("between", "between")
-        ]
-        
-        for pattern, sep in comparison_patterns:
-            if pattern in msg_lower:
-                parts = msg_lower.split(pattern)
-                if len(parts) >= 2:
-                    return parts[0].strip(), parts[1].strip()
-        
-        return None
-
-class ResponseGenerator:
-    """Generate natural, varied responses"""
-    
-    # Response templates with personality
-    TEMPLATES = {
-        "greeting": [
-            "Hello! I'm your fishing expert. {capability} What would you like to know?",
-            "Hi there! Great to see you. {capability} How can I help you today?",
-            "Hey! {capability} I'm here to help with all your fishing questions!",
-        ],
-        "season_answer": [
-            "Perfect timing question! {fish} is best caught during {season}. {extra}",
-            "Great! For {fish}, the ideal season is {season}. {extra}",
-            "You'll have the best luck with {fish} in {season}. {extra}",
-            "{season} is when {fish} is most abundant and active. {extra}"
-        ],
-        "location_answer": [
-            "{fish} can be found in {location} environments. {extra}",
-            "You'll find {fish} in {location} areas. {extra}",
-            "Look for {fish} in {location} waters. {extra}"
-        ],
-        "acknowledgment": [
-            "Great question!",
-            "That's a smart question!",
-            "Excellent!",
-            "I'm glad you asked!",
-            "Good thinking!"
-        ],
-        "follow_up": [
-            "Would you like to know more about {topic}?",
-            "Want to explore {topic} further?",
-            "Interested in learning about {topic}?",
-            "Should I tell you about {topic}?",
-            "Curious about {topic}?"
-        ],
-        "clarification": [
-            "Just to clarify, are you asking about {option}?",
-            "I found information on a few topics. Did you mean {option}?",
-            "To make sure I help you right, are you interested in {option}?"
-        ],
-        "no_data": [
-            "I don't have specific data on that, but I can tell you about {alternative}!",
-            "That's not in my knowledge base yet, but I know about {alternative}!",
-            "I wish I had that info! But I can help with {alternative}."
-        ],
-        "affirmative_response": [
-            "Perfect! Let me share more details.",
-            "Great! Here's what I know:",
-            "Absolutely! Here you go:",
-            "Sure thing! Let me explain:"
-        ],
-        "transition": [
-            "Speaking of {topic},",
-            "That reminds me,",
-            "Interestingly,",
-            "By the way,",
-            "Also worth noting,"
-        ]
-    }
-    
-    @staticmethod
-    def pick_template(template_type: str, **kwargs) -> str:
-        """Pick random template and format it"""
-        if template_type not in ResponseGenerator.TEMPLATES:
-            return ""
-        
-        templates = ResponseGenerator.TEMPLATES[template_type]
-        template = random.choice(templates)
-        
-        try:
-            return template.format(**kwargs)
-        except KeyError:
-            return template
-    
-    @staticmethod
-    def add_personality(response: str, stage: str) -> str:
-        """Add personality based on conversation stage"""
-        # Add enthusiasm in early stages
-        if stage in ["greeting", "exploring"]:
-            if random.random() < 0.3:  # 30% chance
-                enthusiasm = random.choice(["Great! ", "Awesome! ", "Nice! "])
-                response = enthusiasm + response
-        
-        # Add expert touch in deep stages
-        if stage == "expert":
-            if random.random() < 0.2:  # 20% chance
-                expert = random.choice([
-                    "Based on my knowledge, ",
-                    "From experience, ",
-                    "Here's what I know: "
-                ])
-                response = expert + response
-        
-        return response
-
-class KnowledgeGraph:
-    """Enhanced knowledge retrieval"""
-    
-    @staticmethod
-    def get_comprehensive_info(entity_name: str) -> Dict:
-        """Get all information about an entity"""
-        cypher = """
-        MATCH (e)
-        WHERE toLower(e.name) CONTAINS toLower($entity)
-        OPTIONAL MATCH (e)-[r]->(target)
-        OPTIONAL MATCH (e)<-[r2]-(source)
-        RETURN e.name AS entity, 
-               labels(e) AS entity_labels,
-               type(r) AS outgoing_relation, 
-               target.name AS target_name,
-               labels(target) AS target_labels,
-               type(r2) AS incoming_relation,
-               source.name AS source_name,
-               labels(source) AS source_labels
-        LIMIT 50
-        """
-        
-        with driver.session() as session:
-            results = session.run(cypher, entity=entity_name)
-            data = {
-                "entity": None,
-                "labels": [],
-                "outgoing": [],
-                "incoming": []
-            }
-            
-            for record in results:
-                if not data["entity"]:
-                    data["entity"] = record["entity"]
-                    data["labels"] = record["entity_labels"] or []
-                
-                if record["outgoing_relation"] and record["target_name"]:
-                    data["outgoing"].append({
-                        "relation": record["outgoing_relation"],
-                        "target": record["target_name"],
-                        "labels": record["target_labels"] or []
-                    })
-                
-                if record["incoming_relation"] and record["source_name"]:
-                    data["incoming"].append({
-                        "relation": record["incoming_relation"],
-                        "source": record["source_name"],
-                        "labels": record["source_labels"] or []
-                    })
-            
-            return data
-    
-    @staticmethod
-    def get_suggestions(current_entity: str, discussed_topics: set) -> List[str]:
-        """Get related topics user might be interested in"""
-        info = KnowledgeGraph.get_comprehensive_info(current_entity)
-        suggestions = []
-        
-        # Get related entities
-        for rel in info["outgoing"]:
-            topic = rel["target"]
-            if topic not in discussed_topics and topic != current_entity:
-                suggestions.append(topic)
-        
-        for rel in info["incoming"]:
-            topic = rel["source"]
-            if topic not in discussed_topics and topic != current_entity:
-                suggestions.append(topic)
-        
-        return suggestions[:3]  # Top 3 suggestions
-
-class SmartIntentClassifier:
-    """Enhanced intent classification"""
-    
-    @staticmethod
-    def classify(message: str, entities: Dict, memory: ConversationMemory) -> str:
-        """Classify intent with context"""
-        msg_lower = message.lower().strip()
-        question_type = QuestionAnalyzer.classify_question_type(message)
-        is_negative, neg_context = QuestionAnalyzer.detect_negation(message)
-        
-        # Short responses
-        if msg_lower in ["yes", "yeah", "yep", "sure", "ok", "okay", "y", "ha", "haan", "please"]:
-            return "affirmative"
-        if msg_lower in ["no", "nope", "nah", "na", "not really"]:
-            return "negative"
-        if msg_lower in ["hi", "hello", "hey", "namaste", "good morning", "good evening", "greetings"]:
-            return "greeting"
-        if msg_lower in ["bye", "goodbye", "see you", "thanks", "thank you", "bye bye"]:
-            return "goodbye"
-        
-        # Question type based classification
-        if question_type == "temporal":
-            return "season_timing"
-        elif question_type == "location":
-            return "location"
-        elif question_type == "reason":
-            return "causes"
-        elif question_type == "method":
-            return "advice"
-        elif question_type == "yes_no":
-            if is_negative:
-                return "suitability"
-            return "suitability"
-        
-        # Entity-based classification
-        if entities.get("water_quality"):
-            return "water_condition"
-        if entities.get("gear") and entities.get("fish"):
-            return "gear_equipment"
-        if entities.get("economic"):
-            return "economic"
-        
-        # Comparison detection
-        if QuestionAnalyzer.extract_comparison(message):
-            return "comparison"
-        
-        # Pattern matching
-        patterns = {
-            "gear_equipment": ["net", "gear", "equipment", "use", "tackle", "rod"],
-            "water_condition": ["murky", "clean", "water quality", "dirty"],
-            "weather_condition": ["weather", "tide", "current", "wind", "rain"],
-            "causes": ["why", "cause", "reason", "because"],
-            "effects": ["effect", "happen", "result", "consequence"],
-            "suitability": ["suitable", "good", "bad", "should", "can i"],
-            "advice": ["recommend", "suggest", "tip", "best", "how to"],
-            "comparison": ["compare", "difference", "versus", "vs", "better"]
-        }
-        
-        for intent, keywords in patterns.items():
-            if any(kw in msg_lower for kw in keywords):
-                return intent
-        
-        return "general_info"
-
-class ConversationalResponseBuilder:
-    """Build context-aware conversational responses"""
-    
-    @staticmethod
-    def build_response(intent: str, entities: Dict, memory: ConversationMemory, 
-                      message: str) -> str:
-        """Build intelligent, context-aware response"""
-        
-        # Update memory
-        memory.update_stage()
-        
-        # Get primary entity
-        primary_entity = ConversationalResponseBuilder._get_primary_entity(
-            entities, memory)
-        
-        # Route to handlers
-        handlers = {
-            "greeting": ConversationalResponseBuilder._handle_greeting,
-            "goodbye": ConversationalResponseBuilder._handle_goodbye,
-            "affirmative": ConversationalResponseBuilder._handle_affirmative,
-            "negative": ConversationalResponseBuilder._handle_negative,
-            "season_timing": ConversationalResponseBuilder._handle_season,
-            "location": ConversationalResponseBuilder._handle_location,
-            "water_condition": ConversationalResponseBuilder._handle_water_condition,
-            "weather_condition": ConversationalResponseBuilder._handle_weather,
-            "gear_equipment": ConversationalResponseBuilder._handle_gear,
-            "causes": ConversationalResponseBuilder._handle_causes,
-            "effects": ConversationalResponseBuilder._handle_effects,
-            "suitability": ConversationalResponseBuilder._handle_suitability,
-            "economic": ConversationalResponseBuilder._handle_economic,
-            "comparison": ConversationalResponseBuilder._handle_comparison,
-            "advice": ConversationalResponseBuilder._handle_advice,
-            "general_info": ConversationalResponseBuilder._handle_general
-        }
-        
-        handler = handlers.get(intent, ConversationalResponseBuilder._handle_general)
-        response = handler(primary_entity, entities, memory, message)
-        
-        # Add personality
-        response = ResponseGenerator.add_personality(response, memory.stage)
-        
-        # Add proactive suggestions based on stage
-        if memory.stage in ["exploring", "deep_dive"]:
-            response = ConversationalResponseBuilder._add_suggestions(
-                response, primary_entity, memory)
-        
-        return response
-    
-    @staticmethod
-    def _get_primary_entity(entities: Dict, memory: ConversationMemory) -> str:
-        """Get primary entity from message or context"""
-        # Priority order
-        for key in ["fish", "conditions", "water_quality", "gear", "locations", "months", "seasons"]:
-            if entities.get(key):
-                entity = entities[key][0]
-                memory.current_topic = entity
-                memory.entities_discussed.add(entity)
-                return entity
-        
-        # Fall back to memory
-        if memory.current_topic:
-            return memory.current_topic
-        
-        return None
-    
-    @staticmethod
-    def _handle_greeting(entity, entities, memory, message):
-        capability = "I specialize in fishing - fish species, seasons, locations, water conditions, and equipment."
-        greeting = ResponseGenerator.pick_template("greeting", capability=capability)
-        memory.stage = "greeting"
-        return greeting
-    
-    @staticmethod
-    def _handle_goodbye(entity, entities, memory, message):
-        farewells = [
-            "Happy fishing!Feel free to come back anytime with more questions.",
-            "Good luck with your fishing!Hope to chat again soon.",
-            "Tight lines!Come back if you need more fishing wisdom.",
-            "May your nets be full!See you next time."
-        ]
-        return random.choice(farewells)
-    
-    @staticmethod
-    def _handle_affirmative(entity, entities, memory, message):
-        if not entity:
-            return "Great! What would you like to know more about?"
-        
-        intro = ResponseGenerator.pick_template("affirmative_response")
-        info = KnowledgeGraph.get_comprehensive_info(entity)
-        
-        if not info["entity"]:
-            return f"{intro} Actually, let me know what specific aspect interests you!"
-        
-        response = f"{intro}\n\n"
-        response += ConversationalResponseBuilder._build_comprehensive_info(info)
-        
-        return response
-    
-    @staticmethod
-    def _handle_negative(entity, entities, memory, message):
-        responses = [
-            "No problem! What else would you like to know about fishing?",
-            "That's okay! Feel free to ask me anything else about fishing.",
-            "Sure thing! Is there something else I can help you with?"
-        ]
-        return random.choice(responses)
-    
-    @staticmethod
-    def _handle_season(entity, entities, memory, message):
-        if not entity:
-            return "I'd love to help with timing! Which fish are you interested in - Hilsa, Catfish, or Salmon?"
-        
-        info = KnowledgeGraph.get_comprehensive_info(entity)
-        
-        if not info["entity"]:
-            return f"I don't have timing information for '{entity}'. Try asking about Hilsa, Catfish, or Salmon!"
-        
-        # Get season data
-        seasons = [r["target"] for r in info["outgoing"] if r["relation"] == "SEASONALLY_AVAILABLE_IN"]
-        catch_in = [r["target"] for r in info["outgoing"] if r["relation"] == "CATCH_IN"]
-        
-        if seasons:
-            extra = ""
-            if catch_in:
-                extra = f"Best conditions: {', '.join(catch_in[:2])}."
-            
-            response = ResponseGenerator.pick_template(
-                "season_answer",
-                fish=info["entity"],
-                season=", ".join(seasons),
-                extra=extra
-            )
-        else:
-            response = f"I don't have specific season data for {info['entity']}, but I can tell you about locations or conditions!"
-        
-        # Add follow-up
-        follow_up = ResponseGenerator.pick_template("follow_up", topic="the best locations")
-        response += f"\n\n{follow_up}"
-        
-        return response
-    
-    @staticmethod
-    def _handle_location(entity, entities, memory, message):
-        if not entity:
-            return "Which fish are you looking to find? Hilsa, Catfish, or Salmon?"
-        
-        info = KnowledgeGraph.get_comprehensive_info(entity)
-        
-        if not info["entity"]:
-            return f"I don't have location info for '{entity}'."
-        
-        found_in = [r["target"] for r in info["outgoing"] if r["relation"] == "FOUND_IN"]
-        available_in = [r["target"] for r in info["outgoing"] if r["relation"] == "AVAILABLE_IN"]
-        
-        if found_in or available_in:
-            location = ", ".join(found_in + available_in)
-            extra = ""
-            if "Freshwater" in location:
-                extra = "Look in rivers, streams, and lakes."
-            elif "Saltwater" in location:
-                extra = "Found in coastal and estuarine areas."
-            
-            response = ResponseGenerator.pick_template(
-                "location_answer",
-                fish=info["entity"],
-                location=location,
-                extra=extra
-            )
-        else:
-            response = f"Location data not available for {info['entity']}, but I can help with seasons or conditions!"
-        
-        # Add follow-up
-        follow_up = ResponseGenerator.pick_template("follow_up", topic="water conditions")
-        response += f"\n\n{follow_up}"
-        
-        return response
-    
-    @staticmethod
-    def _handle_water_condition(entity, entities, memory, message):
-        # Check for murky water specifically
-        if any("murky" in e for e in entities.get("water_quality", [])):
-            return ConversationalResponseBuilder._murky_water_analysis()
-        
-        info = KnowledgeGraph.get_comprehensive_info(entity)
-        
-        response = f"Water Condition: {entity.title() if entity else 'General'}\n\n"
-        
-        # Get causes
-        causes = [r["target"] for r in info["outgoing"] if r["relation"] == "CAUSED_BY"]
-        if causes:
-            response += "What causes it:\n"
-            for cause in causes[:4]:
-                response += f"  • {cause}\n"
-            response += "\n"
-        
-        # Get suitability
-        suitable = [r["target"] for r in info["outgoing"] if r["relation"] == "SUITABLE_FOR"]
-        not_suitable = [r["target"] for r in info["outgoing"] if r["relation"] == "NOT_SUITABLE_FOR"]
-        
-        if suitable:
-            response += f"Good for: {', '.join(suitable)}\n"
-        if not_suitable:
-            response += f"Not good for: {', '.join(not_suitable)}\n"
-        
-        response += "\n Tip: Always check water conditions before heading out!"
-        
-        return response
-    
-    @staticmethod
-    def _murky_water_analysis():
-        info = KnowledgeGraph.get_comprehensive_info("Murky Water")
-        
-        response = "About Murky Water\n\n"
-        
-        causes = [r["target"] for r in info["outgoing"] if r["relation"] == "CAUSED_BY"]
-        if causes:
-            response += "Common Causes:\n"
-            for i, cause in enumerate(causes, 1):
-                response += f"{i}. {cause}\n"
-            response += "\n"
-        
-        response += "Impact on Fishing:\n"
-        response += "Murky water makes fishing very difficult\n"
-        response += "Fish can't see bait/nets properly\n"
-        response += "Not suitable for fish catching\n\n"
-        
-        response += "Recommendation: Wait for clean, stable water for better results!"
-        
-        return response
-    
-    @staticmethod
-    def _handle_weather(entity, entities, memory, message):
-        info = KnowledgeGraph.get_comprehensive_info(entity)
-        
-        response = f"Condition: {entity.title() if entity else 'Weather'}\n\n"
-        
-        suitable = [r["target"] for r in info["outgoing"] if r["relation"] == "SUITABLE_FOR"]
-        not_suitable = [r["target"] for r in info["outgoing"] if r["relation"] == "NOT_SUITABLE_FOR"]
-        
-        if suitable:
-            response += f"Good for: {', '.join(suitable)}\n"
-        if not_suitable:
-            response += f"Avoid for: {', '.join(not_suitable)}\n"
-        
-        # Special cases
-        if entity and "current" in entity.lower():
-            response += "\n Warning: Strong currents can be dangerous - nets may overturn!"
-        elif entity and "amavasya" in entity.lower():
-            response += "\n Special Note: Amavasya (new moon) is great for Hilsa fishing!"
-        
-        return response
-    
-    @staticmethod
-    def _handle_gear(entity, entities, memory, message):
-        fish_mentions = entities.get("fish", [])
-        gear_mentions = entities.get("gear", [])
-        
-        # Check for harmful gear
-        if any(g in ["current net", "darki"] for g in gear_mentions):
-            return ConversationalResponseBuilder._harmful_gear_warning()
-        
-        # Asking about net for specific fish
-        if fish_mentions:
-            fish_name = fish_mentions[0].title()
-            
-            response = f"Equipment for {fish_name}\n\n"
-            
-            # Check knowledge graph
-            info = KnowledgeGraph.get_comprehensive_info(fish_mentions[0])
-            requires = [r["target"] for r in info["outgoing"] if r["relation"] == "REQUIRES"]
-            
-            if requires:
-                response += f"Recommended: {', '.join(requires)}\n\n"
-            else:
-                response += "General Guidelines:\n"
-                response += "  • Use traditional fishing nets with appropriate mesh size\n"
-                response += "  • Avoid Current Nets (Darki) - harmful to fish populations\n"
-                response += "  • Match your gear to water type (fresh/salt)\n"
-                response += "  • Allow young fish to escape and grow\n\n"
-            
-            response += " Want to know the best season or location too?"
-            return response
-        
-        return "What kind of equipment are you interested in? Nets, rods, or gear for a specific fish?"
-    
-    @staticmethod
-    def _harmful_gear_warning():
-        return """ Important Warning: Current Nets (Darki)
-
- These nets are HARMFUL and should be avoided!
-
- Why they're problematic:
-  • Catch mother fish and young fry indiscriminately
-  • Damage fish populations long-term
-  • Can overturn in strong currents
-  • Not sustainable for fishing communities
-
-    Better Alternative: Use traditional, selective nets that:
-    Allow young fish to escape
-    Target adult fish appropriately
-    Support sustainable fishing
-
-Want to know about better fishing practices?"""
-    
-    @staticmethod
-    def _handle_causes(entity, entities, memory, message):
-        if not entity:
-            return "What would you like to know the cause of? Water conditions, seasonal changes, or something else?"
-        
-        info = KnowledgeGraph.get_comprehensive_info(entity)
-        
-        causes = [r["target"] for r in info["outgoing"] if r["relation"] == "CAUSED_BY"]
-        
-        if causes:
-            response = f"What Causes {entity.title()}?\n\n"
-            for i, cause in enumerate(causes, 1):
-                response += f"{i}. {cause}\n"
-            
-            response += "\n Understanding causes helps you plan better fishing trips!"
-            return response
-        
-        return f"I don't have specific cause information for {entity}, but I can tell you about its effects or how it impacts fishing!"
-    
-    @staticmethod
-    def _handle_effects(entity, entities, memory, message):
-        if not entity:
-            return "What effects are you curious about? I can explain impacts of weather, water conditions, or equipment."
-        
-        info = KnowledgeGraph.get_comprehensive_info(entity)
-        
-        response = f"Effects of {entity.title()}\n\n"
-        
-        # Direct effects
-        effects = [r["target"] for r in info["outgoing"] if r["relation"] == "CAUSES"]
-        if effects:
-            response += "Direct Effects:\n"
-            for effect in effects:
-                response += f"  • {effect}\n"
-            response += "\n"
-        
-        # What it's not suitable for
-        not_suitable = [r["target"] for r in info["outgoing"] if r["relation"] == "NOT_SUITABLE_FOR"]
-        if not_suitable:
-            response += "Negative Impact:\n"
-            for item in not_suitable:
-                response += f"   {item}\n"
-            response += "\n"
-        
-        if not effects and not not_suitable:
-            response += "I don't have specific effect data, but I can tell you about causes or suitability!\n"
-        
-        response += "\n Knowing effects helps you avoid bad conditions!"
-        return response
-    
-    @staticmethod
-    def _handle_suitability(entity, entities, memory, message):
-        is_negative, _ = QuestionAnalyzer.detect_negation(message)
-        
-        if not entity:
-            return "What are you checking suitability for? A fish, season, water condition, or equipment?"
-        
-        info = KnowledgeGraph.get_comprehensive_info(entity)
-        
-        response = f"Suitability: {entity.title()}\n\n"
-        
-        suitable = [r["target"] for r in info["outgoing"] if r["relation"] == "SUITABLE_FOR"]
-        not_suitable = [r["target"] for r in info["outgoing"] if r["relation"] == "NOT_SUITABLE_FOR"]
-        
-        if suitable:
-            response += "GOOD FOR:\n"
-            for item in suitable:
-                response += f"  • {item}\n"
-            response += "\n"
-        
-        if not_suitable:
-            response += "NOT GOOD FOR:\n"
-            for item in not_suitable:
-                response += f"  • {item}\n"
-            response += "\n"
-        
-        # Add recommendation based on results
-        if is_negative and not_suitable:
-            response += f"You're right to avoid {entity} for those activities!"
-        elif suitable:
-            response += f"{entity.title()} is a good choice for these activities!"
-        else:
-            response += "Plan your activities based on suitable conditions!"
-        
-        return response
-    
-    @staticmethod
-    def _handle_economic(entity, entities, memory, message):
-        info = KnowledgeGraph.get_comprehensive_info("Income")
-        
-        response = "Economics of Fishing\n\n"
-        
-        divided_to = [r["target"] for r in info["outgoing"] if r["relation"] == "DIVIDED_TO"]
-        
-        if divided_to:
-            response += "Income Distribution:\n"
-            for party in divided_to:
-                response += f"  • {party}\n"
-            response += "\n"
-            response += "Fishing income is typically shared among boat owners, fishermen, "
-            response += "and covers operational costs like engine fuel and food.\n\n"
-        
-        response += "Understanding economics helps plan sustainable fishing ventures!"
-        
-        return response
-    
-    @staticmethod
-    def _handle_comparison(entity, entities, memory, message):
-        comparison = QuestionAnalyzer.extract_comparison(message)
-        fish_list = entities.get("fish", [])
-        
-        if len(fish_list) < 2 and not comparison:
-            return "To compare, please mention two fish species (like 'Hilsa and Catfish') or two conditions!"
-        
-        fish1 = fish_list[0] if fish_list else (comparison[0] if comparison else None)
-        fish2 = fish_list[1] if len(fish_list) > 1 else (comparison[1] if comparison else None)
-        
-        if not fish1 or not fish2:
-            return "I need two things to compare. Try 'Compare Hilsa and Salmon' or 'Hilsa vs Catfish'."
-        
-        info1 = KnowledgeGraph.get_comprehensive_info(fish1)
-        info2 = KnowledgeGraph.get_comprehensive_info(fish2)
-        
-        response = f"Comparing {fish1.title()} vs {fish2.title()}\n\n"
-        
-        # Compare seasons
-        seasons1 = [r["target"] for r in info1["outgoing"] if r["relation"] == "SEASONALLY_AVAILABLE_IN"]
-        seasons2 = [r["target"] for r in info2["outgoing"] if r["relation"] == "SEASONALLY_AVAILABLE_IN"]
-        
-        response += "Best Season:\n"
-        response += f"  • {fish1.title()}: {', '.join(seasons1) if seasons1 else 'N/A'}\n"
-        response += f"  • {fish2.title()}: {', '.join(seasons2) if seasons2 else 'N/A'}\n\n"
-        
-        # Compare locations
-        locs1 = [r["target"] for r in info1["outgoing"] if r["relation"] == "FOUND_IN"]
-        locs2 = [r["target"] for r in info2["outgoing"] if r["relation"] == "FOUND_IN"]
-        
-        response += "Habitat:\n"
-        response += f"  • {fish1.title()}: {', '.join(locs1) if locs1 else 'N/A'}\n"
-        response += f"  • {fish2.title()}: {', '.join(locs2) if locs2 else 'N/A'}\n\n"
-        
-        # Add insight
-        if seasons1 and seasons2 and seasons1 != seasons2:
-            response += "Key Difference: These fish are active in different seasons, so you can target them at different times of the year!"
-        elif locs1 and locs2 and locs1 != locs2:
-            response += "Key Difference: These fish live in different water types, so you'll need different locations!"
-        
-        return response
-    
-    @staticmethod
-    def _handle_advice(entity, entities, memory, message):
-        if not entity:
-            return "I'd love to give advice! What are you planning - catching a specific fish, dealing with weather, or choosing equipment?"
-        
-        info = KnowledgeGraph.get_comprehensive_info(entity)
-        
-        response = f"Fishing Advice: {entity.title()}\n\n"
-        
-        # Get comprehensive info
-        seasons = [r["target"] for r in info["outgoing"] if r["relation"] == "SEASONALLY_AVAILABLE_IN"]
-        locations = [r["target"] for r in info["outgoing"] if r["relation"] == "FOUND_IN"]
-        catch_conditions = [r["target"] for r in info["outgoing"] if r["relation"] == "CATCH_IN"]
-        
-        if seasons:
-            response += f"Best Timing: Target {entity} during {', '.join(seasons)}\n\n"
-        
-        if locations:
-            response += f"Where to Go: Focus on {', '.join(locations)} areas\n\n"
-        
-        if catch_conditions:
-            response += f"Ideal Conditions: Look for {', '.join(catch_conditions)}\n\n"
-        
-        # General tips
-        response += "Pro Tips:\n"
-        response += "Check water conditions before going out\n"
-        response += "Avoid murky water and strong currents\n"
-        response += "Use appropriate, sustainable gear\n"
-        response += "Consider Bangla months: Boisakh is best\n"
-        
-        return response
-    
-    @staticmethod
-    def _handle_general(entity, entities, memory, message):
-        if not entity:
-            return "I'm here to help! Ask me about fish species (Hilsa, Catfish, Salmon), seasons, locations, water conditions, or equipment."
-        
-        info = KnowledgeGraph.get_comprehensive_info(entity)
-        
-        if not info["entity"]:
-            # Try fuzzy match
-            corrected = FuzzyMatcher.correct_message(entity)
-            if corrected != entity:
-                return f"Did you mean '{corrected}'? Let me know and I'll tell you all about it!"
-            return f"I couldn't find '{entity}' in my knowledge base. Try asking about Hilsa, Catfish, Salmon, water conditions, or equipment!"
-        
-        response = f"About {info['entity']}\n\n"
-        
-        # Categorize information
-        seasons = []
-        locations = []
-        conditions = []
-        suitable = []
-        not_suitable = []
-        
-        for rel in info["outgoing"]:
-            if rel["relation"] == "SEASONALLY_AVAILABLE_IN":
-                seasons.append(rel["target"])
-            elif rel["relation"] in ["FOUND_IN", "AVAILABLE_IN"]:
-                locations.append(rel["target"])
-            elif rel["relation"] in ["CATCH_IN", "AFFECTED_BY"]:
-                conditions.append(rel["target"])
-            elif rel["relation"] == "SUITABLE_FOR":
-                suitable.append(rel["target"])
-            elif rel["relation"] == "NOT_SUITABLE_FOR":
-                not_suitable.append(rel["target"])
-        
-        # Build response
-        if seasons:
-            response += f"Season: {', '.join(set(seasons))}\n"
-        if locations:
-            response += f"Location: {', '.join(set(locations))}\n"
-        if conditions:
-            response += f"Conditions: {', '.join(set(conditions))}\n"
-        if suitable:
-            response += f"Good for: {', '.join(set(suitable))}\n"
-        if not_suitable:
-            response += f"Not good for: {', '.join(set(not_suitable))}\n"
-        
-        if not any([seasons, locations, conditions, suitable, not_suitable]):
-            response += "I have this in my database, but limited details. Ask me something specific about it!\n"
-        
-        response += "\n What else would you like to know?"
-        
-        return response
-    
-    @staticmethod
-    def _build_comprehensive_info(info: Dict) -> str:
-        """Build comprehensive information response"""
-        response = f"{info['entity']}\n\n"
-        
-        seasons = [r["target"] for r in info["outgoing"] if r["relation"] == "SEASONALLY_AVAILABLE_IN"]
-        locations = [r["target"] for r in info["outgoing"] if r["relation"] == "FOUND_IN"]
-        conditions = [r["target"] for r in info["outgoing"] if r["relation"] == "CATCH_IN"]
-        
-        if seasons:
-            response += f"Season: {', '.join(seasons)}\n"
-        if locations:
-            response += f"Location: {','.join(locations)}\n"
-        if conditions:
-            response += f"Best Conditions: {', '.join(conditions)}\n"
-        
-        return response
-    
-    @staticmethod
-    def _add_suggestions(response: str, entity: str, memory: ConversationMemory) -> str:
-        """Add proactive suggestions"""
-        if not entity:
-            return response
-        
-        suggestions = KnowledgeGraph.get_suggestions(entity, memory.topics_discussed)
-        
-        if suggestions and random.random() < 0.6:  # 60% chance
-            response += "\n\n"
-            transition = ResponseGenerator.pick_template("transition", topic=suggestions[0])
-            response += f"{transition} you might also want to know about {suggestions[0]}."
-        
-        return response
-
-# ============= MAIN QUERY PROCESSOR =============
-
-def process_conversation(message: str, session_id: str) -> str:
-    """Main conversation processor with all enhancements"""
-    
-    # Get or create session memory
-    if session_id not in sessions:
-        sessions[session_id] = ConversationMemory()
-    
-    memory = sessions[session_id]
-    
-    # Auto-correct typos
-    corrected_message = FuzzyMatcher.correct_message(message)
-    
-    # Expand with synonyms
-    expanded_queries = Synonyms.expand_query(corrected_message)
-    
-    # Extract entities (try original and corrected)
-    entities = {
-        "fish": [],
-        "seasons": [],
-        "months": [],
-        "locations": [],
-        "conditions": [],
-        "gear": [],
-        "water_quality": [],
-        "economic": []
-    }
-    
-    # Extract from corrected message
-    for fish in FuzzyMatcher.KNOWN_ENTITIES["fish"]:
-        if fish in corrected_message.lower():
-            entities["fish"].append(fish)
-    
-    for season in FuzzyMatcher.KNOWN_ENTITIES["seasons"]:
-        if season in corrected_message.lower():
-            entities["seasons"].append(season)
-    
-    for month in FuzzyMatcher.KNOWN_ENTITIES["months"]:
-        if month in corrected_message.lower():
-            entities["months"].append(month)
-    
-    for loc in FuzzyMatcher.KNOWN_ENTITIES["locations"]:
-        if loc in corrected_message.lower():
-            entities["locations"].append(loc)
-    
-    for cond in FuzzyMatcher.KNOWN_ENTITIES["conditions"]:
-        if cond in corrected_message.lower():
-            entities["conditions"].append(cond)
-            if cond in ["murky", "clean"]:
-                entities["water_quality"].append(cond)
-    
-    for gear in FuzzyMatcher.KNOWN_ENTITIES["gear"]:
-        if gear in corrected_message.lower():
-            entities["gear"].append(gear)
-    
-    if any(word in corrected_message.lower() for word in ["income", "cost", "money", "profit"]):
-        entities["economic"].append("income")
-    
-    # Classify intent
-    intent = SmartIntentClassifier.classify(corrected_message, entities, memory)
-    
-    # Build response
-    response = ConversationalResponseBuilder.build_response(
-        intent, entities, memory, corrected_message)
-    
-    # Update memory
-    memory.add_message("user", message, intent)
-    memory.add_message("assistant", response, intent)
-    memory.last_intent = intent
-    
-    # Update topics
-    if memory.current_topic:
-        memory.topics_discussed.add(memory.current_topic)
-    
-    return response
-translator = Translator()
-
-# ... (all previous code remains the same, up to the translator and @app.post("/chat"))
-
-translator = Translator()
-
-@app.post("/chat")
-async def chat(request: ChatRequest, session: Request):
-    session_id = session.client.host
-    user_message = request.message.strip()
-
-    # Detect language
-    detected = translator.detect(user_message)
-    is_bengali_input = detected.lang == "bn"
-
-    # Translate Bengali input to English for processing
-    if is_bengali_input:
-        message_en = translator.translate(user_message, src="bn", dest="en").text
-    else:
-        message_en = user_message
-
-    # Process chatbot logic in English
-    reply_en = process_conversation(message_en, session_id)
-
-    # If Bengali input, translate back
-    if is_bengali_input:
-        reply_text = translator.translate(reply_en, src="en", dest="bn").text
-        reply_lang = "bn"
-    else:
-        reply_text = reply_en
-        reply_lang = "en"
-
-    # Generate TTS if Bengali
-    return JSONResponse({
-        "reply": reply_text,
-        "lang": reply_lang
-    })
-
-from fastapi.staticfiles import StaticFiles
-
-# Specific routes must come BEFORE the catch-all static mount
-@app.get("/admin", response_class=HTMLResponse)
-async def admin_page():
-    with open("admin.html") as f:  # Assume admin.html in same directory
-        return f.read()
-
-@app.get("/feedbacks")
-async def get_feedbacks():
-    try:
-        feedbacks = list(feedback_collection.find({}, {"_id": 0}))  # Fetch all, exclude ObjectId
-        return feedbacks
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))  # For error handling
-    
-@app.get("/graph")
-async def get_graph():
-    try:
-        def fetch_graph(tx):
-            result = tx.run("MATCH (n)-[r]->(m) RETURN n, r, m")
-            nodes = {}
-            edges = []
-            for record in result:
-                n = record["n"]
-                m = record["m"]
-                r = record["r"]
-                
-                n_id = n.id
-                if n_id not in nodes:
-                    nodes[n_id] = {
-                        "id": n_id,
-                        "label": n.get("name", "") or list(n.labels)[0] if n.labels else "Node"
-                    }
-                
-                m_id = m.id
-                if m_id not in nodes:
-                    nodes[m_id] = {
-                        "id": m_id,
-                        "label": m.get("name", "") or list(m.labels)[0] if m.labels else "Node"
-                    }
-                
-                edges.append({
-                    "from": n_id,
-                    "to": m_id,
-                    "label": r.type
-                })
-            return {"nodes": list(nodes.values()), "edges": edges}
-        
-        with driver.session() as session:
-            graph_data = session.execute_read(fetch_graph)
-        return graph_data
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-# Now the catch-all static mount (this serves index.html and other frontend files)
-app.mount("/", StaticFiles(directory=".", html=True), name="static")
\ No newline at end of file
+import time
+
+_IMPORT_STARTED = time.perf_counter()
+
+from fastapi import FastAPI, APIRouter, Request, HTTPException, Depends
+from fastapi.responses import HTMLResponse, JSONResponse, FileResponse
+from pydantic import BaseModel
+from typing import List, Dict, Optional, Tuple
+from difflib import SequenceMatcher
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from functools import partial
+from collections import OrderedDict, Counter, deque
+import asyncio
+import base64
+import bisect
+import contextvars
+import cProfile
+import gzip
+import hashlib
+import hmac
+import importlib
+import math
+import json
+import logging
+import pstats
+import random
+import secrets
+import string
+import threading
+from datetime import datetime, timedelta, timezone
+from fastapi.staticfiles import StaticFiles
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.staticfiles import NotModifiedResponse
+import mimetypes
+import os
+import queue
+import shutil
+from array import array
+import sqlite3
+import sys
+import re
+import stat
+import glob
+
+# neo4j, pymongo and googletrans are imported on first use (see lazy_import)
+
+try:
+    import brotli
+except ImportError:  # Optional; responses fall back to gzip
+    brotli = None
+
+from fastapi.middleware.cors import CORSMiddleware
+
+logger = logging.getLogger("fishing_chatbot")
+
+# Deployment:
+#   single process:  uvicorn fishing_chatbot:create_app --factory --port 8000
+#   multi-worker:    gunicorn -c gunicorn.conf.py   (WEB_CONCURRENCY workers)
+# Each worker owns its connection pools and local caches; set REDIS_URL to share
+# caches and session memory between workers (or SESSION_SHARDS to spread sessions
+# over several Redis instances), and the same SESSION_SECRET in every worker.
+# Build step:       python build_assets.py   (fingerprinted, precompressed assets in dist/)
+# Offline graph:    GRAPH_BACKEND=sqlite or memory serves the graph from data/ without Aura
+#                   (python ingest_graph.py --offline --sqlite data/graph.sqlite3 ...)
+# Tests:            python -m pytest   (tests/, on a fixture graph; no Aura, Mongo or Redis needed)
+
+MONGODB_URI = os.getenv("MONGODB_URI")  # Loads from Render env var
+
+# Where the knowledge graph lives: "neo4j" (Aura), "sqlite" (a local file) or
+# "memory" (the snapshot file, read-only); all three answer the same queries
+GRAPH_BACKEND = os.getenv("GRAPH_BACKEND", "neo4j").lower()
+GRAPH_SQLITE_PATH = os.getenv("GRAPH_SQLITE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "graph.sqlite3"))
+
+# Neo4j details (set in the environment, never in code)
+NEO4J_URI = os.getenv("NEO4J_URI")
+NEO4J_USER = os.getenv("NEO4J_USER", "neo4j")
+NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD")
+NEO4J_DATABASE = os.getenv("NEO4J_DATABASE", "neo4j")  # Naming the db skips the home-db lookup per session
+
+# Connection pool tuning (override via env)
+NEO4J_MAX_POOL_SIZE = int(os.getenv("NEO4J_MAX_POOL_SIZE", "50"))
+NEO4J_WARM_CONNECTIONS = int(os.getenv("NEO4J_WARM_CONNECTIONS", "4"))
+NEO4J_CONNECTION_TIMEOUT = float(os.getenv("NEO4J_CONNECTION_TIMEOUT", "15"))
+NEO4J_ACQUISITION_TIMEOUT = float(os.getenv("NEO4J_ACQUISITION_TIMEOUT", "30"))
+NEO4J_MAX_CONNECTION_LIFETIME = float(os.getenv("NEO4J_MAX_CONNECTION_LIFETIME", "1800"))
+NEO4J_KEEP_ALIVE = os.getenv("NEO4J_KEEP_ALIVE", "1") == "1"
+
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "50"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "2"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000"))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000"))
+
+# Days of per-day feedback counts /feedbacks/summary returns by default
+FEEDBACK_SUMMARY_DAYS = int(os.getenv("FEEDBACK_SUMMARY_DAYS", "30"))
+# Count feedback saved before the rollups existed, once, in the background at startup
+FEEDBACK_BACKFILL_ON_START = os.getenv("FEEDBACK_BACKFILL_ON_START", "1") == "1"
+
+# Per-dependency call timeouts (seconds) and circuit breaker tuning
+GRAPH_TIMEOUT = float(os.getenv("GRAPH_TIMEOUT", "3"))
+GRAPH_EXPORT_TIMEOUT = float(os.getenv("GRAPH_EXPORT_TIMEOUT", "30"))  # Whole-graph /graph export, on its own breaker
+TRANSLATE_TIMEOUT = float(os.getenv("TRANSLATE_TIMEOUT", "3"))
+MONGO_TIMEOUT = float(os.getenv("MONGO_TIMEOUT", "3"))
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "3"))
+BREAKER_RESET_AFTER = float(os.getenv("BREAKER_RESET_AFTER", "30"))
+DEPENDENCY_POOL_SIZE = int(os.getenv("DEPENDENCY_POOL_SIZE", "32"))
+STALE_CACHE_SIZE = int(os.getenv("STALE_CACHE_SIZE", "1000"))
+
+# Caches: per-process LRU tier, optionally fronting a shared Redis tier
+REDIS_URL = os.getenv("REDIS_URL")
+REDIS_TIMEOUT = float(os.getenv("REDIS_TIMEOUT", "0.2"))
+GRAPH_CACHE_TTL = float(os.getenv("GRAPH_CACHE_TTL", "600"))
+GRAPH_CACHE_SIZE = int(os.getenv("GRAPH_CACHE_SIZE", "2000"))
+TRANSLATION_CACHE_TTL = float(os.getenv("TRANSLATION_CACHE_TTL", "86400"))
+TRANSLATION_CACHE_SIZE = int(os.getenv("TRANSLATION_CACHE_SIZE", "5000"))
+SESSION_TTL = int(os.getenv("SESSION_TTL", "3600"))
+SESSION_LOCAL_MAX = int(os.getenv("SESSION_LOCAL_MAX", "100000"))  # Per worker; least recently used dropped past it
+
+# Sessions are keyed by a signed token (cookie or X-Session-Token header), not the
+# client IP. Every worker must share SESSION_SECRET to accept each other's tokens.
+SESSION_SECRET = os.getenv("SESSION_SECRET")
+SESSION_COOKIE = os.getenv("SESSION_COOKIE", "fc_session")
+SESSION_HEADER = "X-Session-Token"
+# Comma-separated Redis URLs; sessions are spread over them by consistent hashing
+SESSION_SHARDS = [url.strip() for url in os.getenv("SESSION_SHARDS", "").split(",") if url.strip()]
+SESSION_RING_VNODES = int(os.getenv("SESSION_RING_VNODES", "160"))
+
+# Frontend assets live in their own directory so the checkout itself is never served
+STATIC_DIR = os.getenv("STATIC_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "static"))
+# Output of build_assets.py (fingerprinted + precompressed); preferred when present
+STATIC_BUILD_DIR = os.getenv("STATIC_BUILD_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "dist"))
+STATIC_MAX_AGE = int(os.getenv("STATIC_MAX_AGE", "86400"))
+
+# Dynamic response compression
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "500"))
+COMPRESS_GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", "6"))
+COMPRESS_BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", "4"))
+
+# Structured turn log (JSONL, rotated by size or age; rotated files optionally gzipped)
+TURN_LOG_ENABLED = os.getenv("TURN_LOG_ENABLED", "1") == "1"
+TURN_LOG_PATH = os.getenv("TURN_LOG_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs", "requests.jsonl"))
+TURN_LOG_MAX_BYTES = int(os.getenv("TURN_LOG_MAX_BYTES", str(50 * 1024 * 1024)))
+TURN_LOG_ROTATE_SECONDS = float(os.getenv("TURN_LOG_ROTATE_SECONDS", "86400"))
+TURN_LOG_BATCH_SIZE = int(os.getenv("TURN_LOG_BATCH_SIZE", "200"))
+TURN_LOG_FLUSH_SECONDS = float(os.getenv("TURN_LOG_FLUSH_SECONDS", "1.0"))
+TURN_LOG_QUEUE_SIZE = int(os.getenv("TURN_LOG_QUEUE_SIZE", "10000"))
+TURN_LOG_COMPRESS = os.getenv("TURN_LOG_COMPRESS", "1") == "1"
+
+# Operator routes (/metrics, /admin/* data) need "X-Admin-Token: <ADMIN_TOKEN>"; unset, they answer 404
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+ADMIN_HEADER = "X-Admin-Token"
+
+# Opt-in profiling: a sampled share of turns, plus turns sent with "X-Profile: <PROFILE_KEY>"
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_KEY = os.getenv("PROFILE_KEY", "")  # Unset: the header is ignored
+PROFILE_HEADER = "X-Profile"
+PROFILE_TOP_FUNCTIONS = int(os.getenv("PROFILE_TOP_FUNCTIONS", "15"))
+# Turns at least this slow (and every header-profiled turn) are kept for /admin/slow-turns
+SLOW_TURN_MS = float(os.getenv("SLOW_TURN_MS", "2000"))
+SLOW_TURN_BUFFER = int(os.getenv("SLOW_TURN_BUFFER", "100"))
+
+# Graph query log: time and rows for every query, aggregated by query text;
+# templates slower than SLOW_QUERY_MS get their plan captured in the background
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "300"))
+SLOW_QUERY_PLAN_INTERVAL = float(os.getenv("SLOW_QUERY_PLAN_INTERVAL", "600"))  # Seconds between plans per template
+SLOW_QUERY_PLANS = int(os.getenv("SLOW_QUERY_PLANS", "3"))  # Kept per template
+GRAPH_PROFILE_ALL = os.getenv("GRAPH_PROFILE_ALL", "0") == "1"  # Run every Cypher query under PROFILE, for db hits on each
+
+# Cache warm-up from recent turn logs and/or a curated seed file
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "1") == "1"
+WARMUP_SEED_PATH = os.getenv("WARMUP_SEED_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "warmup_seed.json"))
+WARMUP_LOG_FILES = int(os.getenv("WARMUP_LOG_FILES", "3"))
+WARMUP_MAX_RECORDS = int(os.getenv("WARMUP_MAX_RECORDS", "50000"))
+WARMUP_TOP_K = int(os.getenv("WARMUP_TOP_K", "100"))
+WARMUP_BUDGET_SECONDS = float(os.getenv("WARMUP_BUDGET_SECONDS", "20"))
+
+# Speculative prefetch of the topic a reply offers next
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "1") == "1"
+PREFETCH_WORKERS = int(os.getenv("PREFETCH_WORKERS", "2"))
+PREFETCH_MAX_PENDING = int(os.getenv("PREFETCH_MAX_PENDING", "50"))
+
+# Set to make replies reproducible: each turn's template and phrasing choices are
+# seeded from this, the turn number, the current topic and the message
+REPLY_SEED = os.getenv("REPLY_SEED")
+
+# Whole-graph snapshot, refreshed periodically; precomputed indexes are rebuilt from it
+GRAPH_SNAPSHOT_PATH = os.getenv("GRAPH_SNAPSHOT_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "graph_snapshot.json"))
+SNAPSHOT_REFRESH_SECONDS = float(os.getenv("SNAPSHOT_REFRESH_SECONDS", "3600"))
+SNAPSHOT_TIMEOUT = float(os.getenv("SNAPSHOT_TIMEOUT", "60"))
+
+# Suggestion ranking
+SUGGESTION_TOP_K = int(os.getenv("SUGGESTION_TOP_K", "8"))
+SUGGESTION_TWO_HOP_DECAY = float(os.getenv("SUGGESTION_TWO_HOP_DECAY", "0.3"))
+SUGGESTION_HUB_DEGREE = int(os.getenv("SUGGESTION_HUB_DEGREE", "200"))
+
+# Multi-hop cause/effect chains
+CAUSAL_MAX_DEPTH = int(os.getenv("CAUSAL_MAX_DEPTH", "3"))
+CAUSAL_TOP_K = int(os.getenv("CAUSAL_TOP_K", "6"))
+CAUSAL_HOP_DECAY = float(os.getenv("CAUSAL_HOP_DECAY", "0.6"))
+
+# "What can I catch now" answers use the local date (Bangladesh by default)
+CALENDAR_UTC_OFFSET_HOURS = float(os.getenv("CALENDAR_UTC_OFFSET_HOURS", "6"))
+
+# Admin graph view coordinates, laid out server-side once per graph version
+GRAPH_LAYOUT_PATH = os.getenv("GRAPH_LAYOUT_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "graph_layout.json"))
+GRAPH_LAYOUT_ITERATIONS = int(os.getenv("GRAPH_LAYOUT_ITERATIONS", "80"))
+GRAPH_LAYOUT_SAMPLE = int(os.getenv("GRAPH_LAYOUT_SAMPLE", "500"))  # Repulsion sample per step on big graphs
+GRAPH_LAYOUT_RELAYOUT_SHARE = float(os.getenv("GRAPH_LAYOUT_RELAYOUT_SHARE", "0.2"))  # New-node share that forces a fresh layout
+
+# Free-text retrieval over graph nodes when no known entity is mentioned. A match
+# becomes the topic only above RETRIEVAL_MIN_SCORE: misspelt node names score
+# ~0.65+, loose trigram overlaps ("wind" ~ "Winter") ~0.5 and below. Weaker
+# matches are still offered as "Did you mean ...?" above RETRIEVAL_SUGGEST_SCORE.
+RETRIEVAL_MIN_SCORE = float(os.getenv("RETRIEVAL_MIN_SCORE", "0.55"))
+RETRIEVAL_SUGGEST_SCORE = float(os.getenv("RETRIEVAL_SUGGEST_SCORE", "0.3"))
+
+# Cold start: warn when import + client setup + warm-up exceeds this budget
+STARTUP_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "5000"))
+
+HEALTH_CHECK_TIMEOUT = float(os.getenv("HEALTH_CHECK_TIMEOUT", "2"))
+HEALTH_CHECK_TTL = float(os.getenv("HEALTH_CHECK_TTL", "5"))
+
+# /chat admission control: token buckets per session and per client IP (0 disables),
+# then at most CHAT_MAX_CONCURRENCY turns in flight with a bounded wait queue.
+# New sessions may only fill CHAT_NEW_SESSION_QUEUE_SHARE of the queue, so
+# conversations already under way keep getting answers when it backs up.
+RATE_SESSION_PER_MINUTE = float(os.getenv("RATE_SESSION_PER_MINUTE", "20"))
+RATE_SESSION_BURST = float(os.getenv("RATE_SESSION_BURST", "8"))
+RATE_IP_PER_MINUTE = float(os.getenv("RATE_IP_PER_MINUTE", "300"))  # Generous: many fishermen share a carrier NAT
+RATE_IP_BURST = float(os.getenv("RATE_IP_BURST", "60"))
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+CHAT_MAX_CONCURRENCY = int(os.getenv("CHAT_MAX_CONCURRENCY", "32"))
+CHAT_QUEUE_SIZE = int(os.getenv("CHAT_QUEUE_SIZE", "64"))
+CHAT_QUEUE_TIMEOUT = float(os.getenv("CHAT_QUEUE_TIMEOUT", "5"))
+CHAT_NEW_SESSION_QUEUE_SHARE = float(os.getenv("CHAT_NEW_SESSION_QUEUE_SHARE", "0.5"))
+# Budget for one turn once admitted; optional steps (suggestions, reply translation) are dropped past it
+TURN_DEADLINE_SECONDS = float(os.getenv("TURN_DEADLINE_SECONDS", "10"))
+# Proxies in front of the app (Render: 1); the client IP is read from X-Forwarded-For
+TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", "0"))
+
+# ============= STARTUP & BACKEND CLIENTS =============
+
+# Milliseconds spent per startup step, e.g. {"import:neo4j": 180.2, "warmup:neo4j": 950.0}
+startup_timings: Dict[str, float] = {}
+
+
+class timed:
+    """Record how long a startup step took in startup_timings"""
+
+    def __init__(self, step: str):
+        self.step = step
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        startup_timings[self.step] = round((time.perf_counter() - self.started) * 1000, 1)
+        return False
+
+
+def lazy_import(name: str):
+    """Import a heavy dependency on first use, timing the first import"""
+    module = sys.modules.get(name)
+    if module is None:
+        with timed(f"import:{name}"):
+            module = importlib.import_module(name)
+    return module
+
+
+# Backend clients - created on first use or in the app lifespan, never at import
+driver = None
+graph_backend = None
+client = None
+db = None
+feedback_collection = None
+feedback_rollups = None
+translator = None
+_clients_lock = threading.Lock()
+
+# Last known backend health, refreshed by /readyz at most every HEALTH_CHECK_TTL seconds
+backend_health = {
+    "graph": {"ok": False, "checked_at": 0.0, "error": "not started"},
+    "mongo": {"ok": False, "checked_at": 0.0, "error": "not started"},
+}
+
+
+def get_driver():
+    """The Neo4j driver with tuned pools; constructing it opens no connection"""
+    global driver
+    if driver is None:
+        with _clients_lock:
+            if driver is None:
+                if not NEO4J_URI or not NEO4J_PASSWORD:
+                    raise RuntimeError("NEO4J_URI and NEO4J_PASSWORD must be set")
+                neo4j = lazy_import("neo4j")
+                with timed("init:neo4j"):
+                    driver = neo4j.GraphDatabase.driver(
+                        NEO4J_URI,
+                        auth=(NEO4J_USER, NEO4J_PASSWORD),
+                        max_connection_pool_size=NEO4J_MAX_POOL_SIZE,
+                        connection_timeout=NEO4J_CONNECTION_TIMEOUT,
+                        connection_acquisition_timeout=NEO4J_ACQUISITION_TIMEOUT,
+                        max_connection_lifetime=NEO4J_MAX_CONNECTION_LIFETIME,
+                        keep_alive=NEO4J_KEEP_ALIVE,
+                    )
+    return driver
+
+
+def get_mongo_client():
+    """The Mongo client with tuned pools; connect=False defers the first connection"""
+    global client, db, feedback_collection, feedback_rollups
+    if client is None:
+        with _clients_lock:
+            if client is None:
+                pymongo = lazy_import("pymongo")
+                with timed("init:mongo"):
+                    mongo = pymongo.MongoClient(
+                        MONGODB_URI,
+                        maxPoolSize=MONGO_MAX_POOL_SIZE,
+                        minPoolSize=MONGO_MIN_POOL_SIZE,
+                        serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+                        connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+                        maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+                        connect=False,
+                    )
+                db = mongo["fishermen_chatbot"]
+                feedback_collection = db["feedbacks"]
+                feedback_rollups = db["feedback_rollups"]
+                client = mongo
+    return client
+
+
+def get_feedback_collection():
+    get_mongo_client()
+    return feedback_collection
+
+
+def get_feedback_rollups():
+    get_mongo_client()
+    return feedback_rollups
+
+
+def get_translator():
+    """The googletrans client, built on first use"""
+    global translator
+    if translator is None:
+        with _clients_lock:
+            if translator is None:
+                googletrans = lazy_import("googletrans")
+                with timed("init:translator"):
+                    translator = googletrans.Translator()
+    return translator
+
+
+def get_graph_backend() -> "GraphBackend":
+    """The GRAPH_BACKEND store, created on first use"""
+    global graph_backend
+    if graph_backend is None:
+        with _clients_lock:
+            if graph_backend is None:
+                backends = {"neo4j": Neo4jBackend, "sqlite": SQLiteBackend, "memory": InMemoryBackend}
+                if GRAPH_BACKEND not in backends:
+                    raise RuntimeError(f"GRAPH_BACKEND must be one of {', '.join(backends)}, not {GRAPH_BACKEND!r}")
+                graph_backend = backends[GRAPH_BACKEND]()
+    return graph_backend
+
+
+def graph_session():
+    """Open a Neo4j session on the configured database"""
+    return get_driver().session(database=NEO4J_DATABASE)
+
+
+def _warm_neo4j_connection():
+    with graph_session() as session:
+        session.run("RETURN 1").consume()
+
+
+def check_graph():
+    get_graph_backend().ping()
+
+
+def check_mongo():
+    get_mongo_client().admin.command("ping")
+
+
+def warm_up_graph():
+    try:
+        with timed(f"warmup:{GRAPH_BACKEND}"):
+            get_graph_backend().warm_up()
+        _record_health("graph", None)
+    except Exception as e:
+        _record_health("graph", e)
+
+
+def warm_up_mongo():
+    try:
+        with timed("warmup:mongo"):
+            check_mongo()
+        _record_health("mongo", None)
+    except Exception as e:
+        _record_health("mongo", e)
+
+
+def warm_up_translator():
+    try:
+        get_translator()
+    except Exception as e:
+        logger.warning("Translator unavailable at startup: %s", e)  # Replies fall back to English
+
+
+def check_startup_budget():
+    """Log the per-dependency startup cost, warning when over STARTUP_BUDGET_MS"""
+    total = round((time.perf_counter() - _IMPORT_STARTED) * 1000, 1)
+    startup_timings["total"] = total
+    breakdown = ", ".join(f"{step}={ms}ms" for step, ms in sorted(
+        startup_timings.items(), key=lambda item: -item[1]) if step != "total")
+    if total > STARTUP_BUDGET_MS:
+        logger.warning("Startup took %sms (budget %sms): %s", total, STARTUP_BUDGET_MS, breakdown)
+    else:
+        logger.info("Startup took %sms: %s", total, breakdown)
+
+
+def close_backends():
+    """Close pooled connections cleanly on shutdown"""
+    global driver, graph_backend, client
+    if graph_backend is not None:
+        graph_backend.close()
+        graph_backend = None
+    if driver is not None:
+        driver.close()
+        driver = None
+    if client is not None:
+        client.close()
+        client = None
+
+
+def _record_health(name: str, error: Optional[Exception]):
+    backend_health[name] = {
+        "ok": error is None,
+        "checked_at": time.time(),
+        "error": str(error) if error else None,
+    }
+
+
+async def _refresh_health(name: str, check):
+    """Re-check one backend in a worker thread, never waiting past HEALTH_CHECK_TIMEOUT"""
+    if time.time() - backend_health[name]["checked_at"] < HEALTH_CHECK_TTL:
+        return
+    try:
+        await asyncio.wait_for(asyncio.to_thread(check), timeout=HEALTH_CHECK_TIMEOUT)
+        _record_health(name, None)
+    except asyncio.TimeoutError:
+        _record_health(name, TimeoutError(f"no reply within {HEALTH_CHECK_TIMEOUT}s"))
+    except Exception as e:
+        _record_health(name, e)
+
+
+# ============= CIRCUIT BREAKERS =============
+
+class DependencyUnavailable(Exception):
+    """A dependency timed out, failed, or its breaker is open"""
+
+
+# Dependency calls run here so a stalled backend can be abandoned after its timeout
+_dependency_pool = ThreadPoolExecutor(max_workers=DEPENDENCY_POOL_SIZE, thread_name_prefix="dependency")
+# Side lookups a turn runs next to its main one; separate so they never wait on their own pool
+_fanout_pool = ThreadPoolExecutor(max_workers=CHAT_MAX_CONCURRENCY, thread_name_prefix="turn-fanout")
+
+
+class CircuitBreaker:
+    """Bound a dependency's latency and stop calling it while it keeps failing"""
+
+    def __init__(self, name: str, timeout: float,
+                 failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 reset_after: float = BREAKER_RESET_AFTER):
+        self.name = name
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.state = "closed"  # closed, open, half_open
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may go through right now"""
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_after:
+                self.state = "half_open"  # Let a single trial call through
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def call(self, fn, *args, **kwargs):
+        """Run fn with the breaker's timeout (blocking caller)"""
+        if not self.allow():
+            raise DependencyUnavailable(f"{self.name} circuit open")
+        future = _dependency_pool.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+        try:
+            result = future.result(timeout=self.timeout)
+        except FutureTimeout:
+            self.record_failure()
+            raise DependencyUnavailable(f"{self.name} timed out after {self.timeout}s")
+        except Exception as e:
+            self.record_failure()
+            raise DependencyUnavailable(f"{self.name} failed: {e}") from e
+        self.record_success()
+        return result
+
+    async def acall(self, fn, *args, **kwargs):
+        """Run fn with the breaker's timeout without blocking the event loop"""
+        if not self.allow():
+            raise DependencyUnavailable(f"{self.name} circuit open")
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(_dependency_pool, partial(contextvars.copy_context().run, fn, *args, **kwargs))
+        try:
+            result = await asyncio.wait_for(future, timeout=self.timeout)
+        except asyncio.TimeoutError:
+            self.record_failure()
+            raise DependencyUnavailable(f"{self.name} timed out after {self.timeout}s")
+        except Exception as e:
+            self.record_failure()
+            raise DependencyUnavailable(f"{self.name} failed: {e}") from e
+        self.record_success()
+        return result
+
+    def snapshot(self) -> Dict:
+        return {"state": self.state, "failures": self.failures}
+
+
+graph_breaker = CircuitBreaker("graph", GRAPH_TIMEOUT)
+# A slow whole-graph export must not open the breaker that chat lookups go through
+graph_export_breaker = CircuitBreaker("graph_export", GRAPH_EXPORT_TIMEOUT)
+translator_breaker = CircuitBreaker("translator", TRANSLATE_TIMEOUT)
+mongo_breaker = CircuitBreaker("mongo", MONGO_TIMEOUT)
+
+
+# ============= TURN LOGGING =============
+
+class TurnTrace:
+    """Everything worth recording about one /chat turn"""
+
+    def __init__(self, session_id: str):
+        self.started = time.perf_counter()
+        self.record = {
+            "ts": datetime.now().isoformat(timespec="milliseconds"),
+            "session": session_id,
+            "latency_ms": {},
+            "cache": {},
+        }
+        # Only kept for slow-turn reports, never logged
+        self.queries = []
+        self.profile = None
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record["latency_ms"][name] = round((time.perf_counter() - started) * 1000, 2)
+
+    def cache_event(self, cache_name: str, hit: bool):
+        counts = self.record["cache"].setdefault(cache_name, {"hits": 0, "misses": 0})
+        counts["hits" if hit else "misses"] += 1
+
+    def query(self, backend: str, text: str, params: Dict, ms: float, rows: int, db_hits: Optional[int] = None):
+        self.queries.append({"backend": backend, "query": text, "params": params, "ms": round(ms, 2),
+                             "rows": rows, "db_hits": db_hits})
+
+    def finish(self, **fields) -> Dict:
+        self.record.update(fields)
+        self.record["latency_ms"]["total"] = round((time.perf_counter() - self.started) * 1000, 2)
+        return self.record
+
+
+# The trace of the turn being handled; copied into asyncio.to_thread workers
+current_turn: ContextVar[Optional[TurnTrace]] = ContextVar("current_turn", default=None)
+
+
+class TurnDeadline:
+    """The time left for a /chat turn; every step waits at most this long"""
+
+    def __init__(self, seconds: float = TURN_DEADLINE_SECONDS):
+        self.expires = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires - time.monotonic())
+
+    async def wait(self, awaitable):
+        """Await within the deadline; asyncio.TimeoutError (and cancellation) once it passes"""
+        return await asyncio.wait_for(awaitable, self.remaining())
+
+
+# The deadline of the turn being handled, for steps running in worker threads
+turn_deadline: ContextVar[Optional[TurnDeadline]] = ContextVar("turn_deadline", default=None)
+
+
+async def timed_stage(trace: TurnTrace, name: str, awaitable):
+    """Await a step as one of the turn's stages, so concurrent steps are timed separately"""
+    with trace.stage(name):
+        return await awaitable
+
+
+def trace_turn(**fields):
+    """Attach fields to the current turn's record, if any"""
+    trace = current_turn.get()
+    if trace is not None:
+        trace.record.update(fields)
+
+
+class TurnLogger:
+    """Append turn records to rotating JSONL files from a background thread
+
+    log() only enqueues, so /chat never waits on disk. The writer thread
+    appends in batches and rotates the live file once it passes max_bytes
+    or rotate_seconds; rotated files are gzipped when compress is set.
+    """
+
+    def __init__(self, path: str, max_bytes: int = TURN_LOG_MAX_BYTES,
+                 rotate_seconds: float = TURN_LOG_ROTATE_SECONDS,
+                 batch_size: int = TURN_LOG_BATCH_SIZE,
+                 flush_seconds: float = TURN_LOG_FLUSH_SECONDS,
+                 queue_size: int = TURN_LOG_QUEUE_SIZE,
+                 compress: bool = TURN_LOG_COMPRESS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.rotate_seconds = rotate_seconds
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.compress = compress
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._opened_at = time.time()
+
+    def log(self, record: Dict):
+        """Queue a record; drops it (and counts the drop) if the writer is backed up"""
+        if self._thread is None:
+            self.start()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is None:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                if os.path.exists(self.path):
+                    self._opened_at = os.path.getmtime(self.path)
+                self._thread = threading.Thread(target=self._run, name="turn-logger", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Flush what's queued and stop the writer"""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while True:
+            batch = []
+            try:
+                item = self._queue.get(timeout=self.flush_seconds)
+                stopping = item is None
+                if not stopping:
+                    batch.append(item)
+                while not stopping and len(batch) < self.batch_size:
+                    item = self._queue.get_nowait()
+                    if item is None:
+                        stopping = True
+                    else:
+                        batch.append(item)
+            except queue.Empty:
+                stopping = False
+            if batch:
+                self._write(batch)
+            if stopping:
+                return
+
+    def _write(self, batch: List[Dict]):
+        lines = "".join(json.dumps(record, ensure_ascii=False, default=str) + "\n" for record in batch)
+        try:
+            if self._should_rotate():
+                self._rotate()
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+        except OSError as e:
+            self.dropped += len(batch)
+            logger.warning("Turn log write failed: %s", e)
+
+    def _should_rotate(self) -> bool:
+        if not os.path.exists(self.path):
+            self._opened_at = time.time()
+            return False
+        return (os.path.getsize(self.path) >= self.max_bytes
+                or time.time() - self._opened_at >= self.rotate_seconds)
+
+    def _rotate(self):
+        stem, ext = os.path.splitext(self.path)
+        base = f"{stem}-{datetime.now().strftime('%Y%m%dT%H%M%S')}"
+        rotated, n = f"{base}{ext}", 1
+        while os.path.exists(rotated) or os.path.exists(rotated + ".gz"):
+            rotated, n = f"{base}-{n}{ext}", n + 1
+        os.replace(self.path, rotated)
+        self._opened_at = time.time()
+        if self.compress:
+            with open(rotated, "rb") as src, gzip.open(rotated + ".gz", "wb") as dest:
+                shutil.copyfileobj(src, dest)
+            os.remove(rotated)
+
+
+turn_logger = TurnLogger(TURN_LOG_PATH)
+
+
+class TurnProfiler:
+    """cProfile around a turn's processing, summarised to the costliest functions
+
+    The profiler sees the processing thread only; graph and Mongo calls run on
+    the dependency pool and show up as waits here, with their own timings in
+    the turn's query list. One turn is profiled at a time - concurrent
+    profilers can't share the interpreter's hook - and the rest run plain.
+    """
+
+    _lock = threading.Lock()
+
+    @staticmethod
+    def wanted(request: Request) -> Optional[str]:
+        """Why this turn should be profiled ("requested" / "sampled"), or None"""
+        if PROFILE_KEY and hmac.compare_digest(request.headers.get(PROFILE_HEADER, ""), PROFILE_KEY):
+            return "requested"
+        if PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE:
+            return "sampled"
+        return None
+
+    @staticmethod
+    def run(trace: TurnTrace, fn, *args):
+        """fn(*args) under the profiler, leaving the summary on trace.profile"""
+        if not TurnProfiler._lock.acquire(blocking=False):
+            trace.profile = {"skipped": "another turn was being profiled"}
+            return fn(*args)
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+            try:
+                return fn(*args)
+            finally:
+                profiler.disable()
+                trace.profile = TurnProfiler.summarize(profiler)
+        finally:
+            TurnProfiler._lock.release()
+
+    @staticmethod
+    def summarize(profiler: cProfile.Profile, top: int = PROFILE_TOP_FUNCTIONS) -> Dict:
+        stats = pstats.Stats(profiler).stats
+        rows = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:top]
+        return {
+            "total_calls": sum(calls for _, calls, _, _, _ in stats.values()),
+            "functions": [
+                {"function": f"{os.path.basename(path)}:{line}({name})", "calls": calls,
+                 "self_ms": round(own * 1000, 3), "cumulative_ms": round(cumulative * 1000, 3)}
+                for (path, line, name), (_, calls, own, cumulative, _) in rows
+            ],
+        }
+
+
+class SlowTurns:
+    """Ring buffer of recent slow or profiled turns, newest last
+
+    Reports leave out what the user wrote and carry a hash of the session id,
+    enough to tell turns of one conversation apart from another's.
+    """
+
+    FIELDS = ("ts", "intent", "entities", "topic", "stage", "latency_ms", "cache")
+
+    def __init__(self, threshold_ms: float = SLOW_TURN_MS, size: int = SLOW_TURN_BUFFER):
+        self.threshold_ms = threshold_ms
+        self.seen = 0
+        self._turns = deque(maxlen=size)
+
+    def consider(self, trace: TurnTrace, profiled: Optional[str] = None):
+        """Keep the finished turn if it was slow, or profiled because the caller asked"""
+        slow = trace.record["latency_ms"].get("total", 0) >= self.threshold_ms
+        if not slow and profiled != "requested":
+            return
+        report = {field: trace.record.get(field) for field in self.FIELDS}
+        report.update(session=SlowTurns.pseudonym(trace.record["session"]),
+                      message_chars=len(trace.record.get("message") or ""),
+                      reason="slow" if slow else profiled, queries=trace.queries, profile=trace.profile)
+        self._turns.append(report)
+        self.seen += 1
+
+    @staticmethod
+    def pseudonym(session_id: str) -> str:
+        return hashlib.sha256(session_id.encode()).hexdigest()[:12]
+
+    def snapshot(self, limit: int = 0) -> Dict:
+        turns = list(self._turns)[::-1]
+        return {"threshold_ms": self.threshold_ms, "captured": self.seen,
+                "turns": turns[:limit] if limit > 0 else turns}
+
+
+slow_turns = SlowTurns()
+
+
+# ============= CACHES =============
+
+_redis = None
+
+
+def shared_cache():
+    """Redis client for the shared tier, or None when REDIS_URL is unset"""
+    global _redis
+    if _redis is None and REDIS_URL:
+        import redis  # Optional dependency, only needed for multi-worker deployments
+        _redis = redis.Redis.from_url(
+            REDIS_URL, socket_timeout=REDIS_TIMEOUT, socket_connect_timeout=REDIS_TIMEOUT)
+    return _redis
+
+
+class TwoTierCache:
+    """Per-process LRU with TTL, fronting the optional shared tier"""
+
+    def __init__(self, namespace: str, max_items: int, ttl: float):
+        self.namespace = namespace
+        self.max_items = max_items
+        self.ttl = ttl
+        self._local = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str):
+        now = time.time()
+        with self._lock:
+            entry = self._local.get(key)
+            if entry and entry[0] > now:
+                self._local.move_to_end(key)
+                self.hits += 1
+                self._trace(True)
+                return entry[1]
+
+        value = None
+        shared = shared_cache()
+        if shared is not None:
+            try:
+                raw = shared.get(f"{self.namespace}:{key}")
+                value = json.loads(raw) if raw is not None else None
+            except Exception:
+                value = None  # The shared tier is best-effort
+        if value is None:
+            self.misses += 1
+            self._trace(False)
+            return None
+        self._set_local(key, value)
+        self.hits += 1
+        self._trace(True)
+        return value
+
+    def _trace(self, hit: bool):
+        trace = current_turn.get()
+        if trace is not None:
+            trace.cache_event(self.namespace, hit)
+
+    def set(self, key: str, value):
+        self._set_local(key, value)
+        shared = shared_cache()
+        if shared is not None:
+            try:
+                shared.set(f"{self.namespace}:{key}", json.dumps(value), ex=int(self.ttl))
+            except Exception:
+                pass
+
+    def _set_local(self, key: str, value):
+        with self._lock:
+            self._local[key] = (time.time() + self.ttl, value)
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_items:
+                self._local.popitem(last=False)
+
+    def stats(self) -> Dict:
+        return {"size": len(self._local), "hits": self.hits, "misses": self.misses}
+
+
+graph_cache = TwoTierCache("graph", GRAPH_CACHE_SIZE, GRAPH_CACHE_TTL)
+translation_cache = TwoTierCache("translation", TRANSLATION_CACHE_SIZE, TRANSLATION_CACHE_TTL)
+# Reply translations per paragraph: follow-ups, tips and section text repeat across replies
+fragment_cache = TwoTierCache("fragment", TRANSLATION_CACHE_SIZE, TRANSLATION_CACHE_TTL)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Backends warm up concurrently; the translator import happens alongside
+    await asyncio.gather(
+        asyncio.to_thread(warm_up_graph),
+        asyncio.to_thread(warm_up_mongo),
+        asyncio.to_thread(warm_up_translator),
+    )
+    check_startup_budget()
+    if WARMUP_ENABLED:
+        # Readiness doesn't wait for this; it fills caches while traffic starts arriving
+        app.state.warmup = asyncio.create_task(asyncio.to_thread(CacheWarmer.run, WARMUP_BUDGET_SECONDS))
+    if FEEDBACK_BACKFILL_ON_START:
+        # A full scan that can outlast MONGO_TIMEOUT, so off the breaker and off the request path
+        app.state.feedback_backfill = asyncio.create_task(asyncio.to_thread(FeedbackRollups.startup_backfill))
+    app.state.snapshot_refresh = asyncio.create_task(snapshot_refresh_loop())
+    yield
+    app.state.snapshot_refresh.cancel()
+    turn_logger.stop()
+    close_backends()
+
+
+router = APIRouter()
+
+class Feedback(BaseModel):
+    type: str
+    message: str
+    reason: Optional[str] = None
+    comments: Optional[str] = None
+    intent: Optional[str] = None  # Intent of the rated answer, as /chat reported it
+
+
+class FeedbackRollups:
+    """Feedback counts kept current on every save, so the summary never scans feedbacks
+    
+    One document for all time ("all") and one per day ("day:YYYY-MM-DD"), each
+    {total, type: {type: n}, reason: {reason: n}, intent: {intent: {type: n}}},
+    bumped with $inc upserts next to the insert. Feedback saved before rollups
+    existed is counted once by backfill(), from the lifespan or by an operator
+    (POST /admin/feedbacks/rebuild-summary); the summary never scans.
+    """
+    
+    MAX_KEY_LENGTH = 40  # Reasons are client-supplied; bound the keys they can add
+    BACKFILL_CLAIM_SECONDS = 3600  # A backfill claim older than this died with its process
+    
+    @staticmethod
+    def _key(value) -> str:
+        """A value usable as a Mongo field name"""
+        key = str(value).replace(".", "_").replace("$", "_")[:FeedbackRollups.MAX_KEY_LENGTH]
+        return key or "unknown"
+    
+    @staticmethod
+    def increments(feedback: Dict) -> Dict[str, int]:
+        """The dotted-path counters one feedback adds to"""
+        kind = FeedbackRollups._key(feedback.get("type"))
+        inc = {"total": 1, f"type.{kind}": 1}
+        if feedback.get("reason"):
+            inc[f"reason.{FeedbackRollups._key(feedback['reason'])}"] = 1
+        if feedback.get("intent") in ConversationMemory.INTENTS:
+            inc[f"intent.{feedback['intent']}.{kind}"] = 1
+        return inc
+    
+    @staticmethod
+    def record(feedback: Dict):
+        pymongo = lazy_import("pymongo")
+        inc = FeedbackRollups.increments(feedback)
+        day = feedback["timestamp"].strftime("%Y-%m-%d")
+        get_feedback_rollups().bulk_write([
+            pymongo.UpdateOne({"_id": "all"}, {"$inc": inc, "$min": {"live_since": feedback["timestamp"]}},
+                              upsert=True),
+            pymongo.UpdateOne({"_id": f"day:{day}"}, {"$inc": inc, "$setOnInsert": {"day": day}}, upsert=True),
+        ], ordered=False)
+    
+    @staticmethod
+    def backfill() -> bool:
+        """Add feedback saved before live counting began to the rollups; once
+        
+        live_since on the all-time document is the oldest feedback record() has
+        counted, so only older feedback is scanned and its counts are $inc'ed
+        onto the live ones. False when it already ran or another process has it.
+        """
+        rollups = get_feedback_rollups()
+        now = datetime.now()
+        rollups.update_one({"_id": "all"}, {"$min": {"live_since": now}}, upsert=True)
+        stale = now - timedelta(seconds=FeedbackRollups.BACKFILL_CLAIM_SECONDS)
+        claimed = rollups.update_one(
+            {"_id": "all", "backfilled": {"$ne": True},
+             "$or": [{"backfill_started": {"$exists": False}}, {"backfill_started": {"$lt": stale}}]},
+            {"$set": {"backfill_started": now}})
+        if not claimed.modified_count:
+            return False
+        
+        cutoff = rollups.find_one({"_id": "all"}, {"live_since": 1})["live_since"]
+        counts = {"all": {}}  # rollup id -> dotted path -> n
+        query = {"$or": [{"timestamp": {"$lt": cutoff}}, {"timestamp": {"$exists": False}}]}
+        projection = {"_id": 0, "type": 1, "reason": 1, "intent": 1, "timestamp": 1}
+        for feedback in get_feedback_collection().find(query, projection):
+            targets = [counts["all"]]
+            if isinstance(feedback.get("timestamp"), datetime):
+                targets.append(counts.setdefault(f"day:{feedback['timestamp'].strftime('%Y-%m-%d')}", {}))
+            for path, n in FeedbackRollups.increments(feedback).items():
+                for inc in targets:
+                    inc[path] = inc.get(path, 0) + n
+        
+        for _id, inc in counts.items():
+            if _id != "all":
+                rollups.update_one({"_id": _id}, {"$inc": inc, "$setOnInsert": {"day": _id[4:]}}, upsert=True)
+        update = {"$set": {"backfilled": True}}
+        if counts["all"]:
+            update["$inc"] = counts["all"]
+        rollups.update_one({"_id": "all"}, update)  # Marked last: a run that dies is retried once its claim is stale
+        return True
+    
+    @staticmethod
+    def startup_backfill():
+        """backfill() for the lifespan, where a failure is only logged"""
+        try:
+            if FeedbackRollups.backfill():
+                logger.info("Feedback rollups backfilled")
+        except Exception as e:
+            logger.warning("Feedback rollup backfill failed: %s", e)
+    
+    @staticmethod
+    def summary(days: int) -> Dict:
+        """All-time counts plus the last `days` days, oldest first; two indexed reads
+        
+        Until backfill() has run ("backfilled": false) the counts leave out
+        feedback saved before the rollups existed.
+        """
+        rollups = get_feedback_rollups()
+        overall = rollups.find_one({"_id": "all"}) or {}
+        today = datetime.now().date()
+        dates = [str(today - timedelta(days=n)) for n in range(days - 1, -1, -1)]
+        by_day = {doc["day"]: doc for doc in rollups.find({"_id": {"$in": [f"day:{day}" for day in dates]}})}
+        return {
+            "total": overall.get("total", 0),
+            "type": overall.get("type", {}),
+            "reason": overall.get("reason", {}),
+            "intent": overall.get("intent", {}),
+            "backfilled": bool(overall.get("backfilled")),
+            "days": [{"day": day, "total": by_day.get(day, {}).get("total", 0),
+                      "type": by_day.get(day, {}).get("type", {})} for day in dates],
+        }
+
+
+@router.post("/feedback")
+async def save_feedback(feedback: Feedback):
+    feedback_dict = feedback.dict()
+    feedback_dict["timestamp"] = datetime.now()
+    
+    def store():
+        get_feedback_collection().insert_one(feedback_dict)
+        try:
+            FeedbackRollups.record(feedback_dict)
+        except Exception as e:
+            # The feedback is saved; the summary is off by one until a rebuild
+            logger.warning("Feedback rollup update failed: %s", e)
+    
+    try:
+        await mongo_breaker.acall(store)
+    except DependencyUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return {"status": "saved"}
+
+# Enhanced session management
+# Local tier, least recently used first; authoritative only when no shared tier is
+# configured. Entries idle for SESSION_TTL or beyond SESSION_LOCAL_MAX are dropped,
+# as the shared tier expires them, so clients that never keep a token can't grow it.
+sessions = OrderedDict()  # session id -> (last used, ConversationMemory)
+_sessions_lock = threading.Lock()
+
+
+class SessionTokens:
+    """Opaque session ids, HMAC-signed so clients can't pick or forge one
+
+    A token is "<id>.<signature>"; the id alone keys session state and the hash
+    ring, so a load balancer can route on the cookie (e.g. nginx
+    `hash $cookie_fc_session consistent`) and land on the worker that has it.
+    """
+
+    _secret = (SESSION_SECRET or "").encode() or secrets.token_bytes(32)
+
+    @staticmethod
+    def _sign(session_id: str) -> str:
+        digest = hmac.new(SessionTokens._secret, session_id.encode(), hashlib.sha256).digest()[:16]
+        return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+    @staticmethod
+    def issue() -> str:
+        session_id = secrets.token_urlsafe(16)
+        return f"{session_id}.{SessionTokens._sign(session_id)}"
+
+    @staticmethod
+    def verify(token: Optional[str]) -> Optional[str]:
+        """The session id inside a valid token, else None"""
+        if not token or token.count(".") != 1:
+            return None
+        session_id, signature = token.split(".")
+        if session_id and hmac.compare_digest(signature, SessionTokens._sign(session_id)):
+            return session_id
+        return None
+
+
+if not SESSION_SECRET:
+    logger.warning("SESSION_SECRET is unset; session tokens only work within this process")
+
+
+class HashRing:
+    """Consistent hashing: adding or removing a node moves only ~1/n of the keys"""
+
+    def __init__(self, nodes: List[str], vnodes: int = SESSION_RING_VNODES):
+        self.nodes = list(nodes)
+        points = sorted((HashRing._hash(f"{node}#{i}"), node) for node in nodes for i in range(vnodes))
+        self._hashes = [point for point, _ in points]
+        self._owners = [node for _, node in points]
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.sha1(key.encode()).digest()[:8], "big")
+
+    def node_for(self, key: str) -> str:
+        i = bisect.bisect(self._hashes, HashRing._hash(key)) % len(self._hashes)
+        return self._owners[i]
+
+
+session_ring = HashRing(SESSION_SHARDS) if SESSION_SHARDS else None
+_session_shards = {}  # shard URL -> Redis client
+
+
+class SessionStore:
+    """Session memory lookup, shared between workers when REDIS_URL or SESSION_SHARDS is set"""
+
+    @staticmethod
+    def shard(session_id: str):
+        """The Redis holding this session: its ring shard, else the shared cache (or None)"""
+        if session_ring is None:
+            return shared_cache()
+        url = session_ring.node_for(session_id)
+        client = _session_shards.get(url)
+        if client is None:
+            import redis  # Optional dependency, only needed for multi-worker deployments
+            client = _session_shards.setdefault(url, redis.Redis.from_url(
+                url, socket_timeout=REDIS_TIMEOUT, socket_connect_timeout=REDIS_TIMEOUT))
+        return client
+
+    @staticmethod
+    def load(session_id: str) -> "ConversationMemory":
+        memory = None
+        shared = SessionStore.shard(session_id)
+        if shared is not None:
+            try:
+                raw = shared.get(f"session:{session_id}")
+                if raw is not None:
+                    memory = ConversationMemory.from_state(json.loads(raw))
+            except Exception:
+                pass  # Fall back to this worker's copy
+        now = time.time()
+        with _sessions_lock:
+            if memory is None:
+                used, memory = sessions.get(session_id, (0.0, None))
+                if memory is None or now - used > SESSION_TTL:
+                    memory = ConversationMemory()
+            sessions[session_id] = (now, memory)
+            sessions.move_to_end(session_id)
+            SessionStore._evict(now)
+        return memory
+
+    @staticmethod
+    def _evict(now: float):
+        """Drop idle and surplus local sessions; both are at the front (caller holds the lock)"""
+        while sessions:
+            used, _ = next(iter(sessions.values()))
+            if len(sessions) <= SESSION_LOCAL_MAX and now - used <= SESSION_TTL:
+                break
+            sessions.popitem(last=False)
+
+    @staticmethod
+    def save(session_id: str, memory: "ConversationMemory"):
+        shared = SessionStore.shard(session_id)
+        if shared is not None:
+            try:
+                state = json.dumps(memory.to_state(), ensure_ascii=False, separators=(",", ":"))
+                shared.set(f"session:{session_id}", state, ex=SESSION_TTL)
+            except Exception:
+                pass
+
+class ChatRequest(BaseModel):
+    message: str
+
+# conversational Enhancments
+
+class ConversationMemory:
+    """Track conversation state and context
+    
+    Kept small because every live session holds one: slots instead of a
+    __dict__, the last HISTORY_TURNS exchanges in a ring buffer of parallel
+    arrays, intents and stages as small ints, names interned so sessions share
+    one copy. A turn records what the user said and which topic the reply was
+    about, not the reply text (replies are rebuilt from templates and the
+    graph anyway).
+    """
+    
+    __slots__ = ("_times", "_intents", "_texts", "_reply_topics", "turn_count", "_entities", "_topics",
+                 "_current_topic", "_offered_topic", "_stage", "_last_intent")
+    
+    HISTORY_TURNS = 5
+    STAGES = ("greeting", "exploring", "deep_dive", "expert")
+    INTENTS = ("general_info", "greeting", "goodbye", "affirmative", "negative", "season_timing",
+               "calendar", "location", "water_condition", "weather_condition", "gear_equipment",
+               "causes", "effects", "suitability", "economic", "comparison", "advice")
+    _INTENT_IDS = {intent: i for i, intent in enumerate(INTENTS)}
+    NO_INTENT = 255
+    
+    def __init__(self):
+        # Ring buffer, slot turn_count % HISTORY_TURNS; allocated on the first turn
+        self._times = None  # array("I") of epoch seconds
+        self._intents = None  # bytearray of INTENTS indexes
+        self._texts = None  # user messages
+        self._reply_topics = None  # topic each reply was about
+        self.turn_count = 0
+        self._entities = ()
+        self._topics = ()
+        self._current_topic = None
+        self._offered_topic = None  # Topic the last reply suggested; "yes" goes here
+        self._stage = 0
+        self._last_intent = None
+    
+    @staticmethod
+    def _intern(name: Optional[str]) -> Optional[str]:
+        return sys.intern(name) if name is not None else None
+    
+    @property
+    def current_topic(self) -> Optional[str]:
+        return self._current_topic
+    
+    @current_topic.setter
+    def current_topic(self, topic: Optional[str]):
+        self._current_topic = self._intern(topic)
+    
+    @property
+    def offered_topic(self) -> Optional[str]:
+        return self._offered_topic
+    
+    @offered_topic.setter
+    def offered_topic(self, topic: Optional[str]):
+        self._offered_topic = self._intern(topic)
+    
+    @property
+    def stage(self) -> str:
+        return ConversationMemory.STAGES[self._stage]
+    
+    @stage.setter
+    def stage(self, stage: str):
+        self._stage = ConversationMemory.STAGES.index(stage)
+    
+    @property
+    def last_intent(self) -> Optional[str]:
+        return ConversationMemory.INTENTS[self._last_intent] if self._last_intent is not None else None
+    
+    @last_intent.setter
+    def last_intent(self, intent: Optional[str]):
+        self._last_intent = ConversationMemory._INTENT_IDS.get(intent) if intent else None
+    
+    @property
+    def entities_discussed(self) -> frozenset:
+        return frozenset(self._entities)
+    
+    @property
+    def topics_discussed(self) -> frozenset:
+        return frozenset(self._topics)
+    
+    def discussed(self) -> set:
+        """Every entity and topic this conversation has covered"""
+        return set(self._entities) | set(self._topics)
+    
+    def discuss(self, entity: str):
+        """Make entity the current topic and remember it was discussed"""
+        self.current_topic = entity
+        if self._current_topic not in self._entities:
+            self._entities += (self._current_topic,)
+    
+    def add_topic(self, topic: str):
+        topic = self._intern(topic)
+        if topic not in self._topics:
+            self._topics += (topic,)
+    
+    def add_turn(self, message: str, intent: str):
+        """Record a user message and the topic the reply settled on"""
+        size = ConversationMemory.HISTORY_TURNS
+        if self._times is None:
+            self._times = array("I", bytes(4 * size))
+            self._intents = bytearray([ConversationMemory.NO_INTENT]) * size
+            self._texts = [None] * size
+            self._reply_topics = [None] * size
+        slot = self.turn_count % size
+        self._times[slot] = int(time.time())
+        self._intents[slot] = ConversationMemory._INTENT_IDS.get(intent, ConversationMemory.NO_INTENT)
+        self._texts[slot] = message
+        self._reply_topics[slot] = self._current_topic
+        self.turn_count += 1
+    
+    @property
+    def messages(self) -> List[Dict]:
+        """The recent history, oldest first, as user/assistant message dicts"""
+        if self._times is None:
+            return []
+        size = ConversationMemory.HISTORY_TURNS
+        messages = []
+        for n in range(max(0, self.turn_count - size), self.turn_count):
+            slot = n % size
+            intent_id = self._intents[slot]
+            intent = ConversationMemory.INTENTS[intent_id] if intent_id != ConversationMemory.NO_INTENT else None
+            at = datetime.fromtimestamp(self._times[slot])
+            messages.append({"role": "user", "content": self._texts[slot], "intent": intent, "timestamp": at})
+            messages.append({"role": "assistant", "topic": self._reply_topics[slot], "intent": intent, "timestamp": at})
+        return messages
+    
+    def update_stage(self):
+        """Update conversation stage based on history"""
+        msg_count = self.turn_count * 2  # Every turn is a question and a reply
+        if msg_count <= 2:
+            self.stage = "greeting"
+        elif msg_count <= 6:
+            self.stage = "exploring"
+        elif msg_count <= 12:
+            self.stage = "deep_dive"
+        else:
+            self.stage = "expert"
+    
+    # Compact JSON for the shared session store: slot values in order, arrays as int lists.
+    # Not pickle - anyone able to write to Redis could then run code in the app.
+    def to_state(self) -> list:
+        state = [getattr(self, slot) for slot in ConversationMemory.__slots__]
+        if self._times is not None:
+            state[0], state[1] = list(self._times), list(self._intents)
+        return state
+    
+    @staticmethod
+    def from_state(state: list) -> "ConversationMemory":
+        if not isinstance(state, list) or len(state) != len(ConversationMemory.__slots__):
+            raise ValueError("session state from an incompatible version")
+        memory = ConversationMemory()
+        for slot, value in zip(ConversationMemory.__slots__, state):
+            setattr(memory, slot, value)
+        if memory._times is not None:
+            memory._times, memory._intents = array("I", memory._times), bytearray(memory._intents)
+        for slot in ("_current_topic", "_offered_topic"):
+            setattr(memory, slot, memory._intern(getattr(memory, slot)))
+        memory._entities = tuple(map(sys.intern, memory._entities))
+        memory._topics = tuple(map(sys.intern, memory._topics))
+        if memory._reply_topics is not None:
+            memory._reply_topics = [memory._intern(topic) for topic in memory._reply_topics]
+        return memory
+
+class Synonyms:
+    """Handle word variations and synonyms"""
+    
+    SYNONYM_MAP = {
+        "when": ["when", "what time", "timing", "best time", "season", "period"],
+        "where": ["where", "location", "place", "area", "spot", "region", "find"],
+        "catch": ["catch", "fishing", "fish", "get", "find", "harvest", "hunt"],
+        "hilsa": ["hilsa", "ilish", "ilisha", "ilish fish"],
+        "catfish": ["catfish", "cat fish", "magur"],
+        "salmon": ["salmon", "salmon fish"],
+        "season": ["season", "time", "period", "month"],
+        "water": ["water", "river", "stream", "pond", "lake"],
+        "net": ["net", "jal", "nets", "fishing net"],
+        "good": ["good", "best", "ideal", "perfect", "suitable", "right"],
+        "bad": ["bad", "avoid", "not good", "unsuitable", "wrong"],
+        "why": ["why", "reason", "cause", "how come"],
+        "what": ["what", "which", "tell me"],
+        "equipment": ["equipment", "gear", "tools", "stuff", "things"],
+        "cost": ["cost", "price", "money", "expense", "income"],
+        "murky": ["murky", "dirty", "unclear", "muddy", "cloudy"],
+        "clean": ["clean", "clear", "pure", "fresh"]
+    }
+    
+    @staticmethod
+    def normalize(word: str) -> str:
+        """Convert word to canonical form"""
+        word_lower = word.lower().strip()
+        for canonical, variations in Synonyms.SYNONYM_MAP.items():
+            if word_lower in variations:
+                return canonical
+        return word_lower
+    
+    @staticmethod
+    def expand_query(query: str) -> List[str]:
+        """Expand query with synonyms"""
+        words = query.lower().split()
+        expanded = [query]
+        
+        for word in words:
+            normalized = Synonyms.normalize(word)
+            if normalized != word and normalized in Synonyms.SYNONYM_MAP:
+                # Add variation
+                new_query = query.lower().replace(word, normalized)
+                expanded.append(new_query)
+        
+        return expanded
+
+class FuzzyMatcher:
+    """Handle typos and fuzzy matching"""
+    
+    KNOWN_ENTITIES = {
+        "fish": ["hilsa", "catfish", "salmon", "mother fish", "fish fry"],
+        "seasons": ["monsoon", "winter", "summer", "spring", "autumn"],
+        "months": ["boisakh", "joishtho", "asharh", "srabon", "bhadro", "ashwin",
+                   "kartik", "ogrohayon", "poush", "magh", "falgun", "choitro"],
+        "locations": ["kurigram", "freshwater", "saltwater"],
+        "conditions": ["murky", "clean", "tide", "current", "amavasya"],
+        "gear": ["net", "darki", "current net", "rod", "tackle"]
+    }
+    
+    # Real words close enough to an entity to be "corrected" into it
+    KEEP_WORDS = {"next", "now", "month"}
+    
+    @staticmethod
+    def fuzzy_match(word: str, threshold: float = 0.75) -> Tuple[str, str, float]:
+        """Find best fuzzy match for a word"""
+        word_lower = word.lower().strip()
+        best_match = None
+        best_category = None
+        best_score = 0
+        
+        for category, entities in FuzzyMatcher.KNOWN_ENTITIES.items():
+            for entity in entities:
+                # Calculate similarity
+                score = SequenceMatcher(None, word_lower, entity).ratio()
+                
+                # Also check if word is contained in entity or vice versa
+                if word_lower in entity or entity in word_lower:
+                    score = max(score, 0.8)
+                
+                if score > best_score and score >= threshold:
+                    best_match = entity
+                    best_category = category
+                    best_score = score
+        
+        return best_match, best_category, best_score
+    
+    @staticmethod
+    def correct_message(message: str) -> str:
+        """Auto-correct typos in message"""
+        words = message.split()
+        corrected = []
+        
+        for word in words:
+            if word.lower().strip("?!.,") in FuzzyMatcher.KEEP_WORDS:
+                corrected.append(word)
+                continue
+            match, category, score = FuzzyMatcher.fuzzy_match(word, threshold=0.8)
+            if match and score > 0.85:
+                corrected.append(match)
+            else:
+                corrected.append(word)
+        
+        return " ".join(corrected)
+
+class QuestionAnalyzer:
+    """Analyze question structure and type"""
+    
+    @staticmethod
+    def classify_question_type(message: str) -> str:
+        """Determine question type"""
+        msg_lower = message.lower().strip()
+        
+        # Yes/No questions
+        if msg_lower.startswith(("is ", "are ", "can ", "should ", "do ", "does ", "will ")):
+            return "yes_no"
+        
+        # Temporal (when)
+        if msg_lower.startswith(("when ", "what time", "which season", "which month")):
+            return "temporal"
+        
+        # Location (where)
+        if msg_lower.startswith(("where ", "which place", "which location")):
+            return "location"
+        
+        # Reason (why)
+        if msg_lower.startswith(("why ", "how come", "what causes", "what makes")):
+            return "reason"
+        
+        # Method (how)
+        if msg_lower.startswith(("how ", "what way", "what method")):
+            return "method"
+        
+        # Choice (which)
+        if msg_lower.startswith(("which ", "what ", "which one")):
+            return "choice"
+        
+        return "general"
+    
+    @staticmethod
+    def detect_negation(message: str) -> Tuple[bool, List[str]]:
+        """Detect negative questions"""
+        negation_words = ["not", "don't", "dont", "avoid", "shouldn't", "shouldnt", 
+                         "can't", "cant", "never", "no", "bad"]
+        
+        words = message.lower().split()
+        for i, word in enumerate(words):
+            if word in negation_words:
+                context = words[max(0, i-1):min(len(words), i+4)]
+                return True, context
+        
+        return False, []
+    
+    @staticmethod
+    def extract_comparison(message: str) -> Optional[Tuple[str, str]]:
+        """Extract entities being compared"""
+        msg_lower = message.lower()
+        
+        comparison_patterns = [
+            ("vs", "vs"),
+            ("versus", "versus"),
+            ("or", "or"),
+            ("and", "and"),
+            ("between", "between")
+        ]
+        
+        for pattern, sep in comparison_patterns:
+            if pattern in msg_lower:
+                parts = msg_lower.split(pattern)
+                if len(parts) >= 2:
+                    return parts[0].strip(), parts[1].strip()
+        
+        return None
+
+class Template:
+    """A reply template split once into literal and field segments
+    
+    render() fills the fields in place and joins once. A field with no value
+    keeps its {placeholder} text instead of failing the whole template.
+    """
+    
+    __slots__ = ("source", "segments", "fields")
+    
+    def __init__(self, source: str):
+        self.source = source
+        segments, fields = [], []
+        for literal, field, spec, conversion in string.Formatter().parse(source):
+            if literal:
+                segments.append(literal)
+            if field is not None:
+                if spec or conversion or not field.isidentifier():
+                    raise ValueError(f"Template fields are plain names: {{{field}}} in {source!r}")
+                fields.append((len(segments), field))
+                segments.append(field)
+        self.segments = tuple(segments)
+        self.fields = tuple(fields)  # (segment position, field name)
+    
+    def render(self, values: Dict) -> str:
+        if not self.fields:
+            return self.source
+        parts = list(self.segments)
+        for i, name in self.fields:
+            parts[i] = str(values[name]) if name in values else "{" + name + "}"
+        return "".join(parts)
+
+
+# The current turn's RNG for reply wording; seeded per turn when REPLY_SEED is set
+reply_rng: ContextVar[Optional[random.Random]] = ContextVar("reply_rng", default=None)
+_reply_rng_default = random.Random()
+
+
+def reply_random() -> random.Random:
+    return reply_rng.get() or _reply_rng_default
+
+
+class ResponseGenerator:
+    """Generate natural, varied responses"""
+    
+    # Response templates with personality
+    TEMPLATES = {
+        "greeting": [
+            "Hello! I'm your fishing expert. {capability} What would you like to know?",
+            "Hi there! Great to see you. {capability} How can I help you today?",
+            "Hey! {capability} I'm here to help with all your fishing questions!",
+        ],
+        "season_answer": [
+            "Perfect timing question! {fish} is best caught during {season}. {extra}",
+            "Great! For {fish}, the ideal season is {season}. {extra}",
+            "You'll have the best luck with {fish} in {season}. {extra}",
+            "{season} is when {fish} is most abundant and active. {extra}"
+        ],
+        "location_answer": [
+            "{fish} can be found in {location} environments. {extra}",
+            "You'll find {fish} in {location} areas. {extra}",
+            "Look for {fish} in {location} waters. {extra}"
+        ],
+        "acknowledgment": [
+            "Great question!",
+            "That's a smart question!",
+            "Excellent!",
+            "I'm glad you asked!",
+            "Good thinking!"
+        ],
+        "follow_up": [
+            "Would you like to know more about {topic}?",
+            "Want to explore {topic} further?",
+            "Interested in learning about {topic}?",
+            "Should I tell you about {topic}?",
+            "Curious about {topic}?"
+        ],
+        "clarification": [
+            "Just to clarify, are you asking about {option}?",
+            "I found information on a few topics. Did you mean {option}?",
+            "To make sure I help you right, are you interested in {option}?"
+        ],
+        "no_data": [
+            "I don't have specific data on that, but I can tell you about {alternative}!",
+            "That's not in my knowledge base yet, but I know about {alternative}!",
+            "I wish I had that info! But I can help with {alternative}."
+        ],
+        "affirmative_response": [
+            "Perfect! Let me share more details.",
+            "Great! Here's what I know:",
+            "Absolutely! Here you go:",
+            "Sure thing! Let me explain:"
+        ],
+        "transition": [
+            "Speaking of {topic},",
+            "That reminds me,",
+            "Interestingly,",
+            "By the way,",
+            "Also worth noting,"
+        ]
+    }
+    
+    # TEMPLATES, compiled once (below the class)
+    COMPILED: Dict[str, Tuple[Template, ...]] = {}
+    
+    ENTHUSIASM = ("Great! ", "Awesome! ", "Nice! ")
+    EXPERTISE = ("Based on my knowledge, ", "From experience, ", "Here's what I know: ")
+    
+    @staticmethod
+    def pick_template(template_type: str, **kwargs) -> str:
+        """Pick a template with the turn's RNG and fill it"""
+        templates = ResponseGenerator.COMPILED.get(template_type)
+        if not templates:
+            return ""
+        return reply_random().choice(templates).render(kwargs)
+    
+    @staticmethod
+    def turn_rng(message: str, turn: int, topic: Optional[str], seed: str = REPLY_SEED) -> random.Random:
+        """An RNG fixed by the seed and the turn, so the same question in the same state reads the same"""
+        key = hashlib.sha256(f"{seed}\0{turn}\0{topic}\0{message}".encode()).digest()
+        return random.Random(int.from_bytes(key[:8], "big"))
+    
+    @staticmethod
+    def add_personality(response: str, stage: str) -> str:
+        """Add personality based on conversation stage"""
+        rng = reply_random()
+        # Add enthusiasm in early stages
+        if stage in ["greeting", "exploring"]:
+            if rng.random() < 0.3:  # 30% chance
+                response = rng.choice(ResponseGenerator.ENTHUSIASM) + response
+        
+        # Add expert touch in deep stages
+        if stage == "expert":
+            if rng.random() < 0.2:  # 20% chance
+                response = rng.choice(ResponseGenerator.EXPERTISE) + response
+        
+        return response
+
+
+ResponseGenerator.COMPILED = {
+    template_type: tuple(Template(template) for template in templates)
+    for template_type, templates in ResponseGenerator.TEMPLATES.items()
+}
+
+class KnowledgeGraph:
+    """Enhanced knowledge retrieval"""
+    
+    # Relation types the handlers understand; ingest_graph.py rejects anything else
+    RELATIONS = frozenset({
+        "SEASONALLY_AVAILABLE_IN", "AVAILABLE_IN", "CATCH_IN", "FOUND_IN", "REQUIRES",
+        "SUITABLE_FOR", "NOT_SUITABLE_FOR", "CAUSES", "CAUSED_BY", "AFFECTED_BY", "DIVIDED_TO",
+    })
+    
+    # Last good result per entity, served while the graph backend is unavailable; least
+    # recently refreshed first. Breaker and fan-out threads share it, hence the lock
+    _stale_cache: "OrderedDict[str, Dict]" = OrderedDict()
+    _stale_lock = threading.Lock()
+    
+    @staticmethod
+    def get_comprehensive_info(entity_name: str) -> Dict:
+        """Get all information about an entity, falling back to stale data when the backend is down"""
+        if not entity_name:
+            # Nothing extracted from the message: nothing matches (as a null $entity never did)
+            return {"entity": None, "labels": [], "outgoing": [], "incoming": []}
+        key = entity_name.lower()
+        cached = graph_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        try:
+            data = graph_breaker.call(lambda: get_graph_backend().comprehensive_info(entity_name))
+        except DependencyUnavailable:
+            with KnowledgeGraph._stale_lock:
+                stale = KnowledgeGraph._stale_cache.get(key)
+            if stale is not None:
+                return stale
+            if SnapshotStore.snapshot is not None:
+                return SnapshotStore.snapshot.comprehensive_info(entity_name)
+            raise
+        
+        graph_cache.set(key, data)
+        with KnowledgeGraph._stale_lock:
+            stale = KnowledgeGraph._stale_cache
+            stale[key] = data
+            stale.move_to_end(key)
+            while len(stale) > STALE_CACHE_SIZE:
+                stale.popitem(last=False)
+        return data
+    
+    @staticmethod
+    def get_suggestions(current_entity: str, discussed_topics: set) -> List[str]:
+        """Get related topics user might be interested in"""
+        index = SnapshotStore.index("suggestions")
+        if index is not None:
+            ranked = index.suggest(current_entity)
+            if ranked is not None:
+                skip = {topic.lower() for topic in discussed_topics} | {current_entity.lower()}
+                return [topic for topic in ranked if topic.lower() not in skip][:3]
+        
+        # No precomputed ranking yet: neighbours in query order
+        info = KnowledgeGraph.get_comprehensive_info(current_entity)
+        suggestions = []
+        
+        # Get related entities
+        for rel in info["outgoing"]:
+            topic = rel["target"]
+            if topic not in discussed_topics and topic != current_entity:
+                suggestions.append(topic)
+        
+        for rel in info["incoming"]:
+            topic = rel["source"]
+            if topic not in discussed_topics and topic != current_entity:
+                suggestions.append(topic)
+        
+        return suggestions[:3]  # Top 3 suggestions
+    
+    @staticmethod
+    def get_causal_chains(entity_name: str, direction: str) -> List[List[str]]:
+        """Ranked multi-hop chains from the causal index ("causes" or "effects"), entity first"""
+        index = SnapshotStore.index("causal")
+        if index is None:
+            return []
+        return index.chains(entity_name, direction)
+    
+    @staticmethod
+    def get_calendar(month: int) -> Dict:
+        """What's in season in a Bangla month (0 = Boisakh), from the calendar index"""
+        index = SnapshotStore.index("calendar")
+        if index is not None:
+            return index.months[month]
+        
+        # No index yet: scan the month's and season's nodes live
+        name, _, season, _ = CalendarIndex.MONTHS[month]
+        infos = [KnowledgeGraph.get_comprehensive_info(name), KnowledgeGraph.get_comprehensive_info(season)]
+        return CalendarIndex.entry(month, [
+            (r["relation"], r["source"], r["labels"]) for info in infos for r in info["incoming"]
+        ], [r["target"] for info in infos for r in info["outgoing"] if r["relation"] == "CAUSES"])
+
+# ============= GRAPH BACKENDS =============
+
+class QueryLog:
+    """Per-template statistics for graph queries, with plans for the slow ones
+    
+    Queries are parameterised, so the text is the template: every entity
+    lookup folds into one entry. Each run adds its time and rows (and db hits,
+    when it ran under PROFILE). A run past slow_ms queues a plan capture for
+    its template - PROFILE for Cypher, EXPLAIN QUERY PLAN for SQLite - on a
+    background thread, at most once per plan_interval; the newest `plans`
+    are kept.
+    """
+    
+    def __init__(self, slow_ms: float = SLOW_QUERY_MS, plan_interval: float = SLOW_QUERY_PLAN_INTERVAL,
+                 plans: int = SLOW_QUERY_PLANS):
+        self.slow_ms = slow_ms
+        self.plan_interval = plan_interval
+        self.plans = plans
+        self._lock = threading.Lock()
+        self._templates = {}
+        self._planner = ThreadPoolExecutor(max_workers=1, thread_name_prefix="query-plans")
+    
+    def record(self, backend: str, text: str, params: Dict, started: float, rows: int,
+               plan: Optional[Dict] = None, explain=None):
+        """Fold one finished query in; explain(params) -> plan is called later if it was slow"""
+        ms = (time.perf_counter() - started) * 1000
+        text = " ".join(text.split())
+        db_hits = plan["db_hits"] if plan else None
+        trace = current_turn.get()
+        if trace is not None:
+            trace.query(backend, text, params, ms, rows, db_hits)
+        
+        now = time.time()
+        slow = ms >= self.slow_ms
+        with self._lock:
+            stats = self._templates.get((backend, text))
+            if stats is None:
+                stats = self._templates[(backend, text)] = {
+                    "backend": backend, "query": text, "count": 0, "slow": 0, "total_ms": 0.0, "max_ms": 0.0,
+                    "rows_total": 0, "rows_max": 0, "profiled": 0, "db_hits_total": 0, "db_hits_max": 0,
+                    "last_seen": None, "plans": deque(maxlen=self.plans), "_planned_at": 0.0,
+                }
+            stats["count"] += 1
+            stats["total_ms"] += ms
+            stats["max_ms"] = max(stats["max_ms"], ms)
+            stats["rows_total"] += rows
+            stats["rows_max"] = max(stats["rows_max"], rows)
+            stats["last_seen"] = now
+            if db_hits is not None:
+                stats["profiled"] += 1
+                stats["db_hits_total"] += db_hits
+                stats["db_hits_max"] = max(stats["db_hits_max"], db_hits)
+            if not slow:
+                return
+            stats["slow"] += 1
+            due = now - stats["_planned_at"] >= self.plan_interval
+            if due and (plan is not None or explain is not None):
+                stats["_planned_at"] = now
+        if not due:
+            return
+        if plan is not None:
+            self._keep_plan(stats, plan, ms, params)
+        elif explain is not None:
+            self._planner.submit(self._capture, stats, explain, ms, params)
+    
+    def _capture(self, stats: Dict, explain, ms: float, params: Dict):
+        try:
+            self._keep_plan(stats, explain(params), ms, params)
+        except Exception as e:
+            logger.info("Plan capture failed for %s query: %s", stats["backend"], e)
+    
+    def _keep_plan(self, stats: Dict, plan: Dict, ms: float, params: Dict):
+        with self._lock:
+            stats["plans"].append(dict(plan, captured=datetime.now().isoformat(timespec="seconds"),
+                                       ms=round(ms, 2), params=params))
+    
+    def snapshot(self) -> Dict:
+        """Templates by total time spent, costliest first"""
+        templates = []
+        with self._lock:
+            for stats in self._templates.values():
+                entry = {key: value for key, value in stats.items() if not key.startswith("_")}
+                entry.update(
+                    total_ms=round(stats["total_ms"], 2),
+                    max_ms=round(stats["max_ms"], 2),
+                    mean_ms=round(stats["total_ms"] / stats["count"], 2),
+                    last_seen=datetime.fromtimestamp(stats["last_seen"]).isoformat(timespec="seconds"),
+                    plans=list(stats["plans"])[::-1],
+                )
+                templates.append(entry)
+        templates.sort(key=lambda stats: stats["total_ms"], reverse=True)
+        return {"slow_ms": self.slow_ms, "profile_all": GRAPH_PROFILE_ALL, "templates": templates}
+
+
+query_log = QueryLog()
+
+
+class GraphBackend:
+    """A knowledge-graph store; every implementation answers with the same shapes
+    
+    Entity lookup prefers an exact (case-insensitive) name, then the first
+    name containing it in node order; neighbour lists keep edge order and are
+    capped at `limit`.
+    """
+    
+    name = "graph"
+    
+    def comprehensive_info(self, entity_name: str, limit: int = 50) -> Dict:
+        """{"entity", "labels", "outgoing": [{relation, target, labels}], "incoming": [{relation, source, labels}]}"""
+        raise NotImplementedError
+    
+    def export(self) -> Dict:
+        """The /graph payload, {"nodes": [{id, label}], "edges": [{from, to, label}]}"""
+        return self.snapshot().export()
+    
+    def snapshot(self) -> "GraphSnapshot":
+        raise NotImplementedError
+    
+    def ping(self):
+        """Raise when the store can't answer"""
+    
+    def warm_up(self):
+        self.ping()
+    
+    def close(self):
+        pass
+
+
+class Neo4jBackend(GraphBackend):
+    """The Aura graph, over the pooled driver"""
+    
+    name = "neo4j"
+    
+    INFO_CYPHER = """
+    MATCH (e)
+    WHERE toLower(e.name) CONTAINS toLower($entity)
+    WITH e ORDER BY CASE WHEN toLower(e.name) = toLower($entity) THEN 0 ELSE 1 END, id(e)
+    LIMIT 1
+    RETURN coalesce(e.name, labels(e)[0], 'Node') AS entity,
+           labels(e) AS labels,
+           [(e)-[r]->(t) | {relation: type(r), target: coalesce(t.name, labels(t)[0], 'Node'), labels: labels(t)}][..$limit] AS outgoing,
+           [(e)<-[r]-(s) | {relation: type(r), source: coalesce(s.name, labels(s)[0], 'Node'), labels: labels(s)}][..$limit] AS incoming
+    """
+    
+    EXPORT_CYPHER = "MATCH (n)-[r]->(m) RETURN n, r, m ORDER BY id(r)"
+    
+    def comprehensive_info(self, entity_name: str, limit: int = 50) -> Dict:
+        data = {"entity": None, "labels": [], "outgoing": [], "incoming": []}
+        records = self._run(Neo4jBackend.INFO_CYPHER, entity=entity_name, limit=limit)
+        record = records[0] if records else None
+        if record is not None:
+            data["entity"] = record["entity"]
+            data["labels"] = record["labels"] or []
+            data["outgoing"] = [dict(r, labels=r["labels"] or []) for r in record["outgoing"]]
+            data["incoming"] = [dict(r, labels=r["labels"] or []) for r in record["incoming"]]
+        return data
+    
+    def _run(self, cypher: str, **params) -> List:
+        """Run a read query to completion, logging its time, rows and (under PROFILE) db hits"""
+        neo4j = lazy_import("neo4j")
+        started = time.perf_counter()
+        with graph_session() as session:
+            text = "PROFILE " + cypher if GRAPH_PROFILE_ALL else cypher
+            result = session.run(neo4j.Query(text, timeout=GRAPH_TIMEOUT), **params)
+            records = list(result)
+            profile = result.consume().profile
+        query_log.record(self.name, cypher, params, started, len(records),
+                         plan=Neo4jBackend.plan_summary(profile) if profile else None,
+                         explain=partial(Neo4jBackend._profile, cypher))
+        return records
+    
+    @staticmethod
+    def _profile(cypher: str, params: Dict) -> Dict:
+        """Re-run a query under PROFILE for its plan"""
+        neo4j = lazy_import("neo4j")
+        with graph_session() as session:
+            # consume() discards the rows; only the plan is wanted
+            summary = session.run(neo4j.Query("PROFILE " + cypher, timeout=GRAPH_TIMEOUT), **params).consume()
+        return Neo4jBackend.plan_summary(summary.profile)
+    
+    @staticmethod
+    def plan_summary(profile: Dict) -> Dict:
+        """Flatten a PROFILE tree depth-first into operators, with the total db hits
+        
+        Scan operators (AllNodesScan, NodeByLabelScan) where a seek was
+        expected mean an index isn't being used.
+        """
+        operators = []
+        
+        def walk(node: Dict, depth: int):
+            operators.append({
+                "operator": node.get("operatorType", "").split("@")[0],
+                "depth": depth,
+                "db_hits": node.get("dbHits", 0),
+                "rows": node.get("rows", 0),
+                "details": node.get("args", {}).get("Details", ""),
+            })
+            for child in node.get("children", []):
+                walk(child, depth + 1)
+        
+        walk(profile, 0)
+        return {"db_hits": sum(op["db_hits"] for op in operators), "rows": profile.get("rows", 0),
+                "operators": operators}
+    
+    def export(self) -> Dict:
+        def fetch_graph(tx):
+            started = time.perf_counter()
+            result = tx.run(Neo4jBackend.EXPORT_CYPHER)
+            nodes = {}
+            edges = []
+            for record in result:
+                n = record["n"]
+                m = record["m"]
+                r = record["r"]
+                
+                n_id = n.id
+                if n_id not in nodes:
+                    nodes[n_id] = {
+                        "id": n_id,
+                        "label": n.get("name", "") or list(n.labels)[0] if n.labels else "Node"
+                    }
+                
+                m_id = m.id
+                if m_id not in nodes:
+                    nodes[m_id] = {
+                        "id": m_id,
+                        "label": m.get("name", "") or list(m.labels)[0] if m.labels else "Node"
+                    }
+                
+                edges.append({
+                    "from": n_id,
+                    "to": m_id,
+                    "label": r.type
+                })
+            query_log.record(self.name, Neo4jBackend.EXPORT_CYPHER, {}, started, len(edges),
+                             explain=partial(Neo4jBackend._profile, Neo4jBackend.EXPORT_CYPHER))
+            return {"nodes": list(nodes.values()), "edges": edges}
+        
+        with graph_session() as session:
+            return session.execute_read(fetch_graph)
+    
+    def snapshot(self) -> "GraphSnapshot":
+        return GraphSnapshot.from_neo4j()
+    
+    def ping(self):
+        _warm_neo4j_connection()
+    
+    def warm_up(self):
+        """Pay the TLS handshake and routing-table fetch before the first user does"""
+        get_driver().verify_connectivity()
+        # Open several sessions at once so the pool holds that many live connections
+        with ThreadPoolExecutor(max_workers=NEO4J_WARM_CONNECTIONS) as pool:
+            list(pool.map(lambda _: _warm_neo4j_connection(), range(NEO4J_WARM_CONNECTIONS)))
+
+
+class InMemoryBackend(GraphBackend):
+    """The graph snapshot file, held in memory; for offline use and tests"""
+    
+    name = "memory"
+    
+    def __init__(self, path: str = GRAPH_SNAPSHOT_PATH, graph: Optional["GraphSnapshot"] = None):
+        self.path = path
+        self.graph = graph
+    
+    def snapshot(self) -> "GraphSnapshot":
+        if self.graph is None:
+            if not os.path.exists(self.path):
+                raise RuntimeError(f"No graph snapshot at {self.path}; run ingest_graph.py --offline")
+            self.graph = GraphSnapshot.load(self.path)
+        return self.graph
+    
+    def comprehensive_info(self, entity_name: str, limit: int = 50) -> Dict:
+        return self.snapshot().comprehensive_info(entity_name, limit)
+    
+    def ping(self):
+        self.snapshot()
+
+
+class SQLiteBackend(GraphBackend):
+    """The graph in a local SQLite file, indexed for the chatbot's lookups
+    
+    pos is a node's position in snapshot order and seq an edge's, so ordering
+    matches the other backends. The edge indexes cover the neighbour queries;
+    an empty database is filled from the snapshot file on first use.
+    """
+    
+    name = "sqlite"
+    
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS nodes (
+        pos INTEGER PRIMARY KEY, id INTEGER NOT NULL, name TEXT NOT NULL,
+        name_lower TEXT NOT NULL, labels TEXT NOT NULL, aliases TEXT);
+    CREATE TABLE IF NOT EXISTS edges (
+        seq INTEGER PRIMARY KEY, src INTEGER NOT NULL, dst INTEGER NOT NULL, type TEXT NOT NULL);
+    CREATE INDEX IF NOT EXISTS nodes_by_name ON nodes (name_lower, pos, name, labels);
+    CREATE INDEX IF NOT EXISTS edges_out ON edges (src, seq, type, dst);
+    CREATE INDEX IF NOT EXISTS edges_in ON edges (dst, seq, type, src);
+    """
+    
+    def __init__(self, path: str = GRAPH_SQLITE_PATH, seed_path: Optional[str] = GRAPH_SNAPSHOT_PATH):
+        self.path = path
+        self._local = threading.local()  # one connection per thread
+        self._connections = []
+        conn = self._connection()
+        conn.executescript(SQLiteBackend.SCHEMA)
+        empty = conn.execute("SELECT NOT EXISTS (SELECT 1 FROM nodes)").fetchone()[0]
+        if empty and seed_path and os.path.exists(seed_path):
+            self.import_snapshot(GraphSnapshot.load(seed_path))
+    
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=GRAPH_TIMEOUT)
+            self._local.conn = conn
+            self._connections.append(conn)
+        return conn
+    
+    def import_snapshot(self, snapshot: "GraphSnapshot"):
+        """Replace the stored graph with a snapshot, in one transaction"""
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM edges")
+            conn.execute("DELETE FROM nodes")
+            conn.executemany("INSERT INTO nodes VALUES (?, ?, ?, ?, ?, ?)", (
+                (i, node["id"], node["name"], node["name"].lower(), json.dumps(node["labels"]),
+                 json.dumps(node["aliases"]) if node.get("aliases") else None)
+                for i, node in enumerate(snapshot.nodes)))
+            conn.executemany("INSERT INTO edges (src, dst, type) VALUES (?, ?, ?)", (
+                (i, j, relation) for edge in snapshot.edges
+                for i, j, relation in [(snapshot.index_of.get(edge["from"]), snapshot.index_of.get(edge["to"]), edge["type"])]
+                if i is not None and j is not None))
+    
+    def comprehensive_info(self, entity_name: str, limit: int = 50) -> Dict:
+        data = {"entity": None, "labels": [], "outgoing": [], "incoming": []}
+        needle = entity_name.lower()
+        row = self._query("SELECT pos, name, labels FROM nodes WHERE name_lower = ? ORDER BY pos LIMIT 1",
+                          (needle,), one=True)
+        if row is None:
+            row = self._query("SELECT pos, name, labels FROM nodes WHERE instr(name_lower, ?) > 0 ORDER BY pos LIMIT 1",
+                              (needle,), one=True)
+        if row is None:
+            return data
+        pos, data["entity"], labels = row
+        data["labels"] = json.loads(labels)
+        for relation, name, labels in self._query(
+                "SELECT e.type, n.name, n.labels FROM edges e JOIN nodes n ON n.pos = e.dst "
+                "WHERE e.src = ? ORDER BY e.seq LIMIT ?", (pos, limit)):
+            data["outgoing"].append({"relation": relation, "target": name, "labels": json.loads(labels)})
+        for relation, name, labels in self._query(
+                "SELECT e.type, n.name, n.labels FROM edges e JOIN nodes n ON n.pos = e.src "
+                "WHERE e.dst = ? ORDER BY e.seq LIMIT ?", (pos, limit)):
+            data["incoming"].append({"relation": relation, "source": name, "labels": json.loads(labels)})
+        return data
+    
+    def _query(self, sql: str, params: Tuple, one: bool = False):
+        """Run a lookup, logging its time and rows"""
+        started = time.perf_counter()
+        cursor = self._connection().execute(sql, params)
+        rows = cursor.fetchone() if one else cursor.fetchall()
+        count = (rows is not None) if one else len(rows)
+        query_log.record(self.name, sql, list(params), started, int(count), explain=partial(self._explain, sql))
+        return rows
+    
+    def _explain(self, sql: str, params: List) -> Dict:
+        """EXPLAIN QUERY PLAN as operators; SQLite doesn't count db hits"""
+        depth = {0: -1}
+        operators = []
+        for node, parent, _, detail in self._connection().execute("EXPLAIN QUERY PLAN " + sql, params):
+            depth[node] = depth.get(parent, -1) + 1
+            operators.append({"operator": detail.split(" ")[0], "depth": depth[node], "details": detail})
+        return {"db_hits": None, "operators": operators}
+    
+    def snapshot(self) -> "GraphSnapshot":
+        conn = self._connection()
+        nodes, ids = [], []
+        for graph_id, name, labels, aliases in conn.execute("SELECT id, name, labels, aliases FROM nodes ORDER BY pos"):
+            node = {"id": graph_id, "name": name, "labels": json.loads(labels)}
+            if aliases:
+                node["aliases"] = json.loads(aliases)
+            nodes.append(node)
+            ids.append(graph_id)
+        edges = [{"from": ids[src], "to": ids[dst], "type": relation}
+                 for src, dst, relation in conn.execute("SELECT src, dst, type FROM edges ORDER BY seq")]
+        return GraphSnapshot(nodes, edges)
+    
+    def export(self) -> Dict:
+        conn = self._connection()
+        nodes, edges = {}, []
+        for src_id, src_name, src_labels, dst_id, dst_name, dst_labels, relation in conn.execute(
+                "SELECT a.id, a.name, a.labels, b.id, b.name, b.labels, e.type FROM edges e "
+                "JOIN nodes a ON a.pos = e.src JOIN nodes b ON b.pos = e.dst ORDER BY e.seq"):
+            for graph_id, name, labels in ((src_id, src_name, src_labels), (dst_id, dst_name, dst_labels)):
+                if graph_id not in nodes:
+                    nodes[graph_id] = {"id": graph_id, "label": name if json.loads(labels) else "Node"}
+            edges.append({"from": src_id, "to": dst_id, "label": relation})
+        return {"nodes": list(nodes.values()), "edges": edges}
+    
+    def ping(self):
+        self._connection().execute("SELECT 1").fetchone()
+    
+    def close(self):
+        for conn in self._connections:
+            conn.close()
+        self._connections = []
+        self._local = threading.local()
+
+
+# ============= GRAPH SNAPSHOT & PRECOMPUTED INDEXES =============
+
+class GraphSnapshot:
+    """In-memory copy of the whole graph; the input to every precomputed index"""
+    
+    # Ordered so every backend resolves names and lists neighbours the same way
+    NODES_CYPHER = "MATCH (n) RETURN id(n) AS id, n.name AS name, labels(n) AS labels, n.aliases AS aliases ORDER BY id"
+    EDGES_CYPHER = "MATCH (n)-[r]->(m) RETURN id(n) AS src, id(m) AS dst, type(r) AS type ORDER BY id(r)"
+    
+    def __init__(self, nodes: List[Dict], edges: List[Dict]):
+        self.nodes = nodes  # [{"id", "name", "labels"}]
+        self.edges = edges  # [{"from", "to", "type"}], by node id
+        self.version = hashlib.sha1(
+            json.dumps([nodes, edges], sort_keys=True, default=str).encode()).hexdigest()[:12]
+        self.index_of = {node["id"]: i for i, node in enumerate(nodes)}
+        self.names = [node["name"] for node in nodes]
+        self._by_name = {}
+        for i, name in enumerate(self.names):
+            self._by_name.setdefault(name.lower(), i)
+        
+        # (relation, other node index) per node, in both directions
+        self.outgoing = [[] for _ in nodes]
+        self.incoming = [[] for _ in nodes]
+        for edge in edges:
+            src, dst = self.index_of.get(edge["from"]), self.index_of.get(edge["to"])
+            if src is not None and dst is not None:
+                self.outgoing[src].append((edge["type"], dst))
+                self.incoming[dst].append((edge["type"], src))
+    
+    def find_exact(self, name: str) -> Optional[int]:
+        return self._by_name.get(name.lower())
+    
+    def find(self, entity_name: str) -> Optional[int]:
+        """Node index by exact name, else the first name containing it (as the Cypher lookup does)"""
+        needle = entity_name.lower()
+        if needle in self._by_name:
+            return self._by_name[needle]
+        for i, name in enumerate(self.names):
+            if needle in name.lower():
+                self._by_name[needle] = i
+                return i
+        return None
+    
+    def comprehensive_info(self, entity_name: str, limit: int = 50) -> Dict:
+        """Same shape as KnowledgeGraph.get_comprehensive_info, answered from memory"""
+        data = {"entity": None, "labels": [], "outgoing": [], "incoming": []}
+        i = self.find(entity_name)
+        if i is None:
+            return data
+        data["entity"] = self.names[i]
+        data["labels"] = list(self.nodes[i]["labels"])
+        for relation, j in self.outgoing[i][:limit]:
+            data["outgoing"].append({"relation": relation, "target": self.names[j], "labels": list(self.nodes[j]["labels"])})
+        for relation, j in self.incoming[i][:limit]:
+            data["incoming"].append({"relation": relation, "source": self.names[j], "labels": list(self.nodes[j]["labels"])})
+        return data
+    
+    def export(self) -> Dict:
+        """The /graph payload: every node with an edge, labelled by name"""
+        nodes, edges = {}, []
+        for edge in self.edges:
+            ends = [self.index_of.get(edge["from"]), self.index_of.get(edge["to"])]
+            if None in ends:
+                continue
+            for k in ends:
+                node = self.nodes[k]
+                if node["id"] not in nodes:
+                    nodes[node["id"]] = {"id": node["id"], "label": node["name"] if node["labels"] else "Node"}
+            edges.append({"from": edge["from"], "to": edge["to"], "label": edge["type"]})
+        return {"nodes": list(nodes.values()), "edges": edges}
+    
+    @staticmethod
+    def from_neo4j() -> "GraphSnapshot":
+        neo4j = lazy_import("neo4j")
+        with graph_session() as session:
+            nodes = []
+            for record in session.run(neo4j.Query(GraphSnapshot.NODES_CYPHER, timeout=SNAPSHOT_TIMEOUT)):
+                labels = record["labels"] or []
+                node = {
+                    "id": record["id"],
+                    "name": record["name"] or (labels[0] if labels else "Node"),
+                    "labels": labels,
+                }
+                if record["aliases"]:
+                    node["aliases"] = list(record["aliases"])
+                nodes.append(node)
+            edges = [
+                {"from": record["src"], "to": record["dst"], "type": record["type"]}
+                for record in session.run(neo4j.Query(GraphSnapshot.EDGES_CYPHER, timeout=SNAPSHOT_TIMEOUT))
+            ]
+        return GraphSnapshot(nodes, edges)
+    
+    @staticmethod
+    def load(path: str) -> "GraphSnapshot":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return GraphSnapshot(data["nodes"], data["edges"])
+    
+    def save(self, path: str):
+        """Write atomically so a crash never leaves a half-written snapshot"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": self.version, "nodes": self.nodes, "edges": self.edges}, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+
+class SnapshotStore:
+    """The current snapshot and the indexes built from it, swapped in together"""
+    
+    snapshot: Optional[GraphSnapshot] = None
+    indexes: Dict[str, object] = {}
+    builders: Dict[str, object] = {}  # index name -> build(snapshot)
+    
+    @staticmethod
+    def register(name: str, build):
+        SnapshotStore.builders[name] = build
+    
+    @staticmethod
+    def index(name: str):
+        return SnapshotStore.indexes.get(name)
+    
+    @staticmethod
+    def install(snapshot: GraphSnapshot):
+        """Build every registered index, then publish snapshot and indexes at once"""
+        indexes = {}
+        for name, build in SnapshotStore.builders.items():
+            started = time.perf_counter()
+            try:
+                indexes[name] = build(snapshot)
+            except Exception as e:
+                logger.warning("Building the %s index failed: %s", name, e)
+                continue
+            logger.info("Built %s index for graph %s in %.0fms", name, snapshot.version,
+                        (time.perf_counter() - started) * 1000)
+        SnapshotStore.snapshot, SnapshotStore.indexes = snapshot, indexes
+    
+    @staticmethod
+    def load_file(path: str = GRAPH_SNAPSHOT_PATH) -> bool:
+        if not os.path.exists(path):
+            return False
+        SnapshotStore.install(GraphSnapshot.load(path))
+        return True
+    
+    @staticmethod
+    def refresh(path: str = GRAPH_SNAPSHOT_PATH) -> bool:
+        """Reload the graph from the backend; indexes are rebuilt only when it actually changed"""
+        snapshot = get_graph_backend().snapshot()
+        current = SnapshotStore.snapshot
+        if current is not None and current.version == snapshot.version:
+            return False
+        SnapshotStore.install(snapshot)
+        snapshot.save(path)
+        return True
+
+
+async def snapshot_refresh_loop():
+    """Boot from the saved snapshot, then keep it in step with the graph backend"""
+    try:
+        await asyncio.to_thread(SnapshotStore.load_file)
+    except Exception as e:
+        logger.warning("Could not load graph snapshot: %s", e)
+    while True:
+        try:
+            await asyncio.to_thread(SnapshotStore.refresh)
+        except Exception as e:
+            logger.warning("Graph snapshot refresh failed: %s", e)
+        await asyncio.sleep(SNAPSHOT_REFRESH_SECONDS)
+
+
+class SuggestionIndex:
+    """Top related topics per node, ranked offline so a lookup is a slice
+    
+    A candidate's score is its relation-weighted proximity (direct neighbours,
+    plus two-hop neighbours damped by SUGGESTION_TWO_HOP_DECAY, not passing
+    through hubs) times a damped (fourth-root) PageRank over the weighted,
+    undirected graph. Node i's ranking is neighbors[offsets[i]:offsets[i + 1]].
+    """
+    
+    RELATION_WEIGHTS = {
+        "SEASONALLY_AVAILABLE_IN": 1.0,
+        "FOUND_IN": 1.0,
+        "CATCH_IN": 0.9,
+        "REQUIRES": 0.9,
+        "AVAILABLE_IN": 0.8,
+        "CAUSED_BY": 0.8,
+        "CAUSES": 0.8,
+        "AFFECTED_BY": 0.7,
+        "SUITABLE_FOR": 0.7,
+        "NOT_SUITABLE_FOR": 0.7,
+        "DIVIDED_TO": 0.6,
+    }
+    DEFAULT_WEIGHT = 0.5
+    
+    def __init__(self, snapshot: GraphSnapshot, offsets, neighbors, scores):
+        self.snapshot = snapshot
+        self.offsets = offsets  # int32, len n + 1
+        self.neighbors = neighbors  # int32 node indexes, best first
+        self.scores = scores  # float32, parallel to neighbors
+    
+    def suggest(self, entity_name: str) -> Optional[List[str]]:
+        """Ranked topic names, or None when the entity isn't in the snapshot"""
+        i = self.snapshot.find(entity_name)
+        if i is None:
+            return None
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return [self.snapshot.names[j] for j in self.neighbors[start:end]]
+    
+    @staticmethod
+    def pagerank(np, n: int, rows, cols, weights, damping: float = 0.85,
+                 iterations: int = 50, tol: float = 1e-9):
+        out_weight = np.bincount(rows, weights=weights, minlength=n)
+        dangling = out_weight == 0
+        safe_out = np.where(dangling, 1.0, out_weight)
+        rank = np.full(n, 1.0 / n)
+        for _ in range(iterations):
+            spread = np.bincount(cols, weights=(rank / safe_out)[rows] * weights, minlength=n)
+            updated = damping * (spread + rank[dangling].sum() / n) + (1 - damping) / n
+            converged = np.abs(updated - rank).sum() < tol
+            rank = updated
+            if converged:
+                break
+        return rank
+    
+    @staticmethod
+    def build(snapshot: GraphSnapshot, top_k: int = SUGGESTION_TOP_K) -> "SuggestionIndex":
+        np = lazy_import("numpy")
+        n = len(snapshot.nodes)
+        src, dst, w = [], [], []
+        for i, edges in enumerate(snapshot.outgoing):
+            for relation, j in edges:
+                if i != j:
+                    src.append(i)
+                    dst.append(j)
+                    w.append(SuggestionIndex.RELATION_WEIGHTS.get(relation, SuggestionIndex.DEFAULT_WEIGHT))
+        
+        # Suggestions follow relations both ways
+        rows = np.array(src + dst, dtype=np.int64)
+        cols = np.array(dst + src, dtype=np.int64)
+        weights = np.array(w + w, dtype=np.float64)
+        rank = SuggestionIndex.pagerank(np, n, rows, cols, weights)
+        popularity = (rank / rank.max()) ** 0.25 if n else rank
+        
+        # CSR adjacency
+        order = np.argsort(rows, kind="stable")
+        cols, weights = cols[order], weights[order]
+        degree = np.bincount(rows, minlength=n)
+        adj = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(degree, out=adj[1:])
+        
+        offsets = np.zeros(n + 1, dtype=np.int32)
+        ranked_neighbors, ranked_scores = [], []
+        for u in range(n):
+            first = cols[adj[u]:adj[u + 1]]
+            first_w = weights[adj[u]:adj[u + 1]]
+            
+            # Two hops out, through non-hub neighbours only
+            via = degree[first] <= SUGGESTION_HUB_DEGREE
+            mid, mid_w = first[via], first_w[via]
+            lengths = degree[mid]
+            starts = np.repeat(adj[mid] - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+            hop = starts + np.arange(lengths.sum())
+            second = cols[hop]
+            second_w = weights[hop] * np.repeat(mid_w, lengths) * SUGGESTION_TWO_HOP_DECAY
+            
+            candidates = np.concatenate((first, second))
+            path_w = np.concatenate((first_w, second_w))
+            keep = candidates != u
+            candidates, path_w = candidates[keep], path_w[keep]
+            if candidates.size:
+                unique, inverse = np.unique(candidates, return_inverse=True)
+                score = np.bincount(inverse, weights=path_w) * popularity[unique]
+                best = np.argsort(-score, kind="stable")[:top_k]
+                ranked_neighbors.append(unique[best])
+                ranked_scores.append(score[best])
+                offsets[u + 1] = offsets[u] + best.size
+            else:
+                offsets[u + 1] = offsets[u]
+        
+        neighbors = np.concatenate(ranked_neighbors).astype(np.int32) if ranked_neighbors else np.zeros(0, np.int32)
+        scores = np.concatenate(ranked_scores).astype(np.float32) if ranked_scores else np.zeros(0, np.float32)
+        return SuggestionIndex(snapshot, offsets, neighbors, scores)
+
+
+SnapshotStore.register("suggestions", SuggestionIndex.build)
+
+
+class RetrievalIndex:
+    """TF-IDF over every node's name, aliases, labels and relation context
+    
+    Features are whole words plus character trigrams (so typos and
+    transliterations still overlap). Postings are stored feature-major, so a
+    query only touches the postings of its own features and scoring is one
+    weighted np.bincount over the nodes - a sparse matrix-vector product.
+    """
+    
+    FIELD_WEIGHTS = {"name": 3.0, "alias": 2.0, "label": 1.0, "context": 0.5}
+    MAX_POSTINGS_FRACTION = 0.05
+    MIN_POSTINGS_CAP = 100  # Small graphs keep every feature; their postings are cheap anyway
+    STOPWORDS = {
+        "a", "an", "the", "is", "are", "was", "be", "to", "of", "in", "on", "for", "and", "or",
+        "what", "when", "where", "why", "how", "which", "who", "can", "could", "should", "do",
+        "does", "i", "me", "my", "you", "it", "its", "this", "that", "about", "tell", "know",
+        "want", "please", "there", "any", "with", "get", "much", "many",
+    }
+    
+    def __init__(self, snapshot: GraphSnapshot, vocab: Dict[str, int], idf, offsets, docs, values):
+        self.snapshot = snapshot
+        self.vocab = vocab
+        self.idf = idf
+        self.offsets = offsets  # feature -> postings[offsets[f]:offsets[f + 1]]
+        self.docs = docs  # int32 node indexes
+        self.values = values  # float32 normalised tf-idf weights
+    
+    @staticmethod
+    def features(text: str) -> Counter:
+        counts = Counter()
+        for word in re.findall(r"[a-z0-9]+", text.lower()):
+            if word in RetrievalIndex.STOPWORDS:
+                continue
+            counts["w:" + word] += 1
+            padded = f" {word} "
+            for i in range(len(padded) - 2):
+                counts[padded[i:i + 3]] += 1
+        return counts
+    
+    @staticmethod
+    def node_fields(snapshot: GraphSnapshot, i: int) -> List[Tuple[str, str]]:
+        node = snapshot.nodes[i]
+        name = snapshot.names[i]
+        fields = [("name", name)]
+        fields += [("alias", alias) for alias in node.get("aliases", [])]
+        words = set(name.lower().split())
+        for canonical, variations in Synonyms.SYNONYM_MAP.items():
+            if canonical in words:
+                fields += [("alias", variation) for variation in variations]
+        fields += [("label", label) for label in node["labels"]]
+        for relation, j in snapshot.outgoing[i] + snapshot.incoming[i]:
+            fields.append(("context", f"{relation.replace('_', ' ')} {snapshot.names[j]}"))
+        return fields
+    
+    @staticmethod
+    def build(snapshot: GraphSnapshot) -> "RetrievalIndex":
+        np = lazy_import("numpy")
+        vocab = {}
+        rows, cols, raw = [], [], []
+        for i in range(len(snapshot.nodes)):
+            weighted = Counter()
+            for field, text in RetrievalIndex.node_fields(snapshot, i):
+                weight = RetrievalIndex.FIELD_WEIGHTS[field]
+                for feature, count in RetrievalIndex.features(text).items():
+                    weighted[feature] += weight * count
+            for feature, value in weighted.items():
+                rows.append(i)
+                cols.append(vocab.setdefault(feature, len(vocab)))
+                raw.append(value)
+        
+        rows = np.array(rows, dtype=np.int64)
+        cols = np.array(cols, dtype=np.int64)
+        tf = 1.0 + np.log(np.maximum(np.array(raw, dtype=np.float64), 1e-9))
+        tf = np.maximum(tf, 0.0)
+        n_docs = len(snapshot.nodes)
+        df = np.bincount(cols, minlength=len(vocab))
+        idf = np.log((1.0 + n_docs) / (1.0 + df)) + 1.0
+        values = tf * idf[cols]
+        norms = np.sqrt(np.bincount(rows, weights=values ** 2, minlength=n_docs))
+        values /= np.where(norms > 0, norms, 1.0)[rows]
+        
+        order = np.argsort(cols, kind="stable")
+        offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+        np.cumsum(df, out=offsets[1:])
+        return RetrievalIndex(snapshot, vocab, idf, offsets,
+                              rows[order].astype(np.int32), values[order].astype(np.float32))
+    
+    def search(self, text: str, k: int = 3) -> List[Tuple[str, float]]:
+        """Best matching node names with cosine scores, best first"""
+        np = lazy_import("numpy")
+        features, weights = [], []
+        for feature, count in RetrievalIndex.features(text).items():
+            j = self.vocab.get(feature)
+            if j is not None:
+                features.append(j)
+                weights.append((1.0 + math.log(count)) * self.idf[j])
+        if not features:
+            return []
+        norm = math.sqrt(sum(w * w for w in weights))
+        weights = [w / norm for w in weights]
+        
+        # Features on a large share of nodes barely move the ranking but dominate
+        # the cost; drop them unless they're all the query has
+        spans = [(self.offsets[j], self.offsets[j + 1]) for j in features]
+        cap = max(RetrievalIndex.MIN_POSTINGS_CAP,
+                  int(len(self.snapshot.nodes) * RetrievalIndex.MAX_POSTINGS_FRACTION))
+        if any(b - a <= cap for a, b in spans):
+            kept = [(span, w) for span, w in zip(spans, weights) if span[1] - span[0] <= cap]
+            spans, weights = [span for span, _ in kept], [w for _, w in kept]
+        docs = np.concatenate([self.docs[a:b] for a, b in spans])
+        contrib = np.concatenate([self.values[a:b] * w for (a, b), w in zip(spans, weights)])
+        scores = np.bincount(docs, weights=contrib, minlength=len(self.snapshot.nodes))
+        
+        k = min(k, scores.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.snapshot.names[i], float(scores[i])) for i in top if scores[i] > 0]
+    
+    def best_match(self, text: str, min_score: float = RETRIEVAL_MIN_SCORE) -> Optional[str]:
+        matches = self.search(text, k=1)
+        if matches and matches[0][1] >= min_score:
+            return matches[0][0]
+        return None
+
+
+SnapshotStore.register("retrieval", RetrievalIndex.build)
+
+
+class CausalChainIndex:
+    """Best cause and effect chains per node, up to CAUSAL_MAX_DEPTH hops
+    
+    Causal relations are normalised into cause -> effect edges; a chain's
+    score is the product of its relation weights, damped by CAUSAL_HOP_DECAY
+    per extra hop. Each node keeps its CAUSAL_TOP_K best chains per direction
+    as tuples of node indexes starting at the node itself.
+    """
+    
+    # relation -> (weight, True when the edge already points cause -> effect)
+    RELATIONS = {
+        "CAUSES": (1.0, True),
+        "CAUSED_BY": (1.0, False),
+        "AFFECTED_BY": (0.8, False),
+        "NOT_SUITABLE_FOR": (0.6, True),
+    }
+    
+    def __init__(self, snapshot: GraphSnapshot, causes: Dict[int, list], effects: Dict[int, list]):
+        self.snapshot = snapshot
+        self.causes = causes  # node index -> [(score, chain)], best first
+        self.effects = effects
+    
+    def chains(self, entity_name: str, direction: str) -> List[List[str]]:
+        i = self.snapshot.find(entity_name)
+        if i is None:
+            return []
+        ranked = (self.causes if direction == "causes" else self.effects).get(i, [])
+        return [[self.snapshot.names[j] for j in chain] for _, chain in ranked]
+    
+    @staticmethod
+    def _walk(start: int, adjacency: Dict[int, list], max_depth: int, top_k: int) -> list:
+        """Best-scoring simple path to every node within max_depth hops, top_k kept"""
+        best = {start: (1.0, (start,))}
+        frontier = [start]
+        for depth in range(max_depth):
+            decay = CAUSAL_HOP_DECAY if depth else 1.0
+            reached = {}
+            for u in frontier:
+                score, chain = best[u]
+                for v, weight in adjacency.get(u, ()):
+                    if v in chain:
+                        continue
+                    candidate = score * weight * decay
+                    if candidate > best.get(v, (0.0,))[0] and candidate > reached.get(v, (0.0,))[0]:
+                        reached[v] = (candidate, chain + (v,))
+            best.update(reached)
+            frontier = list(reached)
+            if not frontier:
+                break
+        del best[start]
+        return sorted(best.values(), key=lambda item: (-item[0], len(item[1])))[:top_k]
+    
+    @staticmethod
+    def build(snapshot: GraphSnapshot, max_depth: int = CAUSAL_MAX_DEPTH,
+              top_k: int = CAUSAL_TOP_K) -> "CausalChainIndex":
+        # Strongest relation per ordered pair, in both directions
+        forward, backward = {}, {}
+        for i, edges in enumerate(snapshot.outgoing):
+            for relation, j in edges:
+                if relation not in CausalChainIndex.RELATIONS or i == j:
+                    continue
+                weight, cause_first = CausalChainIndex.RELATIONS[relation]
+                cause, effect = (i, j) if cause_first else (j, i)
+                if weight > forward.setdefault(cause, {}).get(effect, 0.0):
+                    forward[cause][effect] = weight
+                    backward.setdefault(effect, {})[cause] = weight
+        
+        forward = {u: sorted(vs.items(), key=lambda item: -item[1]) for u, vs in forward.items()}
+        backward = {u: sorted(vs.items(), key=lambda item: -item[1]) for u, vs in backward.items()}
+        causes = {u: CausalChainIndex._walk(u, backward, max_depth, top_k) for u in backward}
+        effects = {u: CausalChainIndex._walk(u, forward, max_depth, top_k) for u in forward}
+        return CausalChainIndex(snapshot, causes, effects)
+
+
+SnapshotStore.register("causal", CausalChainIndex.build)
+
+
+class CalendarIndex:
+    """Bangla month -> what can be caught and what conditions to expect
+    
+    Dates map to months through a fixed day table (the revised Bangladesh
+    calendar starts each month on the same Gregorian day every year), and each
+    month's entry collects everything linked to its month or season node, so
+    "what can I catch now" is two dictionary lookups.
+    """
+    
+    # (name, spellings, season, first day as (month, day))
+    MONTHS = [
+        ("Boisakh", ["boisakh", "boishakh", "baishakh"], "Summer", (4, 14)),
+        ("Joishtho", ["joishtho", "jyoishtho", "jaistha"], "Summer", (5, 15)),
+        ("Asharh", ["asharh", "ashar", "asadh"], "Monsoon", (6, 15)),
+        ("Srabon", ["srabon", "shrabon", "sraban"], "Monsoon", (7, 16)),
+        ("Bhadro", ["bhadro", "bhadra"], "Autumn", (8, 16)),
+        ("Ashwin", ["ashwin", "ashshin"], "Autumn", (9, 16)),
+        ("Kartik", ["kartik"], "Late Autumn", (10, 17)),
+        ("Ogrohayon", ["ogrohayon", "agrohayon", "agrahayan"], "Late Autumn", (11, 16)),
+        ("Poush", ["poush", "pous"], "Winter", (12, 16)),
+        ("Magh", ["magh"], "Winter", (1, 15)),
+        ("Falgun", ["falgun", "phalgun"], "Spring", (2, 14)),
+        ("Choitro", ["choitro", "chaitra", "choitra"], "Spring", (3, 15)),
+    ]
+    SEASON_SPELLINGS = {
+        "Summer": ["summer", "grishmo"],
+        "Monsoon": ["monsoon", "borsha", "rainy season"],
+        "Autumn": ["autumn", "shorot"],
+        "Late Autumn": ["late autumn", "hemonto"],
+        "Winter": ["winter", "sheet"],
+        "Spring": ["spring", "boshonto"],
+    }
+    AVAILABILITY = {"SEASONALLY_AVAILABLE_IN", "CATCH_IN", "AVAILABLE_IN"}
+    
+    # (gregorian month, day) -> Bangla month; 2024 is a leap year, so 29 Feb is covered
+    DAY_TABLE = {}
+    _day, _month = datetime(2024, 1, 1), 8  # 1 January falls in Poush
+    while _day.year == 2024:
+        if _month + 1 < len(MONTHS) and (_day.month, _day.day) == MONTHS[_month + 1][3]:
+            _month += 1
+        elif (_day.month, _day.day) == MONTHS[0][3]:
+            _month = 0
+        DAY_TABLE[(_day.month, _day.day)] = _month
+        _day += timedelta(days=1)
+    del _day, _month
+    
+    def __init__(self, months: List[Dict]):
+        self.months = months  # one entry per Bangla month, Boisakh first
+    
+    @staticmethod
+    def month_of(day: datetime) -> int:
+        return CalendarIndex.DAY_TABLE[(day.month, day.day)]
+    
+    @staticmethod
+    def today() -> datetime:
+        return datetime.now(timezone(timedelta(hours=CALENDAR_UTC_OFFSET_HOURS)))
+    
+    @staticmethod
+    def entry(month: int, linked: List[Tuple[str, str, List[str]]], caused: List[str]) -> Dict:
+        """Month entry from (relation, name, labels) of nodes pointing at it and what it causes"""
+        name, _, season, _ = CalendarIndex.MONTHS[month]
+        calendar_names = {m[0].lower() for m in CalendarIndex.MONTHS} | set(CalendarIndex.SEASON_SPELLINGS)
+        catch, conditions = [], []
+        for relation, other, labels in linked:
+            if relation not in CalendarIndex.AVAILABILITY or other.lower() in calendar_names:
+                continue
+            bucket = catch if "Fish" in labels else conditions
+            if other not in bucket:
+                bucket.append(other)
+        for other in caused:
+            if other not in conditions:
+                conditions.append(other)
+        return {"month": name, "season": season, "catch": catch, "conditions": conditions}
+    
+    @staticmethod
+    def build(snapshot: GraphSnapshot) -> "CalendarIndex":
+        months = []
+        for month, (name, spellings, season, _) in enumerate(CalendarIndex.MONTHS):
+            spellings = spellings + CalendarIndex.SEASON_SPELLINGS[season]
+            nodes = [i for i in map(snapshot.find_exact, spellings) if i is not None]
+            # Seasons the graph itself puts this month in
+            for i in list(nodes):
+                nodes += [j for relation, j in snapshot.outgoing[i]
+                          if relation == "SEASONALLY_AVAILABLE_IN" and j not in nodes]
+            linked = [(relation, snapshot.names[j], snapshot.nodes[j]["labels"])
+                      for i in nodes for relation, j in snapshot.incoming[i]]
+            caused = [snapshot.names[j] for i in nodes for relation, j in snapshot.outgoing[i] if relation == "CAUSES"]
+            months.append(CalendarIndex.entry(month, linked, caused))
+        return CalendarIndex(months)
+
+
+SnapshotStore.register("calendar", CalendarIndex.build)
+
+
+class GraphLayout:
+    """Node coordinates for the admin graph view, so the browser only draws
+    
+    Fruchterman-Reingold over the undirected adjacency, vectorised: attraction
+    along every edge, repulsion from every node - or, past GRAPH_LAYOUT_SAMPLE
+    nodes, from a fresh random sample each step, scaled up to match - and a
+    weak pull to the centre so components don't drift apart. A new graph
+    version starts from the previous layout: known nodes stay put and only new
+    ones (started next to their placed neighbours) move, unless more than
+    GRAPH_LAYOUT_RELAYOUT_SHARE of the nodes are new. Layouts are saved with
+    their version, so a restart on the same graph doesn't recompute.
+    """
+    
+    SCALE = 1000.0  # Coordinates span about [-SCALE, SCALE]
+    CHUNK = 512  # Nodes per repulsion block, bounding the pairwise arrays
+    GRAVITY = 0.05
+    
+    def __init__(self, version: str, ids: List, positions):
+        self.version = version
+        self.ids = ids
+        self.positions = positions  # float (n, 2), parallel to ids
+        self._index = {graph_id: i for i, graph_id in enumerate(ids)}
+    
+    def attach(self, graph: Dict) -> Dict:
+        """Add x, y to the /graph nodes this layout has placed"""
+        for node in graph["nodes"]:
+            i = self._index.get(node["id"])
+            if i is not None:
+                node["x"], node["y"] = (round(float(v), 1) for v in self.positions[i])
+        graph["layout_version"] = self.version
+        return graph
+    
+    @staticmethod
+    def relax(np, positions, src, dst, movable, iterations: int, rng, sample: int = GRAPH_LAYOUT_SAMPLE):
+        """Move the movable nodes of a [-1, 1]-scaled layout, cooling linearly"""
+        n = len(positions)
+        k = 2.0 / math.sqrt(n)  # Ideal edge length in a 2 x 2 box
+        movers = np.flatnonzero(movable)
+        temperature = 0.1 if movable.all() else 0.02  # Fine-tuning around fixed nodes needs small steps
+        for step in range(iterations):
+            if n > sample:
+                others, boost = rng.choice(n, sample, replace=False), n / sample
+            else:
+                others, boost = np.arange(n), 1.0
+            shift = np.zeros_like(positions)
+            anchors = positions[others]
+            anchor_norms = (anchors ** 2).sum(axis=1)
+            for start in range(0, len(movers), GraphLayout.CHUNK):
+                block = positions[movers[start:start + GraphLayout.CHUNK]]
+                # sum_j (p - a_j) / |p - a_j|^2 as matrix products; a node's own term cancels
+                dist2 = (block ** 2).sum(axis=1)[:, None] + anchor_norms[None, :] - 2 * block @ anchors.T
+                inverse = 1 / np.maximum(dist2, 1e-9)
+                shift[movers[start:start + GraphLayout.CHUNK]] = boost * k * k * (
+                    block * inverse.sum(axis=1)[:, None] - inverse @ anchors)
+            delta = positions[src] - positions[dst]
+            pull = delta * (np.sqrt((delta ** 2).sum(axis=1)) / k)[:, None]
+            for axis in (0, 1):
+                shift[:, axis] += np.bincount(dst, pull[:, axis], minlength=n) - np.bincount(src, pull[:, axis], minlength=n)
+            shift -= GraphLayout.GRAVITY * positions / k
+            length = np.maximum(np.sqrt((shift ** 2).sum(axis=1)), 1e-9)
+            limit = temperature * (1 - step / iterations)
+            positions[movers] += (shift * (np.minimum(length, limit) / length)[:, None])[movers]
+        return positions
+    
+    @staticmethod
+    def place_new(np, positions, placed, src, dst, rng, k: float):
+        """Start new nodes at the mean of their placed neighbours (spreading out over two passes)"""
+        n = len(positions)
+        for _ in range(2):
+            ends = np.concatenate((src, dst)), np.concatenate((dst, src))
+            usable = placed[ends[1]] & ~placed[ends[0]]
+            counts = np.bincount(ends[0][usable], minlength=n)
+            reached = counts > 0
+            for axis in (0, 1):
+                total = np.bincount(ends[0][usable], positions[ends[1][usable], axis], minlength=n)
+                positions[reached, axis] = total[reached] / counts[reached]
+            positions[reached] += rng.normal(0, k, (int(reached.sum()), 2))
+            placed = placed | reached
+        lonely = ~placed
+        positions[lonely] = rng.uniform(-1, 1, (int(lonely.sum()), 2))
+        return positions
+    
+    @staticmethod
+    def build(snapshot: GraphSnapshot, path: str = GRAPH_LAYOUT_PATH) -> "GraphLayout":
+        previous = SnapshotStore.index("layout") or GraphLayout.load(path)
+        if previous is not None and previous.version == snapshot.version:
+            return previous
+        np = lazy_import("numpy")
+        ids = [node["id"] for node in snapshot.nodes]
+        n = len(ids)
+        if n == 0:
+            return GraphLayout(snapshot.version, ids, np.zeros((0, 2)))
+        rng = np.random.default_rng(int(snapshot.version, 16))  # Same graph, same picture
+        pairs = [(i, j) for i, edges in enumerate(snapshot.outgoing) for _, j in edges if i != j]
+        src = np.array([i for i, _ in pairs], dtype=np.int64)
+        dst = np.array([j for _, j in pairs], dtype=np.int64)
+        
+        known = np.array([previous._index.get(graph_id, -1) for graph_id in ids] if previous else [-1] * n)
+        kept = known >= 0
+        if kept.any() and 1 - kept.mean() <= GRAPH_LAYOUT_RELAYOUT_SHARE:
+            positions = np.zeros((n, 2))
+            positions[kept] = previous.positions[known[kept]] / GraphLayout.SCALE
+            GraphLayout.place_new(np, positions, kept, src, dst, rng, 0.1 / math.sqrt(n))
+            if not kept.all():
+                GraphLayout.relax(np, positions, src, dst, ~kept, GRAPH_LAYOUT_ITERATIONS // 2, rng)
+        else:
+            positions = rng.uniform(-1, 1, (n, 2))
+            GraphLayout.relax(np, positions, src, dst, np.ones(n, dtype=bool), GRAPH_LAYOUT_ITERATIONS, rng)
+            positions -= positions.mean(axis=0)
+            positions /= max(np.abs(positions).max(), 1e-9)
+        
+        layout = GraphLayout(snapshot.version, ids, positions * GraphLayout.SCALE)
+        try:
+            layout.save(path)
+        except OSError as e:
+            logger.warning("Could not save graph layout: %s", e)
+        return layout
+    
+    @staticmethod
+    def load(path: str) -> Optional["GraphLayout"]:
+        if not os.path.exists(path):
+            return None
+        np = lazy_import("numpy")
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return GraphLayout(data["version"], data["ids"], np.array(data["xy"], dtype=float).reshape(-1, 2))
+    
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": self.version, "ids": self.ids,
+                       "xy": [round(float(v), 1) for v in self.positions.ravel()]}, f)
+        os.replace(tmp, path)
+
+
+SnapshotStore.register("layout", GraphLayout.build)
+
+class SmartIntentClassifier:
+    """Enhanced intent classification"""
+    
+    @staticmethod
+    def classify(message: str, entities: Dict, memory: ConversationMemory) -> str:
+        """Classify intent with context"""
+        msg_lower = message.lower().strip()
+        question_type = QuestionAnalyzer.classify_question_type(message)
+        is_negative, neg_context = QuestionAnalyzer.detect_negation(message)
+        
+        # Short responses
+        if msg_lower in ["yes", "yeah", "yep", "sure", "ok", "okay", "y", "ha", "haan", "please"]:
+            return "affirmative"
+        if msg_lower in ["no", "nope", "nah", "na", "not really"]:
+            return "negative"
+        if msg_lower in ["hi", "hello", "hey", "namaste", "good morning", "good evening", "greetings"]:
+            return "greeting"
+        if msg_lower in ["bye", "goodbye", "see you", "thanks", "thank you", "bye bye"]:
+            return "goodbye"
+        
+        # "What can I catch this month?" - about the calendar, not one fish
+        if not entities.get("fish") and any(word in msg_lower for word in ["catch", "fish", "available", "season"]):
+            if entities.get("months") or re.search(
+                    r"\b(now|today|currently|these days|this (month|week|season)|next month)\b", msg_lower):
+                return "calendar"
+        
+        # Question type based classification
+        if question_type == "temporal":
+            return "season_timing"
+        elif question_type == "location":
+            return "location"
+        elif question_type == "reason":
+            return "causes"
+        elif question_type == "method":
+            return "advice"
+        elif question_type == "yes_no":
+            if is_negative:
+                return "suitability"
+            return "suitability"
+        
+        # Entity-based classification
+        if entities.get("water_quality"):
+            return "water_condition"
+        if entities.get("gear") and entities.get("fish"):
+            return "gear_equipment"
+        if entities.get("economic"):
+            return "economic"
+        
+        # Comparison detection
+        if QuestionAnalyzer.extract_comparison(message):
+            return "comparison"
+        
+        # Pattern matching
+        patterns = {
+            "gear_equipment": ["net", "gear", "equipment", "use", "tackle", "rod"],
+            "water_condition": ["murky", "clean", "water quality", "dirty"],
+            "weather_condition": ["weather", "tide", "current", "wind", "rain"],
+            "causes": ["why", "cause", "reason", "because"],
+            "effects": ["effect", "happen", "result", "consequence"],
+            "suitability": ["suitable", "good", "bad", "should", "can i"],
+            "advice": ["recommend", "suggest", "tip", "best", "how to"],
+            "comparison": ["compare", "difference", "versus", "vs", "better"]
+        }
+        
+        for intent, keywords in patterns.items():
+            if any(kw in msg_lower for kw in keywords):
+                return intent
+        
+        return "general_info"
+
+def bullet_section(title: str, items: List[str], bullet: str = "  • ", gap: bool = True) -> str:
+    """A titled list, one item per line, closed by a blank line unless gap is False"""
+    return "".join([title, "\n", *(f"{bullet}{item}\n" for item in items), "\n" if gap else ""])
+
+
+class ConversationalResponseBuilder:
+    """Build context-aware conversational responses"""
+    
+    # Intents that never look an entity up
+    ENTITYLESS_INTENTS = {"greeting", "goodbye", "affirmative", "negative", "calendar"}
+    # Stages whose replies end with a related topic
+    SUGGESTING_STAGES = ("exploring", "deep_dive")
+    
+    @staticmethod
+    def build_response(intent: str, entities: Dict, memory: ConversationMemory, 
+                      message: str) -> str:
+        """Build intelligent, context-aware response"""
+        
+        # Update memory
+        memory.update_stage()
+        
+        # Get primary entity
+        primary_entity = ConversationalResponseBuilder._get_primary_entity(
+            entities, memory, message, intent)
+        
+        # "Yes" accepts whatever the previous reply suggested
+        offered, memory.offered_topic = memory.offered_topic, None
+        if intent == "affirmative" and offered:
+            primary_entity = offered
+            memory.discuss(offered)
+        
+        # Route to handlers
+        handlers = {
+            "greeting": ConversationalResponseBuilder._handle_greeting,
+            "goodbye": ConversationalResponseBuilder._handle_goodbye,
+            "affirmative": ConversationalResponseBuilder._handle_affirmative,
+            "negative": ConversationalResponseBuilder._handle_negative,
+            "season_timing": ConversationalResponseBuilder._handle_season,
+            "calendar": ConversationalResponseBuilder._handle_calendar,
+            "location": ConversationalResponseBuilder._handle_location,
+            "water_condition": ConversationalResponseBuilder._handle_water_condition,
+            "weather_condition": ConversationalResponseBuilder._handle_weather,
+            "gear_equipment": ConversationalResponseBuilder._handle_gear,
+            "causes": ConversationalResponseBuilder._handle_causes,
+            "effects": ConversationalResponseBuilder._handle_effects,
+            "suitability": ConversationalResponseBuilder._handle_suitability,
+            "economic": ConversationalResponseBuilder._handle_economic,
+            "comparison": ConversationalResponseBuilder._handle_comparison,
+            "advice": ConversationalResponseBuilder._handle_advice,
+            "general_info": ConversationalResponseBuilder._handle_general
+        }
+        
+        handler = handlers.get(intent, ConversationalResponseBuilder._handle_general)
+        
+        # The suggestion lookup doesn't need the handler's answer; run it alongside
+        suggesting = None
+        if primary_entity and memory.stage in ConversationalResponseBuilder.SUGGESTING_STAGES:
+            suggesting = _fanout_pool.submit(contextvars.copy_context().run, KnowledgeGraph.get_suggestions,
+                                             primary_entity, memory.discussed())
+        try:
+            response = handler(primary_entity, entities, memory, message)
+        except DependencyUnavailable:
+            return ConversationalResponseBuilder._limited_mode_reply()
+        
+        # Add personality
+        response = ResponseGenerator.add_personality(response, memory.stage)
+        
+        # Add proactive suggestions based on stage
+        if suggesting is not None and memory.stage in ConversationalResponseBuilder.SUGGESTING_STAGES:
+            response = ConversationalResponseBuilder._add_suggestions(response, suggesting, memory)
+        
+        return response
+    
+    @staticmethod
+    def _limited_mode_reply() -> str:
+        """Canned answer while the knowledge graph is unreachable"""
+        alternative = "safe fishing gear and why to avoid Current Nets (Darki)"
+        return "I'm running in limited mode right now. " + ResponseGenerator.pick_template(
+            "no_data", alternative=alternative)
+    
+    @staticmethod
+    def _get_primary_entity(entities: Dict, memory: ConversationMemory,
+                            message: str = "", intent: str = None) -> str:
+        """Get primary entity from message or context"""
+        # Priority order
+        for key in ["fish", "conditions", "water_quality", "gear", "locations", "months", "seasons"]:
+            if entities.get(key):
+                entity = entities[key][0]
+                memory.discuss(entity)
+                return entity
+        
+        # Fall back to memory: follow-ups ("what about the wind?") stay on the topic
+        if memory.current_topic:
+            return memory.current_topic
+        
+        # Otherwise any other node the message clearly names
+        index = SnapshotStore.index("retrieval")
+        if index is not None and message and intent not in ConversationalResponseBuilder.ENTITYLESS_INTENTS:
+            entity = index.best_match(message)
+            if entity:
+                memory.discuss(entity)
+                return entity
+        
+        return None
+    
+    @staticmethod
+    def _handle_greeting(entity, entities, memory, message):
+        capability = "I specialize in fishing - fish species, seasons, locations, water conditions, and equipment."
+        greeting = ResponseGenerator.pick_template("greeting", capability=capability)
+        memory.stage = "greeting"
+        return greeting
+    
+    FAREWELLS = (
+        "Happy fishing!Feel free to come back anytime with more questions.",
+        "Good luck with your fishing!Hope to chat again soon.",
+        "Tight lines!Come back if you need more fishing wisdom.",
+        "May your nets be full!See you next time.",
+    )
+    DECLINED = (
+        "No problem! What else would you like to know about fishing?",
+        "That's okay! Feel free to ask me anything else about fishing.",
+        "Sure thing! Is there something else I can help you with?",
+    )
+    
+    @staticmethod
+    def _handle_goodbye(entity, entities, memory, message):
+        return reply_random().choice(ConversationalResponseBuilder.FAREWELLS)
+    
+    @staticmethod
+    def _handle_affirmative(entity, entities, memory, message):
+        if not entity:
+            return "Great! What would you like to know more about?"
+        
+        intro = ResponseGenerator.pick_template("affirmative_response")
+        info = KnowledgeGraph.get_comprehensive_info(entity)
+        
+        if not info["entity"]:
+            return f"{intro} Actually, let me know what specific aspect interests you!"
+        
+        return f"{intro}\n\n{ConversationalResponseBuilder._build_comprehensive_info(info)}"
+    
+    @staticmethod
+    def _handle_negative(entity, entities, memory, message):
+        return reply_random().choice(ConversationalResponseBuilder.DECLINED)
+    
+    @staticmethod
+    def _handle_season(entity, entities, memory, message):
+        if not entity:
+            return "I'd love to help with timing! Which fish are you interested in - Hilsa, Catfish, or Salmon?"
+        
+        info = KnowledgeGraph.get_comprehensive_info(entity)
+        
+        if not info["entity"]:
+            return f"I don't have timing information for '{entity}'. Try asking about Hilsa, Catfish, or Salmon!"
+        
+        # Get season data
+        seasons = [r["target"] for r in info["outgoing"] if r["relation"] == "SEASONALLY_AVAILABLE_IN"]
+        catch_in = [r["target"] for r in info["outgoing"] if r["relation"] == "CATCH_IN"]
+        
+        if seasons:
+            extra = ""
+            if catch_in:
+                extra = f"Best conditions: {', '.join(catch_in[:2])}."
+            
+            response = ResponseGenerator.pick_template(
+                "season_answer",
+                fish=info["entity"],
+                season=", ".join(seasons),
+                extra=extra
+            )
+        else:
+            response = f"I don't have specific season data for {info['entity']}, but I can tell you about locations or conditions!"
+        
+        # Add follow-up
+        follow_up = ResponseGenerator.pick_template("follow_up", topic="the best locations")
+        return f"{response}\n\n{follow_up}"
+    
+    @staticmethod
+    def _handle_calendar(entity, entities, memory, message):
+        month = CalendarIndex.month_of(CalendarIndex.today())
+        msg_lower = message.lower()
+        named = [i for i, (_, spellings, _, _) in enumerate(CalendarIndex.MONTHS)
+                 if any(re.search(rf"\b{spelling}\b", msg_lower) for spelling in spellings)]
+        if named:
+            month, when = named[0], "in"
+        elif "next month" in msg_lower:
+            month, when = (month + 1) % len(CalendarIndex.MONTHS), "next month,"
+        else:
+            when = "right now,"
+        
+        calendar = KnowledgeGraph.get_calendar(month)
+        if not calendar["catch"] and not calendar["conditions"]:
+            return (f"I don't have calendar data for {calendar['month']} ({calendar['season'].lower()}) yet. "
+                    "Ask me about a specific fish like Hilsa, Catfish, or Salmon!")
+        
+        parts = [f"Fishing Calendar: {calendar['month']} ({calendar['season']})\n\n"]
+        if calendar["catch"]:
+            parts.append(bullet_section(f"Good to catch {when} {calendar['month']}:", calendar["catch"]))
+        if calendar["conditions"]:
+            parts.append(bullet_section("Conditions to Expect:", calendar["conditions"]))
+        if calendar["catch"]:
+            memory.offered_topic = calendar["catch"][0]
+            parts.append(f"Want to know where to find {calendar['catch'][0]}?")
+        return "".join(parts)
+    
+    @staticmethod
+    def _handle_location(entity, entities, memory, message):
+        if not entity:
+            return "Which fish are you looking to find? Hilsa, Catfish, or Salmon?"
+        
+        info = KnowledgeGraph.get_comprehensive_info(entity)
+        
+        if not info["entity"]:
+            return f"I don't have location info for '{entity}'."
+        
+        found_in = [r["target"] for r in info["outgoing"] if r["relation"] == "FOUND_IN"]
+        available_in = [r["target"] for r in info["outgoing"] if r["relation"] == "AVAILABLE_IN"]
+        
+        if found_in or available_in:
+            location = ", ".join(found_in + available_in)
+            extra = ""
+            if "Freshwater" in location:
+                extra = "Look in rivers, streams, and lakes."
+            elif "Saltwater" in location:
+                extra = "Found in coastal and estuarine areas."
+            
+            response = ResponseGenerator.pick_template(
+                "location_answer",
+                fish=info["entity"],
+                location=location,
+                extra=extra
+            )
+        else:
+            response = f"Location data not available for {info['entity']}, but I can help with seasons or conditions!"
+        
+        # Add follow-up
+        follow_up = ResponseGenerator.pick_template("follow_up", topic="water conditions")
+        return f"{response}\n\n{follow_up}"
+    
+    @staticmethod
+    def _handle_water_condition(entity, entities, memory, message):
+        # Check for murky water specifically
+        if any("murky" in e for e in entities.get("water_quality", [])):
+            return ConversationalResponseBuilder._murky_water_analysis()
+        
+        info = KnowledgeGraph.get_comprehensive_info(entity)
+        
+        parts = [f"Water Condition: {entity.title() if entity else 'General'}\n\n"]
+        
+        # Get causes
+        causes = [r["target"] for r in info["outgoing"] if r["relation"] == "CAUSED_BY"]
+        if causes:
+            parts.append(bullet_section("What causes it:", causes[:4]))
+        
+        # Get suitability
+        suitable = [r["target"] for r in info["outgoing"] if r["relation"] == "SUITABLE_FOR"]
+        not_suitable = [r["target"] for r in info["outgoing"] if r["relation"] == "NOT_SUITABLE_FOR"]
+        
+        if suitable:
+            parts.append(f"Good for: {', '.join(suitable)}\n")
+        if not_suitable:
+            parts.append(f"Not good for: {', '.join(not_suitable)}\n")
+        
+        parts.append("\n Tip: Always check water conditions before heading out!")
+        return "".join(parts)
+    
+    MURKY_WATER_ADVICE = (
+        "Impact on Fishing:\n"
+        "Murky water makes fishing very difficult\n"
+        "Fish can't see bait/nets properly\n"
+        "Not suitable for fish catching\n\n"
+        "Recommendation: Wait for clean, stable water for better results!"
+    )
+    
+    @staticmethod
+    def _murky_water_analysis():
+        info = KnowledgeGraph.get_comprehensive_info("Murky Water")
+        
+        parts = ["About Murky Water\n\n"]
+        
+        causes = [r["target"] for r in info["outgoing"] if r["relation"] == "CAUSED_BY"]
+        if causes:
+            parts.append("Common Causes:\n")
+            parts.extend(f"{i}. {cause}\n" for i, cause in enumerate(causes, 1))
+            parts.append("\n")
+        
+        parts.append(ConversationalResponseBuilder.MURKY_WATER_ADVICE)
+        return "".join(parts)
+    
+    @staticmethod
+    def _handle_weather(entity, entities, memory, message):
+        info = KnowledgeGraph.get_comprehensive_info(entity)
+        
+        parts = [f"Condition: {entity.title() if entity else 'Weather'}\n\n"]
+        
+        suitable = [r["target"] for r in info["outgoing"] if r["relation"] == "SUITABLE_FOR"]
+        not_suitable = [r["target"] for r in info["outgoing"] if r["relation"] == "NOT_SUITABLE_FOR"]
+        
+        if suitable:
+            parts.append(f"Good for: {', '.join(suitable)}\n")
+        if not_suitable:
+            parts.append(f"Avoid for: {', '.join(not_suitable)}\n")
+        
+        # Special cases
+        if entity and "current" in entity.lower():
+            parts.append("\n Warning: Strong currents can be dangerous - nets may overturn!")
+        elif entity and "amavasya" in entity.lower():
+            parts.append("\n Special Note: Amavasya (new moon) is great for Hilsa fishing!")
+        
+        return "".join(parts)
+    
+    @staticmethod
+    def _handle_gear(entity, entities, memory, message):
+        fish_mentions = entities.get("fish", [])
+        gear_mentions = entities.get("gear", [])
+        
+        # Check for harmful gear
+        if any(g in ["current net", "darki"] for g in gear_mentions):
+            return ConversationalResponseBuilder._harmful_gear_warning()
+        
+        # Asking about net for specific fish
+        if fish_mentions:
+            fish_name = fish_mentions[0].title()
+            
+            # Check knowledge graph
+            info = KnowledgeGraph.get_comprehensive_info(fish_mentions[0])
+            requires = [r["target"] for r in info["outgoing"] if r["relation"] == "REQUIRES"]
+            
+            if requires:
+                guidance = f"Recommended: {', '.join(requires)}\n\n"
+            else:
+                guidance = ConversationalResponseBuilder.GEAR_GUIDELINES
+            
+            return f"Equipment for {fish_name}\n\n{guidance} Want to know the best season or location too?"
+        
+        return "What kind of equipment are you interested in? Nets, rods, or gear for a specific fish?"
+    
+    GEAR_GUIDELINES = bullet_section("General Guidelines:", [
+        "Use traditional fishing nets with appropriate mesh size",
+        "Avoid Current Nets (Darki) - harmful to fish populations",
+        "Match your gear to water type (fresh/salt)",
+        "Allow young fish to escape and grow",
+    ])
+    
+    @staticmethod
+    def _harmful_gear_warning():
+        return """ Important Warning: Current Nets (Darki)
+
+ These nets are HARMFUL and should be avoided!
+
+ Why they're problematic:
+  • Catch mother fish and young fry indiscriminately
+  • Damage fish populations long-term
+  • Can overturn in strong currents
+  • Not sustainable for fishing communities
+
+    Better Alternative: Use traditional, selective nets that:
+    Allow young fish to escape
+    Target adult fish appropriately
+    Support sustainable fishing
+
+Want to know about better fishing practices?"""
+    
+    @staticmethod
+    def _handle_causes(entity, entities, memory, message):
+        if not entity:
+            return "What would you like to know the cause of? Water conditions, seasonal changes, or something else?"
+        
+        info = KnowledgeGraph.get_comprehensive_info(entity)
+        
+        causes = [r["target"] for r in info["outgoing"] if r["relation"] == "CAUSED_BY"]
+        
+        # Direct causes the index found from the other side (X CAUSES entity), then longer chains
+        chains = KnowledgeGraph.get_causal_chains(entity, "causes")
+        causes += [chain[1] for chain in chains if len(chain) == 2 and chain[1] not in causes]
+        deeper = [chain for chain in chains if len(chain) > 2]
+        
+        if causes or deeper:
+            parts = [f"What Causes {entity.title()}?\n\n"]
+            parts.extend(f"{i}. {cause}\n" for i, cause in enumerate(causes, 1))
+            if deeper:
+                parts.append("\n")
+                parts.append(bullet_section("How It Builds Up:", [" → ".join(reversed(chain)) for chain in deeper[:3]],
+                                            gap=False))
+            parts.append("\n Understanding causes helps you plan better fishing trips!")
+            return "".join(parts)
+        
+        return f"I don't have specific cause information for {entity}, but I can tell you about its effects or how it impacts fishing!"
+    
+    @staticmethod
+    def _handle_effects(entity, entities, memory, message):
+        if not entity:
+            return "What effects are you curious about? I can explain impacts of weather, water conditions, or equipment."
+        
+        info = KnowledgeGraph.get_comprehensive_info(entity)
+        
+        parts = [f"Effects of {entity.title()}\n\n"]
+        
+        # Direct effects
+        effects = [r["target"] for r in info["outgoing"] if r["relation"] == "CAUSES"]
+        chains = KnowledgeGraph.get_causal_chains(entity, "effects")
+        harmed = {r["target"] for r in info["outgoing"] if r["relation"] == "NOT_SUITABLE_FOR"}
+        effects += [chain[1] for chain in chains if len(chain) == 2 and chain[1] not in harmed.union(effects)]
+        if effects:
+            parts.append(bullet_section("Direct Effects:", effects))
+        
+        # What it's not suitable for
+        not_suitable = [r["target"] for r in info["outgoing"] if r["relation"] == "NOT_SUITABLE_FOR"]
+        if not_suitable:
+            parts.append(bullet_section("Negative Impact:", not_suitable, bullet="   "))
+        
+        # Knock-on effects further down the chain
+        knock_on = [chain for chain in chains if len(chain) > 2]
+        if knock_on:
+            parts.append(bullet_section("Knock-on Effects:", [" → ".join(chain) for chain in knock_on[:3]]))
+        
+        if not effects and not not_suitable:
+            parts.append("I don't have specific effect data, but I can tell you about causes or suitability!\n")
+        
+        parts.append("\n Knowing effects helps you avoid bad conditions!")
+        return "".join(parts)
+    
+    @staticmethod
+    def _handle_suitability(entity, entities, memory, message):
+        is_negative, _ = QuestionAnalyzer.detect_negation(message)
+        
+        if not entity:
+            return "What are you checking suitability for? A fish, season, water condition, or equipment?"
+        
+        info = KnowledgeGraph.get_comprehensive_info(entity)
+        
+        parts = [f"Suitability: {entity.title()}\n\n"]
+        
+        suitable = [r["target"] for r in info["outgoing"] if r["relation"] == "SUITABLE_FOR"]
+        not_suitable = [r["target"] for r in info["outgoing"] if r["relation"] == "NOT_SUITABLE_FOR"]
+        
+        if suitable:
+            parts.append(bullet_section("GOOD FOR:", suitable))
+        if not_suitable:
+            parts.append(bullet_section("NOT GOOD FOR:", not_suitable))
+        
+        # Add recommendation based on results
+        if is_negative and not_suitable:
+            parts.append(f"You're right to avoid {entity} for those activities!")
+        elif suitable:
+            parts.append(f"{entity.title()} is a good choice for these activities!")
+        else:
+            parts.append("Plan your activities based on suitable conditions!")
+        
+        return "".join(parts)
+    
+    @staticmethod
+    def _handle_economic(entity, entities, memory, message):
+        info = KnowledgeGraph.get_comprehensive_info("Income")
+        
+        parts = ["Economics of Fishing\n\n"]
+        
+        divided_to = [r["target"] for r in info["outgoing"] if r["relation"] == "DIVIDED_TO"]
+        
+        if divided_to:
+            parts.append(bullet_section("Income Distribution:", divided_to))
+            parts.append("Fishing income is typically shared among boat owners, fishermen, "
+                         "and covers operational costs like engine fuel and food.\n\n")
+        
+        parts.append("Understanding economics helps plan sustainable fishing ventures!")
+        return "".join(parts)
+    
+    @staticmethod
+    def _handle_comparison(entity, entities, memory, message):
+        comparison = QuestionAnalyzer.extract_comparison(message)
+        fish_list = entities.get("fish", [])
+        
+        if len(fish_list) < 2 and not comparison:
+            return "To compare, please mention two fish species (like 'Hilsa and Catfish') or two conditions!"
+        
+        fish1 = fish_list[0] if fish_list else (comparison[0] if comparison else None)
+        fish2 = fish_list[1] if len(fish_list) > 1 else (comparison[1] if comparison else None)
+        
+        if not fish1 or not fish2:
+            return "I need two things to compare. Try 'Compare Hilsa and Salmon' or 'Hilsa vs Catfish'."
+        
+        info1 = KnowledgeGraph.get_comprehensive_info(fish1)
+        info2 = KnowledgeGraph.get_comprehensive_info(fish2)
+        
+        parts = [f"Comparing {fish1.title()} vs {fish2.title()}\n\n"]
+        
+        # Compare seasons
+        seasons1 = [r["target"] for r in info1["outgoing"] if r["relation"] == "SEASONALLY_AVAILABLE_IN"]
+        seasons2 = [r["target"] for r in info2["outgoing"] if r["relation"] == "SEASONALLY_AVAILABLE_IN"]
+        parts.append(bullet_section("Best Season:", [
+            f"{fish1.title()}: {', '.join(seasons1) if seasons1 else 'N/A'}",
+            f"{fish2.title()}: {', '.join(seasons2) if seasons2 else 'N/A'}",
+        ]))
+        
+        # Compare locations
+        locs1 = [r["target"] for r in info1["outgoing"] if r["relation"] == "FOUND_IN"]
+        locs2 = [r["target"] for r in info2["outgoing"] if r["relation"] == "FOUND_IN"]
+        parts.append(bullet_section("Habitat:", [
+            f"{fish1.title()}: {', '.join(locs1) if locs1 else 'N/A'}",
+            f"{fish2.title()}: {', '.join(locs2) if locs2 else 'N/A'}",
+        ]))
+        
+        # Add insight
+        if seasons1 and seasons2 and seasons1 != seasons2:
+            parts.append("Key Difference: These fish are active in different seasons, so you can target them at different times of the year!")
+        elif locs1 and locs2 and locs1 != locs2:
+            parts.append("Key Difference: These fish live in different water types, so you'll need different locations!")
+        
+        return "".join(parts)
+    
+    PRO_TIPS = (
+        "Pro Tips:\n"
+        "Check water conditions before going out\n"
+        "Avoid murky water and strong currents\n"
+        "Use appropriate, sustainable gear\n"
+        "Consider Bangla months: Boisakh is best\n"
+    )
+    
+    @staticmethod
+    def _handle_advice(entity, entities, memory, message):
+        if not entity:
+            return "I'd love to give advice! What are you planning - catching a specific fish, dealing with weather, or choosing equipment?"
+        
+        info = KnowledgeGraph.get_comprehensive_info(entity)
+        
+        parts = [f"Fishing Advice: {entity.title()}\n\n"]
+        
+        # Get comprehensive info
+        seasons = [r["target"] for r in info["outgoing"] if r["relation"] == "SEASONALLY_AVAILABLE_IN"]
+        locations = [r["target"] for r in info["outgoing"] if r["relation"] == "FOUND_IN"]
+        catch_conditions = [r["target"] for r in info["outgoing"] if r["relation"] == "CATCH_IN"]
+        
+        if seasons:
+            parts.append(f"Best Timing: Target {entity} during {', '.join(seasons)}\n\n")
+        if locations:
+            parts.append(f"Where to Go: Focus on {', '.join(locations)} areas\n\n")
+        if catch_conditions:
+            parts.append(f"Ideal Conditions: Look for {', '.join(catch_conditions)}\n\n")
+        
+        parts.append(ConversationalResponseBuilder.PRO_TIPS)
+        return "".join(parts)
+    
+    @staticmethod
+    def _handle_general(entity, entities, memory, message):
+        if not entity:
+            return "I'm here to help! Ask me about fish species (Hilsa, Catfish, Salmon), seasons, locations, water conditions, or equipment."
+        
+        info = KnowledgeGraph.get_comprehensive_info(entity)
+        
+        if not info["entity"]:
+            # Closest node by name, aliases and context
+            index = SnapshotStore.index("retrieval")
+            match = index.best_match(entity, RETRIEVAL_SUGGEST_SCORE) if index is not None else None
+            if match:
+                memory.offered_topic = match  # A "yes" answers about it
+                return f"Did you mean '{match}'? Let me know and I'll tell you all about it!"
+            
+            # Try fuzzy match
+            corrected = FuzzyMatcher.correct_message(entity)
+            if corrected != entity:
+                return f"Did you mean '{corrected}'? Let me know and I'll tell you all about it!"
+            return f"I couldn't find '{entity}' in my knowledge base. Try asking about Hilsa, Catfish, Salmon, water conditions, or equipment!"
+        
+        parts = [f"About {info['entity']}\n\n"]
+        
+        # Categorize information
+        seasons = []
+        locations = []
+        conditions = []
+        suitable = []
+        not_suitable = []
+        
+        for rel in info["outgoing"]:
+            if rel["relation"] == "SEASONALLY_AVAILABLE_IN":
+                seasons.append(rel["target"])
+            elif rel["relation"] in ["FOUND_IN", "AVAILABLE_IN"]:
+                locations.append(rel["target"])
+            elif rel["relation"] in ["CATCH_IN", "AFFECTED_BY"]:
+                conditions.append(rel["target"])
+            elif rel["relation"] == "SUITABLE_FOR":
+                suitable.append(rel["target"])
+            elif rel["relation"] == "NOT_SUITABLE_FOR":
+                not_suitable.append(rel["target"])
+        
+        # Build response
+        for label, values in (("Season", seasons), ("Location", locations), ("Conditions", conditions),
+                              ("Good for", suitable), ("Not good for", not_suitable)):
+            if values:
+                parts.append(f"{label}: {', '.join(dict.fromkeys(values))}\n")  # Deduplicated, graph order
+        
+        if not any([seasons, locations, conditions, suitable, not_suitable]):
+            parts.append("I have this in my database, but limited details. Ask me something specific about it!\n")
+        
+        parts.append("\n What else would you like to know?")
+        return "".join(parts)
+    
+    @staticmethod
+    def _build_comprehensive_info(info: Dict) -> str:
+        """Build comprehensive information response"""
+        parts = [f"{info['entity']}\n\n"]
+        
+        seasons = [r["target"] for r in info["outgoing"] if r["relation"] == "SEASONALLY_AVAILABLE_IN"]
+        locations = [r["target"] for r in info["outgoing"] if r["relation"] == "FOUND_IN"]
+        conditions = [r["target"] for r in info["outgoing"] if r["relation"] == "CATCH_IN"]
+        
+        if seasons:
+            parts.append(f"Season: {', '.join(seasons)}\n")
+        if locations:
+            parts.append(f"Location: {','.join(locations)}\n")
+        if conditions:
+            parts.append(f"Best Conditions: {', '.join(conditions)}\n")
+        
+        return "".join(parts)
+    
+    @staticmethod
+    def _add_suggestions(response: str, suggesting, memory: ConversationMemory) -> str:
+        """Add proactive suggestions, from the lookup started next to the handler"""
+        deadline = turn_deadline.get()
+        try:
+            suggestions = suggesting.result(timeout=deadline.remaining() if deadline else None)
+        except (DependencyUnavailable, FutureTimeout):
+            return response  # Suggestions are optional; skip them in limited mode or when out of time
+        
+        if suggestions and reply_random().random() < 0.6:  # 60% chance
+            transition = ResponseGenerator.pick_template("transition", topic=suggestions[0])
+            response = f"{response}\n\n{transition} you might also want to know about {suggestions[0]}."
+            memory.offered_topic = suggestions[0]
+            memory.add_topic(suggestions[0])  # Don't offer it again
+        
+        return response
+
+# ============= MAIN QUERY PROCESSOR =============
+
+def process_conversation(message: str, session_id: str, lang: str = "en",
+                         memory: Optional[ConversationMemory] = None) -> str:
+    """Main conversation processor with all enhancements"""
+    
+    # Get or create session memory (/chat loads it while the message is still being translated)
+    if memory is None:
+        memory = SessionStore.load(session_id)
+    
+    trace = current_turn.get()
+    understand_started = time.perf_counter()
+    if REPLY_SEED is not None:
+        reply_rng.set(ResponseGenerator.turn_rng(message, memory.turn_count, memory.current_topic, REPLY_SEED))
+    
+    # Auto-correct typos
+    corrected_message = FuzzyMatcher.correct_message(message)
+    
+    # Expand with synonyms
+    expanded_queries = Synonyms.expand_query(corrected_message)
+    
+    # Extract entities (try original and corrected)
+    entities = {
+        "fish": [],
+        "seasons": [],
+        "months": [],
+        "locations": [],
+        "conditions": [],
+        "gear": [],
+        "water_quality": [],
+        "economic": []
+    }
+    
+    # Extract from corrected message
+    for fish in FuzzyMatcher.KNOWN_ENTITIES["fish"]:
+        if fish in corrected_message.lower():
+            entities["fish"].append(fish)
+    
+    for season in FuzzyMatcher.KNOWN_ENTITIES["seasons"]:
+        if season in corrected_message.lower():
+            entities["seasons"].append(season)
+    
+    for month in FuzzyMatcher.KNOWN_ENTITIES["months"]:
+        if month in corrected_message.lower():
+            entities["months"].append(month)
+    
+    for loc in FuzzyMatcher.KNOWN_ENTITIES["locations"]:
+        if loc in corrected_message.lower():
+            entities["locations"].append(loc)
+    
+    for cond in FuzzyMatcher.KNOWN_ENTITIES["conditions"]:
+        if cond in corrected_message.lower():
+            entities["conditions"].append(cond)
+            if cond in ["murky", "clean"]:
+                entities["water_quality"].append(cond)
+    
+    for gear in FuzzyMatcher.KNOWN_ENTITIES["gear"]:
+        if gear in corrected_message.lower():
+            entities["gear"].append(gear)
+    
+    if any(word in corrected_message.lower() for word in ["income", "cost", "money", "profit"]):
+        entities["economic"].append("income")
+    
+    # Classify intent
+    intent = SmartIntentClassifier.classify(corrected_message, entities, memory)
+    if trace is not None:
+        trace.record["latency_ms"]["understand"] = round((time.perf_counter() - understand_started) * 1000, 2)
+    
+    # Build response
+    if trace is not None:
+        with trace.stage("respond"):
+            response = ConversationalResponseBuilder.build_response(
+                intent, entities, memory, corrected_message)
+    else:
+        response = ConversationalResponseBuilder.build_response(
+            intent, entities, memory, corrected_message)
+    
+    # Update memory
+    memory.add_turn(message, intent)
+    memory.last_intent = intent
+    
+    # Update topics
+    if memory.current_topic:
+        memory.add_topic(memory.current_topic)
+    
+    SessionStore.save(session_id, memory)
+    
+    # Replies end by offering more ("Would you like...?") or name a suggestion;
+    # fetch what "yes" will need while the user reads
+    next_topic = memory.offered_topic or (memory.current_topic if response.rstrip().endswith("?") else None)
+    if PREFETCH_ENABLED and next_topic:
+        prefetcher.schedule(next_topic, bengali=lang == "bn")
+    
+    trace_turn(
+        corrected=corrected_message,
+        entities={kind: found for kind, found in entities.items() if found},
+        intent=intent,
+        stage=memory.stage,
+        topic=memory.current_topic,
+    )
+    return response
+# ============= CACHE WARM-UP =============
+
+class CacheWarmer:
+    """Pre-populate the graph, translation and fragment caches after a deploy
+
+    Popular entities, Bengali questions and reply paragraphs come from the
+    newest turn logs (TurnLogger's JSONL, rotated .gz files included) plus
+    the curated seed file, most frequent first, until the time budget runs out.
+    """
+
+    # Intents whose handlers always look up the same graph entity
+    INTENT_ENTITIES = {
+        "economic": ["Income"],
+        "water_condition": ["Murky Water"],
+    }
+
+    @staticmethod
+    def recent_log_files() -> List[str]:
+        stem, ext = os.path.splitext(TURN_LOG_PATH)
+        files = [f for f in glob.glob(f"{stem}*{ext}*") if os.path.isfile(f)]
+        files.sort(key=os.path.getmtime, reverse=True)
+        return files[:WARMUP_LOG_FILES]
+
+    @staticmethod
+    def read_records(paths: List[str], limit: int = WARMUP_MAX_RECORDS):
+        seen = 0
+        for path in paths:
+            opener = gzip.open if path.endswith(".gz") else open
+            try:
+                with opener(path, "rt", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            yield json.loads(line)
+                        except ValueError:
+                            continue  # Partially written line
+                        seen += 1
+                        if seen >= limit:
+                            return
+            except OSError:
+                continue
+
+    @staticmethod
+    def collect() -> Dict[str, List[str]]:
+        """Most frequent entities, Bengali phrases and reply fragments, seed entries first"""
+        entities, phrases, fragments = Counter(), Counter(), Counter()
+
+        for record in CacheWarmer.read_records(CacheWarmer.recent_log_files()):
+            for found in (record.get("entities") or {}).values():
+                entities.update(found)
+            if record.get("topic"):
+                entities[record["topic"]] += 1
+            entities.update(CacheWarmer.INTENT_ENTITIES.get(record.get("intent"), []))
+            if record.get("input_lang") == "bn" and record.get("message"):
+                phrases[record["message"]] += 1
+            if record.get("reply_lang") == "bn" and record.get("reply_en"):
+                fragments.update(f for f in reply_fragments(record["reply_en"]) if f.strip())
+
+        seed = {}
+        if os.path.exists(WARMUP_SEED_PATH):
+            with open(WARMUP_SEED_PATH, encoding="utf-8") as f:
+                seed = json.load(f)
+
+        def ranked(seeded: List[str], counts: Counter) -> List[str]:
+            ordered = list(dict.fromkeys(seeded + [item for item, _ in counts.most_common()]))
+            return ordered[:WARMUP_TOP_K]
+
+        return {
+            "entities": ranked(seed.get("entities", []), entities),
+            "bn_phrases": ranked(seed.get("bn_phrases", []), phrases),
+            "reply_fragments": ranked(seed.get("reply_fragments", []), fragments),
+        }
+
+    @staticmethod
+    def _translate(text: str, src: str, dest: str, cache: TwoTierCache):
+        key = f"{src}:{dest}:{text}"
+        if cache.get(key) is None:
+            translated = translator_breaker.call(lambda: get_translator().translate(text, src=src, dest=dest))
+            cache.set(key, translated.text)
+
+    @staticmethod
+    def run(budget_seconds: float) -> Dict[str, int]:
+        """Warm as much as fits in the budget; a failing dependency ends its category"""
+        started = time.monotonic()
+        deadline = started + budget_seconds
+        targets = CacheWarmer.collect()
+        warmed = {"entities": 0, "bn_phrases": 0, "reply_fragments": 0}
+
+        jobs = {
+            "entities": KnowledgeGraph.get_comprehensive_info,
+            "bn_phrases": lambda text: CacheWarmer._translate(text, "bn", "en", translation_cache),
+            "reply_fragments": lambda text: CacheWarmer._translate(text, "en", "bn", fragment_cache),
+        }
+        for category, warm in jobs.items():
+            for item in targets[category]:
+                if time.monotonic() >= deadline:
+                    break
+                try:
+                    warm(item)
+                except DependencyUnavailable:
+                    break
+                warmed[category] += 1
+
+        logger.info("Cache warm-up done in %.1fs: %s", time.monotonic() - started, warmed)
+        return warmed
+
+class Prefetcher:
+    """Fetch the next likely topic's graph record (and Bengali text) ahead of the "yes"
+
+    At most PREFETCH_MAX_PENDING jobs wait at once and PREFETCH_WORKERS run;
+    anything beyond that, repeats of an in-flight topic, and work for a
+    dependency whose breaker isn't closed are dropped rather than queued.
+    """
+
+    def __init__(self, workers: int = PREFETCH_WORKERS, max_pending: int = PREFETCH_MAX_PENDING):
+        self.max_pending = max_pending
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch")
+        self._in_flight = set()
+        self._lock = threading.Lock()
+        self.scheduled = 0
+        self.dropped = 0
+
+    def schedule(self, entity: str, bengali: bool = False):
+        key = (entity.lower(), bengali)
+        with self._lock:
+            if key in self._in_flight or len(self._in_flight) >= self.max_pending \
+                    or graph_breaker.state != "closed":
+                self.dropped += 1
+                return
+            self._in_flight.add(key)
+            self.scheduled += 1
+        self._pool.submit(self._fetch, entity, bengali, key)
+
+    def _fetch(self, entity: str, bengali: bool, key):
+        try:
+            info = KnowledgeGraph.get_comprehensive_info(entity)
+            if bengali and info["entity"] and translator_breaker.state == "closed":
+                # The affirmative reply: an intro, then the entity's summary
+                texts = list(ResponseGenerator.TEMPLATES["affirmative_response"])
+                texts += reply_fragments(ConversationalResponseBuilder._build_comprehensive_info(info))
+                for text in texts:
+                    if text.strip():
+                        CacheWarmer._translate(text, "en", "bn", fragment_cache)
+        except DependencyUnavailable:
+            pass
+        finally:
+            with self._lock:
+                self._in_flight.discard(key)
+
+
+prefetcher = Prefetcher()
+
+def looks_bengali(text: str) -> bool:
+    """Offline language guess: any character from the Bengali Unicode block"""
+    return any("\u0980" <= ch <= "\u09ff" for ch in text)
+
+async def detect_language(text: str) -> str:
+    """Detected language code, cached per message text"""
+    key = f"detect:{text}"
+    lang = translation_cache.get(key)
+    if lang is None:
+        lang = (await translator_breaker.acall(lambda: get_translator().detect(text))).lang
+        translation_cache.set(key, lang)
+    return lang
+
+async def translate_text(text: str, src: str, dest: str, cache: TwoTierCache = translation_cache) -> str:
+    """Translated text, cached per (src, dest, text)"""
+    key = f"{src}:{dest}:{text}"
+    translated = cache.get(key)
+    if translated is None:
+        translated = (await translator_breaker.acall(
+            lambda: get_translator().translate(text, src=src, dest=dest))).text
+        cache.set(key, translated)
+    return translated
+
+def reply_fragments(reply: str) -> List[str]:
+    """Split a reply into the paragraphs that are translated and cached separately"""
+    return reply.split("\n\n")
+
+async def translate_reply(reply_en: str) -> str:
+    """English reply to Bengali, paragraph by paragraph through the fragment cache"""
+    fragments = reply_fragments(reply_en)
+    translated = await asyncio.gather(*(
+        translate_text(fragment, src="en", dest="bn", cache=fragment_cache) if fragment.strip()
+        else asyncio.sleep(0, result=fragment)
+        for fragment in fragments
+    ))
+    return "\n\n".join(translated)
+
+# ============= ADMISSION CONTROL =============
+
+class RateLimiter:
+    """Token bucket per key; the least recently seen keys are dropped past max_keys"""
+
+    def __init__(self, name: str, per_minute: float, burst: float, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.name = name
+        self.rate = per_minute / 60
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> (tokens, updated_at)
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.limited = 0
+
+    def acquire(self, key: str) -> float:
+        """Take a token: 0.0 when allowed, else seconds until one is available"""
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+                self.allowed += 1
+            else:
+                wait = (1 - tokens) / self.rate
+                self.limited += 1
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def snapshot(self) -> Dict:
+        return {"per_minute": self.rate * 60, "burst": self.burst, "keys": len(self._buckets),
+                "allowed": self.allowed, "limited": self.limited}
+
+
+class Overloaded(Exception):
+    """No turn slot free and the wait queue is full (or the wait timed out)"""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Bound concurrent turns; queue a few more, returning sessions first, shed the rest
+
+    Runs on the event loop only. A finished turn hands its slot straight to the
+    oldest priority waiter, then the oldest new-session waiter.
+    """
+
+    def __init__(self, max_active: int = CHAT_MAX_CONCURRENCY, max_queue: int = CHAT_QUEUE_SIZE,
+                 queue_timeout: float = CHAT_QUEUE_TIMEOUT, new_session_share: float = CHAT_NEW_SESSION_QUEUE_SHARE):
+        self.max_active = max_active
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.new_session_share = new_session_share
+        self.active = 0
+        self._waiters = {True: deque(), False: deque()}  # priority -> futures
+        self.service_time = 1.0  # EWMA of seconds per turn, for Retry-After
+        self.counts = Counter()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters[True]) + len(self._waiters[False])
+
+    def retry_after(self) -> int:
+        """Seconds until the queue ahead of a new arrival should have drained"""
+        return max(1, math.ceil(self.service_time * (self.waiting + 1) / self.max_active))
+
+    async def enter(self, priority: bool) -> float:
+        """Wait for a turn slot; returns the start time to pass to leave()"""
+        if self.active < self.max_active and not self.waiting:
+            self.active += 1
+            self.counts["admitted"] += 1
+            return time.perf_counter()
+        limit = self.max_queue if priority else int(self.max_queue * self.new_session_share)
+        if self.waiting >= limit:
+            self.counts["shed_queue_full"] += 1
+            raise Overloaded("queue full", self.retry_after())
+        
+        future = asyncio.get_running_loop().create_future()
+        queue = self._waiters[priority]
+        queue.append(future)
+        queued_at = time.perf_counter()
+        try:
+            await asyncio.wait({future}, timeout=self.queue_timeout)
+        except BaseException:
+            if future.done():
+                self._release()  # Handed a slot just as the client went away
+            else:
+                queue.remove(future)
+                future.cancel()
+            raise
+        if not future.done():
+            queue.remove(future)
+            future.cancel()
+            self.counts["shed_timeout"] += 1
+            raise Overloaded("queue timeout", self.retry_after())
+        self.counts["admitted"] += 1
+        self.counts["queued"] += 1
+        self.counts["queue_wait_ms"] += round((time.perf_counter() - queued_at) * 1000)
+        return time.perf_counter()
+
+    def leave(self, started: float):
+        self.service_time = 0.9 * self.service_time + 0.1 * (time.perf_counter() - started)
+        self._release()
+
+    def _release(self):
+        for priority in (True, False):
+            queue = self._waiters[priority]
+            while queue:
+                future = queue.popleft()
+                if not future.done():
+                    future.set_result(None)  # The slot passes on; active is unchanged
+                    return
+        self.active -= 1
+
+    def snapshot(self) -> Dict:
+        return {"active": self.active, "max_active": self.max_active,
+                "waiting": self.waiting, "waiting_priority": len(self._waiters[True]),
+                "max_queue": self.max_queue, "service_ms": round(self.service_time * 1000, 1),
+                **self.counts}
+
+
+session_limiter = RateLimiter("session", RATE_SESSION_PER_MINUTE, RATE_SESSION_BURST)
+ip_limiter = RateLimiter("ip", RATE_IP_PER_MINUTE, RATE_IP_BURST)
+admission = AdmissionController()
+
+
+def require_admin(request: Request):
+    """Route dependency for operator data: hidden without ADMIN_TOKEN, 401 without the right header"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not hmac.compare_digest(request.headers.get(ADMIN_HEADER, "").encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail=f"{ADMIN_HEADER} required")
+
+
+def client_ip(request: Request) -> str:
+    """The caller's address; behind TRUSTED_PROXY_HOPS proxies, the one they saw"""
+    if TRUSTED_PROXY_HOPS:
+        hops = [hop.strip() for hop in request.headers.get("x-forwarded-for", "").split(",") if hop.strip()]
+        if len(hops) >= TRUSTED_PROXY_HOPS:
+            return hops[-TRUSTED_PROXY_HOPS]
+    return request.client.host if request.client else "unknown"
+
+
+@router.post("/chat")
+async def chat(request: ChatRequest, session: Request):
+    # Keep the caller's session when its token checks out, otherwise start a new one.
+    # A client sending the header manages sessions itself (one per chat), so the
+    # cookie only counts when the header is absent.
+    token = session.headers.get(SESSION_HEADER)
+    if token is None:
+        token = session.cookies.get(SESSION_COOKIE)
+    session_id = SessionTokens.verify(token)
+    returning = session_id is not None
+    if not returning:
+        token = SessionTokens.issue()
+        session_id = SessionTokens.verify(token)
+    
+    # Cheap checks first: the caller's buckets, then a slot for the turn
+    for limiter, key in ((ip_limiter, client_ip(session)), (session_limiter, session_id)):
+        wait = limiter.acquire(key)
+        if wait:
+            raise HTTPException(status_code=429, detail=f"Too many messages ({limiter.name} limit)",
+                                headers={"Retry-After": str(math.ceil(wait))})
+    try:
+        started = await admission.enter(priority=returning)
+    except Overloaded as e:
+        raise HTTPException(status_code=503, detail=f"Busy ({e})", headers={"Retry-After": str(e.retry_after)})
+    try:
+        return await answer_chat(request, session_id, token, profile=TurnProfiler.wanted(session))
+    finally:
+        admission.leave(started)
+
+
+async def answer_chat(request: ChatRequest, session_id: str, token: str,
+                      profile: Optional[str] = None) -> JSONResponse:
+    user_message = request.message.strip()
+    trace = TurnTrace(session_id)
+    current_turn.set(trace)
+    deadline = TurnDeadline()
+    turn_deadline.set(deadline)
+
+    # The turn as a small dependency graph: session state, language detection and -
+    # for Bengali script, which detection only confirms - the bn->en translation
+    # don't depend on each other, so they start together
+    loading = asyncio.create_task(asyncio.to_thread(SessionStore.load, session_id))
+    detecting = asyncio.create_task(timed_stage(trace, "detect", detect_language(user_message)))
+    translating = None
+    if looks_bengali(user_message):
+        translating = asyncio.create_task(timed_stage(
+            trace, "translate_in", translate_text(user_message, src="bn", dest="en")))
+
+    try:
+        is_bengali_input = await deadline.wait(detecting) == "bn"
+    except (DependencyUnavailable, asyncio.TimeoutError):
+        is_bengali_input = looks_bengali(user_message)
+
+    # Translate Bengali input to English for processing
+    message_en = user_message
+    reply_en = None
+    translated_in = False
+    if is_bengali_input:
+        if translating is None:
+            translating = asyncio.create_task(timed_stage(
+                trace, "translate_in", translate_text(user_message, src="bn", dest="en")))
+        try:
+            message_en = await deadline.wait(translating)
+            translated_in = True
+        except (DependencyUnavailable, asyncio.TimeoutError):
+            # Can't understand the question without translation - answer in English
+            reply_en = "Bengali translation is unavailable right now. " + ResponseGenerator.pick_template(
+                "no_data", alternative="questions asked in English")
+    elif translating is not None:
+        translating.cancel()
+
+    # Process chatbot logic in English (graph calls block, so keep them off the event loop)
+    if reply_en is None:
+        try:
+            memory = await deadline.wait(loading)
+            process = partial(process_conversation, memory=memory)
+            if profile:
+                process = partial(TurnProfiler.run, trace, process)
+            with trace.stage("process"):
+                reply_en = await deadline.wait(asyncio.to_thread(
+                    process, message_en, session_id, "bn" if translated_in else "en"))
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=504, detail=f"No answer within {TURN_DEADLINE_SECONDS:g}s",
+                                headers={"Retry-After": "5"})
+
+    # If Bengali input, translate back (paragraphs in parallel); serve English if
+    # the translator is down or the turn is out of time
+    reply_text = reply_en
+    reply_lang = "en"
+    if translated_in:
+        with trace.stage("translate_out"):
+            try:
+                reply_text = await deadline.wait(translate_reply(reply_en))
+                reply_lang = "bn"
+            except (DependencyUnavailable, asyncio.TimeoutError):
+                pass
+
+    trace.finish(
+        message=user_message,
+        message_en=message_en,
+        input_lang="bn" if is_bengali_input else "en",
+        reply_lang=reply_lang,
+        reply=reply_text,
+        reply_en=reply_en,
+    )
+    slow_turns.consider(trace, profile)
+    if TURN_LOG_ENABLED:
+        turn_logger.log(trace.record)
+
+    # Generate TTS if Bengali
+    response = JSONResponse({
+        "reply": reply_text,
+        "lang": reply_lang,
+        "session": token,
+        "intent": trace.record.get("intent"),  # Sent back with feedback on this reply
+    })
+    # For clients that don't manage the header; cross-site since the page may be on another origin
+    response.set_cookie(SESSION_COOKIE, token, max_age=SESSION_TTL, httponly=True,
+                        secure=True, samesite="none")
+    return response
+
+# Specific routes must come BEFORE the catch-all static mount
+@router.get("/healthz")
+async def healthz():
+    """Liveness - the process is up; never touches the backends"""
+    return {"status": "ok"}
+
+@router.get("/metrics", dependencies=[Depends(require_admin)])
+async def metrics():
+    """Admission and rate-limit counters, for sizing CHAT_* and RATE_* settings"""
+    return {
+        "admission": admission.snapshot(),
+        "rate_limits": {limiter.name: limiter.snapshot() for limiter in (session_limiter, ip_limiter)},
+    }
+
+@router.get("/readyz")
+async def readyz():
+    """Readiness - both backends answered recently"""
+    await asyncio.gather(
+        _refresh_health("graph", check_graph),
+        _refresh_health("mongo", check_mongo),
+    )
+    ready = all(status["ok"] for status in backend_health.values())
+    breakers = {b.name: b.snapshot() for b in (graph_breaker, graph_export_breaker, translator_breaker, mongo_breaker)}
+    return JSONResponse(
+        {"status": "ready" if ready else "unavailable", "backends": backend_health,
+         "breakers": breakers, "startup_ms": startup_timings},
+        status_code=200 if ready else 503,
+    )
+
+@router.get("/admin", response_class=HTMLResponse)
+async def admin_page():
+    with open(os.path.join(static_root(), "admin.html")) as f:
+        return f.read()
+
+@router.get("/admin/queries", dependencies=[Depends(require_admin)])
+async def get_query_log():
+    """Graph query statistics by template, with plans for the slow ones"""
+    return query_log.snapshot()
+
+@router.get("/admin/slow-turns", dependencies=[Depends(require_admin)])
+async def get_slow_turns(limit: int = 0):
+    """Recent turns over SLOW_TURN_MS, or profiled via the X-Profile header, newest first"""
+    return slow_turns.snapshot(limit)
+
+@router.get("/feedbacks")
+async def get_feedbacks(limit: int = 0):
+    """Saved feedback; with limit, only the newest `limit`"""
+    def fetch():
+        cursor = get_feedback_collection().find({}, {"_id": 0})  # Exclude ObjectId
+        if limit > 0:
+            cursor = cursor.sort("timestamp", -1).limit(limit)
+        return list(cursor)
+    
+    try:
+        feedbacks = await mongo_breaker.acall(fetch)
+        return feedbacks
+    except DependencyUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))  # For error handling
+
+@router.get("/feedbacks/summary")
+async def get_feedback_summary(days: int = FEEDBACK_SUMMARY_DAYS):
+    """Feedback counts by type, reason, intent and day, from the rollups (no scan)"""
+    try:
+        return await mongo_breaker.acall(FeedbackRollups.summary, max(1, min(days, 366)))
+    except DependencyUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+@router.post("/admin/feedbacks/rebuild-summary", dependencies=[Depends(require_admin)])
+async def rebuild_feedback_summary():
+    """Run the one-time feedback backfill now; a full scan, so off the Mongo breaker's timeout"""
+    try:
+        backfilled = await asyncio.to_thread(FeedbackRollups.backfill)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Backfill failed: {e}")
+    return {"status": "backfilled" if backfilled else "already backfilled or in progress"}
+    
+def compact_graph(graph: Dict) -> Dict:
+    """Dictionary-encode a {nodes, edges} graph
+
+    Node labels and relation types are listed once; nodes refer to labels by
+    index, and edges are a flat [from, to, relation, from, to, relation, ...]
+    array of node and relation indexes. Layout coordinates, when present, are
+    a flat [x, y, x, y, ...] array parallel to ids (null where unplaced).
+    """
+    label_index = {}
+    relation_index = {}
+    node_index = {}
+    ids = []
+    node_labels = []
+    for node in graph["nodes"]:
+        node_index[node["id"]] = len(ids)
+        ids.append(node["id"])
+        node_labels.append(label_index.setdefault(node["label"], len(label_index)))
+    
+    edges = []
+    for edge in graph["edges"]:
+        edges.extend((
+            node_index[edge["from"]],
+            node_index[edge["to"]],
+            relation_index.setdefault(edge["label"], len(relation_index)),
+        ))
+    
+    compact = {
+        "format": "compact",
+        "ids": ids,
+        "labels": list(label_index),
+        "node_labels": node_labels,
+        "relations": list(relation_index),
+        "edges": edges,
+    }
+    if "layout_version" in graph:
+        compact["xy"] = [node.get(axis) for node in graph["nodes"] for axis in ("x", "y")]
+        compact["layout_version"] = graph["layout_version"]
+    return compact
+
+@router.get("/graph")
+async def get_graph(format: str = "full"):
+    """Whole graph for the admin viewer; format=compact for the encoded form"""
+    try:
+        graph_data = await graph_export_breaker.acall(lambda: get_graph_backend().export())
+        layout = SnapshotStore.index("layout")
+        if layout is not None:
+            layout.attach(graph_data)
+        if format == "compact":
+            return compact_graph(graph_data)
+        return graph_data
+    except DependencyUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def static_root() -> str:
+    """Built assets when build_assets.py has run, the raw sources otherwise"""
+    if os.path.isfile(os.path.join(STATIC_BUILD_DIR, "index.html")):
+        return STATIC_BUILD_DIR
+    return STATIC_DIR
+
+
+def accepted_encodings(accept_encoding: str, offered: Tuple[str, ...]) -> List[str]:
+    """The offered content codings the client takes, its preferred first
+
+    Accept-Encoding is read as codings with q-values: q=0 refuses a coding,
+    "*" stands for every coding not named, and ties keep the offered order.
+    """
+    weights = {}
+    for item in accept_encoding.split(","):
+        coding, *params = item.split(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[coding] = q
+    default = weights.get("*", 0.0)
+    ranked = sorted(offered, key=lambda coding: -weights.get(coding, default))
+    return [coding for coding in ranked if weights.get(coding, default) > 0]
+
+
+class CachedStaticFiles(StaticFiles):
+    """Static files with precompressed variants and cache headers
+
+    Fingerprinted names (name.<hash>.ext) never change content, so they are
+    cached forever; HTML is revalidated every time through its ETag.
+    """
+
+    FINGERPRINTED = re.compile(r"\.[0-9a-f]{10}\.[A-Za-z0-9]+$")
+    ENCODINGS = {"br": ".br", "gzip": ".gz"}  # Preferred first
+
+    async def get_response(self, path: str, scope):
+        if scope["method"] in ("GET", "HEAD"):
+            request_headers = Headers(scope=scope)
+            accepted = accepted_encodings(request_headers.get("accept-encoding", ""), tuple(self.ENCODINGS))
+            target = os.path.normpath(os.path.join(path, "index.html")) if path in ("", ".") else path
+            for encoding in accepted:
+                full_path, stat_result = await run_in_threadpool(self.lookup_path, target + self.ENCODINGS[encoding])
+                if stat_result and stat.S_ISREG(stat_result.st_mode):
+                    response = FileResponse(
+                        full_path,
+                        stat_result=stat_result,
+                        media_type=mimetypes.guess_type(target)[0] or "application/octet-stream",
+                        headers={"Content-Encoding": encoding},
+                    )
+                    self._set_cache_headers(response, target)
+                    if self.is_not_modified(response.headers, request_headers):
+                        return NotModifiedResponse(response.headers)
+                    return response
+        return await super().get_response(path, scope)
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        self._set_cache_headers(response, str(full_path))
+        return response
+
+    def _set_cache_headers(self, response, path: str):
+        if path.endswith(".html"):
+            response.headers["Cache-Control"] = "no-cache"
+        elif self.FINGERPRINTED.search(path):
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        else:
+            response.headers["Cache-Control"] = f"public, max-age={STATIC_MAX_AGE}"
+        response.headers["Vary"] = "Accept-Encoding"
+
+
+class CompressionMiddleware:
+    """gzip/brotli for dynamic responses above a size threshold
+
+    Responses that already carry a Content-Encoding (precompressed static
+    files), non-text content types and partial content (206, or any
+    Content-Range: its byte offsets refer to the uncompressed body) pass
+    straight through.
+    """
+
+    COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+
+    def __init__(self, app, minimum_size: int = COMPRESS_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        accepted = accepted_encodings(Headers(scope=scope).get("accept-encoding", ""),
+                                      ("br", "gzip") if brotli is not None else ("gzip",))
+        if not accepted:
+            await self.app(scope, receive, send)
+            return
+        encoding = accepted[0]
+
+        start = None
+        passthrough = False
+        chunks = []
+
+        async def send_compressed(message):
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "")
+                if ("content-encoding" in headers or "content-range" in headers or message["status"] == 206
+                        or not content_type.startswith(self.COMPRESSIBLE_TYPES)):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start = message  # Hold until we know the body size
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            body = b"".join(chunks)
+            if len(body) < self.minimum_size:
+                await send(start)
+                await send({"type": "http.response.body", "body": body})
+                return
+
+            if encoding == "br":
+                body = brotli.compress(body, quality=COMPRESS_BROTLI_QUALITY)
+            else:
+                body = gzip.compress(body, compresslevel=COMPRESS_GZIP_LEVEL)
+            headers = [(k, v) for k, v in start["headers"] if k.lower() != b"content-length"]
+            headers += [
+                (b"content-encoding", encoding.encode()),
+                (b"content-length", str(len(body)).encode()),
+                (b"vary", b"Accept-Encoding"),
+            ]
+            await send({**start, "headers": headers})
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
+
+
+def create_app() -> FastAPI:
+    """Build the ASGI app; each worker process calls this once"""
+    app = FastAPI(lifespan=lifespan)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # Use "*" for testing; replace with your GitHub Pages URL (e.g., "https://chickensanwich.github.io/Fishermen-chatbot") in production for security
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["Retry-After"],  # script.js tells the user when to retry
+    )
+    app.add_middleware(CompressionMiddleware, minimum_size=COMPRESS_MIN_SIZE)
+    app.include_router(router)
+    # Now the catch-all static mount (this serves index.html and other frontend files)
+    app.mount("/", CachedStaticFiles(directory=static_root(), html=True), name="static")
+    return app
+
+
+def __getattr__(name: str):
+    """`fishing_chatbot:app` (kept for `uvicorn fishing_chatbot:app`), built on first access
+
+    Built at import, it would be a second app in every gunicorn worker, which
+    already calls create_app() itself.
+    """
+    if name == "app":
+        globals()["app"] = app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+startup_timings["import:fishing_chatbot"] = round((time.perf_counter() - _IMPORT_STARTED) * 1000, 1)
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run("fishing_chatbot:create_app", factory=True, host="0.0.0.0",
+                port=int(os.getenv("PORT", "8000")), workers=int(os.getenv("WEB_CONCURRENCY", "1")))
\ No newline at end of file
@@ -0,0 +1,18 @@
+# Multi-worker entry point: gunicorn -c gunicorn.conf.py
+import multiprocessing
+import os
+
+wsgi_app = "fishing_chatbot:create_app()"  # One app per worker; importing the module builds none
+worker_class = "uvicorn.workers.UvicornWorker"
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+
+# One worker per core; Render and most PaaS hosts set WEB_CONCURRENCY
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+
+# Don't preload: every worker opens its own Neo4j/Mongo pools after the fork.
+# Pool sizes (NEO4J_MAX_POOL_SIZE, MONGO_MAX_POOL_SIZE) are per worker.
+preload_app = False
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = 30
+keepalive = 5
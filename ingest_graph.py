@@ -0,0 +1,309 @@
+"""Bulk-load knowledge-graph nodes and edges into Neo4j.
+
+    python ingest_graph.py --nodes fish.csv districts.jsonl --edges edges.csv
+                           [--batch-size 1000] [--dry-run] [--offline] [--restart]
+
+Node rows need `name` and `label`; `aliases` (a list, or "|"-separated in CSV)
+and any other columns become node properties. Edge rows need `source`,
+`relation` and `target` (node names), plus `source_label`/`target_label` for
+an endpoint that isn't in the node files, so its MATCH uses the label's name
+index. Relations must be in KnowledgeGraph.RELATIONS. Every file is validated
+before anything is written.
+
+Rows are written in UNWIND ... MERGE transactions of --batch-size rows, grouped
+by label/relation since Cypher can't parameterise them. After each batch the
+row offset per file is checkpointed, so an interrupted run resumes where it
+stopped; MERGE makes replaying a half-written batch harmless. Finally the
+graph is dumped to the snapshot file the chatbot boots from (with --offline,
+the snapshot is built from the input files alone and Neo4j is not touched).
+--sqlite also loads that snapshot into a SQLite file for GRAPH_BACKEND=sqlite.
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+
+from fishing_chatbot import (GRAPH_SNAPSHOT_PATH, GraphSnapshot, KnowledgeGraph, SQLiteBackend,
+                             graph_session, lazy_import)
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_CHECKPOINT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "ingest_checkpoint.json")
+IDENTIFIER = re.compile(r"^[A-Za-z][A-Za-z0-9_]*$")
+MAX_REPORTED_ERRORS = 20
+
+NODE_FIELDS = ("name", "label", "aliases")
+EDGE_FIELDS = ("source", "relation", "target", "source_label", "target_label")
+
+
+def read_rows(path: str):
+    """Yield (line number, row dict) from a CSV or JSONL file without loading it"""
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            for line_no, line in enumerate(f, 1):
+                if line.strip():
+                    yield line_no, json.loads(line)
+        else:
+            for line_no, row in enumerate(csv.DictReader(f), 2):
+                yield line_no, {key: value for key, value in row.items() if key and value not in (None, "")}
+
+
+def parse_node(row: dict) -> dict:
+    """Normalise a node row; raises ValueError when it can't be written"""
+    name, label = str(row.get("name", "")).strip(), str(row.get("label", "")).strip()
+    if not name:
+        raise ValueError("missing name")
+    if not IDENTIFIER.match(label):
+        raise ValueError(f"label {label!r} is not a valid identifier")
+    props = {key: value for key, value in row.items() if key not in NODE_FIELDS + ("properties",)}
+    if isinstance(row.get("properties"), dict):
+        props.update(row["properties"])
+    aliases = row.get("aliases")
+    if isinstance(aliases, str):
+        aliases = [alias.strip() for alias in aliases.split("|") if alias.strip()]
+    if aliases:
+        props["aliases"] = list(aliases)
+    return {"name": name, "label": label, "props": props}
+
+
+def parse_edge(row: dict) -> dict:
+    edge = {field: str(row.get(field, "")).strip() for field in EDGE_FIELDS}
+    if not edge["source"] or not edge["target"]:
+        raise ValueError("missing source or target")
+    if edge["relation"] not in KnowledgeGraph.RELATIONS:
+        raise ValueError(f"unknown relation {edge['relation']!r}")
+    for field in ("source_label", "target_label"):
+        if edge[field] and not IDENTIFIER.match(edge[field]):
+            raise ValueError(f"{field} {edge[field]!r} is not a valid identifier")
+    return edge
+
+
+def validate(node_files: list, edge_files: list):
+    """One streaming pass over every file: (errors, node name -> label, edge endpoints not in node files)
+
+    An endpoint outside the node files needs its label on the edge row; without
+    one its MATCH would scan every node in the graph.
+    """
+    errors, labels, unknown = [], {}, set()
+    for path in node_files:
+        for line_no, row in read_rows(path):
+            try:
+                node = parse_node(row)
+            except ValueError as e:
+                errors.append(f"{path}:{line_no}: {e}")
+                continue
+            labels.setdefault(node["name"], node["label"])
+    for path in edge_files:
+        for line_no, row in read_rows(path):
+            try:
+                edge = parse_edge(row)
+            except ValueError as e:
+                errors.append(f"{path}:{line_no}: {e}")
+                continue
+            for end in ("source", "target"):
+                if edge[end] in labels:
+                    continue
+                if not edge[f"{end}_label"]:
+                    errors.append(f"{path}:{line_no}: {end} {edge[end]!r} isn't in the node files; "
+                                  f"set {end}_label")
+                    break
+                unknown.add(edge[end])
+    return errors, labels, unknown
+
+
+class Checkpoint:
+    """Rows already written per input file, invalidated when the file changes"""
+
+    def __init__(self, path: str, restart: bool = False):
+        self.path = path
+        self.state = {}
+        if not restart and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.state = json.load(f)
+
+    @staticmethod
+    def _fingerprint(path: str) -> list:
+        stat = os.stat(path)
+        return [stat.st_size, int(stat.st_mtime)]
+
+    def offset(self, path: str) -> int:
+        entry = self.state.get(os.path.abspath(path))
+        if entry and entry["fingerprint"] == self._fingerprint(path):
+            return entry["rows"]
+        return 0
+
+    def advance(self, path: str, rows: int):
+        self.state[os.path.abspath(path)] = {"fingerprint": self._fingerprint(path), "rows": rows}
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp, self.path)
+
+
+def node_cypher(label: str) -> str:
+    return f"UNWIND $rows AS row MERGE (n:`{label}` {{name: row.name}}) SET n += row.props"
+
+
+def edge_cypher(relation: str, source_label: str, target_label: str) -> str:
+    """Both endpoints are matched by label, so each MATCH is a name index lookup"""
+    if not source_label or not target_label:
+        raise ValueError("edge endpoints need a label")
+    return (f"UNWIND $rows AS row MATCH (a:`{source_label}` {{name: row.source}}) "
+            f"MATCH (b:`{target_label}` {{name: row.target}}) MERGE (a)-[:`{relation}`]->(b)")
+
+
+class Ingestor:
+    """Write files in batches, grouping rows by Cypher statement"""
+
+    def __init__(self, labels: dict, batch_size: int, checkpoint: Checkpoint, dry_run: bool = False):
+        self.labels = labels
+        self.batch_size = batch_size
+        self.checkpoint = checkpoint
+        self.dry_run = dry_run
+        self.written = {"nodes": 0, "edges": 0, "transactions": 0}
+
+    def ensure_indexes(self, session):
+        """MERGE on name is a label scan without an index"""
+        for label in sorted(set(self.labels.values())):
+            session.run(f"CREATE INDEX IF NOT EXISTS FOR (n:`{label}`) ON (n.name)").consume()
+
+    def _flush(self, session, groups: dict):
+        for cypher, rows in groups.items():
+            if not self.dry_run:
+                query = lazy_import("neo4j").Query(cypher)
+                session.execute_write(lambda tx: tx.run(query, rows=rows).consume())
+            self.written["transactions"] += 1
+        groups.clear()
+
+    def load(self, session, path: str, kind: str):
+        """Stream one file, skipping the rows a previous run already committed"""
+        done = self.checkpoint.offset(path)
+        if done:
+            print(f"{path}: resuming after {done} rows", file=sys.stderr)
+        started, rows_read, groups = time.perf_counter(), 0, {}
+        for _, row in read_rows(path):
+            rows_read += 1
+            if rows_read <= done:
+                continue
+            if kind == "nodes":
+                node = parse_node(row)
+                groups.setdefault(node_cypher(node["label"]), []).append({"name": node["name"], "props": node["props"]})
+            else:
+                edge = parse_edge(row)
+                cypher = edge_cypher(edge["relation"],
+                                     edge["source_label"] or self.labels.get(edge["source"], ""),
+                                     edge["target_label"] or self.labels.get(edge["target"], ""))
+                groups.setdefault(cypher, []).append({"source": edge["source"], "target": edge["target"]})
+            self.written[kind] += 1
+            if (rows_read - done) % self.batch_size == 0:
+                self._flush(session, groups)
+                if not self.dry_run:
+                    self.checkpoint.advance(path, rows_read)
+                rate = (rows_read - done) / max(time.perf_counter() - started, 1e-9)
+                print(f"{path}: {rows_read} rows ({rate:.0f}/s)", file=sys.stderr)
+        self._flush(session, groups)
+        if not self.dry_run:
+            self.checkpoint.advance(path, rows_read)
+        print(f"{path}: done, {rows_read} rows", file=sys.stderr)
+
+
+def snapshot_from_files(node_files: list, edge_files: list) -> GraphSnapshot:
+    """The snapshot the chatbot would get from Neo4j, built from the input files alone"""
+    nodes, ids = [], {}
+    for path in node_files:
+        for _, row in read_rows(path):
+            node = parse_node(row)
+            if node["name"] in ids:
+                continue
+            ids[node["name"]] = len(nodes)
+            entry = {"id": len(nodes), "name": node["name"], "labels": [node["label"]]}
+            if node["props"].get("aliases"):
+                entry["aliases"] = node["props"]["aliases"]
+            nodes.append(entry)
+    edges, seen = [], set()
+    for path in edge_files:
+        for _, row in read_rows(path):
+            edge = parse_edge(row)
+            key = (edge["source"], edge["relation"], edge["target"])
+            if edge["source"] in ids and edge["target"] in ids and key not in seen:
+                seen.add(key)
+                edges.append({"from": ids[edge["source"]], "to": ids[edge["target"]], "type": edge["relation"]})
+    return GraphSnapshot(nodes, edges)
+
+
+def export_sqlite(snapshot: GraphSnapshot, path: str):
+    backend = SQLiteBackend(path, seed_path=None)
+    try:
+        backend.import_snapshot(snapshot)
+    finally:
+        backend.close()
+    print(f"Loaded {len(snapshot.nodes)} nodes into {path}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk-load knowledge-graph nodes and edges into Neo4j")
+    parser.add_argument("--nodes", nargs="*", default=[], help="CSV/JSONL node files")
+    parser.add_argument("--edges", nargs="*", default=[], help="CSV/JSONL edge files")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT)
+    parser.add_argument("--snapshot", default=GRAPH_SNAPSHOT_PATH)
+    parser.add_argument("--dry-run", action="store_true", help="validate and count batches, write nothing")
+    parser.add_argument("--offline", action="store_true", help="skip Neo4j; only build the snapshot from the files")
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint and load every row")
+    parser.add_argument("--no-snapshot", action="store_true")
+    parser.add_argument("--sqlite", help="also load the graph into this SQLite file")
+    args = parser.parse_args(argv)
+
+    errors, labels, unknown = validate(args.nodes, args.edges)
+    for error in errors[:MAX_REPORTED_ERRORS]:
+        print(error, file=sys.stderr)
+    if errors:
+        print(f"{len(errors)} invalid rows; nothing written", file=sys.stderr)
+        return 1
+    if unknown:
+        print(f"{len(unknown)} edge endpoints aren't in the node files and must already exist "
+              f"(e.g. {', '.join(sorted(unknown)[:5])})", file=sys.stderr)
+
+    if args.offline:
+        snapshot = snapshot_from_files(args.nodes, args.edges)
+        if not args.dry_run and not args.no_snapshot:
+            snapshot.save(args.snapshot)
+        print(f"Snapshot {snapshot.version}: {len(snapshot.nodes)} nodes, {len(snapshot.edges)} edges"
+              + ("" if args.dry_run or args.no_snapshot else f" -> {args.snapshot}"))
+        if args.sqlite and not args.dry_run:
+            export_sqlite(snapshot, args.sqlite)
+        return 0
+
+    ingestor = Ingestor(labels, args.batch_size, Checkpoint(args.checkpoint, args.restart), args.dry_run)
+    if args.dry_run:
+        # No session needed: _flush only counts when dry_run is set
+        for path in args.nodes:
+            ingestor.load(None, path, "nodes")
+        for path in args.edges:
+            ingestor.load(None, path, "edges")
+    else:
+        with graph_session() as session:
+            ingestor.ensure_indexes(session)
+            # All nodes before any edge, so edge MATCHes find their endpoints
+            for path in args.nodes:
+                ingestor.load(session, path, "nodes")
+            for path in args.edges:
+                ingestor.load(session, path, "edges")
+    print(f"{'Would write' if args.dry_run else 'Wrote'} {ingestor.written['nodes']} nodes and "
+          f"{ingestor.written['edges']} edges in {ingestor.written['transactions']} transactions")
+
+    if not args.dry_run and (args.sqlite or not args.no_snapshot):
+        snapshot = GraphSnapshot.from_neo4j()
+        if not args.no_snapshot:
+            snapshot.save(args.snapshot)
+            print(f"Snapshot {snapshot.version}: {len(snapshot.nodes)} nodes, {len(snapshot.edges)} edges -> {args.snapshot}")
+        if args.sqlite:
+            export_sqlite(snapshot, args.sqlite)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -192,19 +192,33 @@ async function sendMessage(message) {
     showTypingIndicator();
     
     try {
+        // Each chat keeps its own server-side conversation, keyed by a signed
+        // token; "new" asks the server to start one
         const response = await fetch(`${BACKEND_URL}/chat`, {
             method: "POST",
-            headers: { "Content-Type": "application/json" },
+            headers: {
+                "Content-Type": "application/json",
+                "X-Session-Token": getSessionToken() || "new",
+            },
             body: JSON.stringify({ message }),
         });
 
+        if (response.status === 429 || response.status === 503) {
+            // Rate limited or busy: say when to try again instead of reporting a failure
+            const wait = response.headers.get('Retry-After') || 'a few';
+            removeTypingIndicator();
+            addMessage(`⏳ The chatbot is busy. Please try again in ${wait} seconds.`, 'bot');
+            return;
+        }
+
         if (!response.ok) {
             throw new Error(`Server error ${response.status}`);
         }
 
         const data = await response.json();
+        if (data.session) setSessionToken(data.session);
         removeTypingIndicator();
-        addMessage(data.reply, 'bot');
+        addMessage(data.reply, 'bot', data.intent);
         
         // Handle audio response if toggle is enabled
         
@@ -217,9 +231,11 @@ async function sendMessage(message) {
     }
 }
 
-function addMessage(content, sender) {
+function addMessage(content, sender, intent) {
     const messageDiv = document.createElement('div');
     messageDiv.classList.add('message', `${sender}-message`);
+    // Feedback on this reply carries its intent, for the per-intent summary
+    if (intent) messageDiv.dataset.intent = intent;
     
     const messageContent = document.createElement('div');
     messageContent.classList.add('message-content');
@@ -295,6 +311,7 @@ async function handleFeedback(messageDiv, isPositive) {
     thumbsDown.classList.remove('active', 'thumbs-down-animation');
     
     const reportedMessage = messageDiv.querySelector('.message-content').textContent;
+    const intent = messageDiv.dataset.intent;
     
     if (isPositive) {
         // Thumbs up was clicked
@@ -304,7 +321,8 @@ async function handleFeedback(messageDiv, isPositive) {
         // Send positive feedback to server
         await sendFeedback({
             type: 'positive',
-            message: reportedMessage
+            message: reportedMessage,
+            intent
         });
     } else {
         // Thumbs down was clicked
@@ -312,13 +330,14 @@ async function handleFeedback(messageDiv, isPositive) {
         thumbsDown.style.color = 'var(--danger-color)';
         
         // Show feedback popup
-        showFeedbackPopup(reportedMessage);
+        showFeedbackPopup(reportedMessage, intent);
     }
 }
 
-function showFeedbackPopup(message) {
+function showFeedbackPopup(message, intent) {
     // Store the message being reported
     feedbackPopup.dataset.reportedMessage = message;
+    feedbackPopup.dataset.reportedIntent = intent || '';
     
     // Show popup and overlay
     feedbackPopup.classList.remove('hidden');
@@ -346,7 +365,8 @@ async function handleFeedbackSubmit(e) {
         type: 'negative',
         reason: feedbackOption ? feedbackOption.value : 'not specified',
         comments: feedbackText,
-        message: reportedMessage
+        message: reportedMessage,
+        intent: feedbackPopup.dataset.reportedIntent || null
     };
     
     // Send feedback to server
@@ -438,6 +458,22 @@ function saveChatToHistory(userMessage, botResponse) {
     updateChatHistoryUI();
 }
 
+// Session token of the current (most recent) chat
+function getSessionToken() {
+    const chatHistory = getChatHistory();
+    return chatHistory.length ? chatHistory[0].session : null;
+}
+
+function setSessionToken(token) {
+    const chatHistory = getChatHistory();
+    if (chatHistory.length === 0) {
+        createNewChat();
+        return setSessionToken(token);
+    }
+    chatHistory[0].session = token;
+    localStorage.setItem('chatHistory', JSON.stringify(chatHistory));
+}
+
 function loadChatHistory() {
     const chatHistory = getChatHistory();
     
@@ -0,0 +1,56 @@
+"""Shared test setup: a small in-memory graph and no background work
+
+Settings are read when fishing_chatbot is imported, so the environment is
+set up here first. The graph is tests/data/graph_snapshot.json, copied to a
+scratch directory because the snapshot refresh writes it back.
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCRATCH = tempfile.mkdtemp(prefix="fishing-chatbot-tests-")
+shutil.copy(os.path.join(HERE, "data", "graph_snapshot.json"), SCRATCH)
+
+os.environ.update(
+    GRAPH_BACKEND="memory",
+    GRAPH_SNAPSHOT_PATH=os.path.join(SCRATCH, "graph_snapshot.json"),
+    GRAPH_LAYOUT_PATH=os.path.join(SCRATCH, "graph_layout.json"),
+    TURN_LOG_ENABLED="0",
+    WARMUP_ENABLED="0",
+    FEEDBACK_BACKFILL_ON_START="0",
+    PREFETCH_ENABLED="0",
+    SESSION_SECRET="test-secret",
+    MONGO_SERVER_SELECTION_TIMEOUT_MS="200",
+)
+for name in ("REDIS_URL", "SESSION_SHARDS", "REPLY_SEED"):
+    os.environ.pop(name, None)
+sys.path.insert(0, os.path.dirname(HERE))
+
+import fishing_chatbot  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def graph():
+    """The fixture graph, with every precomputed index built"""
+    fishing_chatbot.SnapshotStore.load_file()
+    return fishing_chatbot.SnapshotStore.snapshot
+
+
+@pytest.fixture(autouse=True)
+def fresh_state():
+    """Each test starts without sessions or cached graph lookups"""
+    yield
+    fishing_chatbot.sessions.clear()
+    fishing_chatbot.graph_cache._local.clear()
+    fishing_chatbot.KnowledgeGraph._stale_cache.clear()
+
+
+@pytest.fixture
+def client():
+    from fastapi.testclient import TestClient
+    with TestClient(fishing_chatbot.create_app()) as client:
+        yield client
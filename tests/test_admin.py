@@ -0,0 +1,36 @@
+import pytest
+
+import fishing_chatbot
+from fishing_chatbot import SessionTokens
+
+ADMIN_ROUTES = ["/metrics", "/admin/slow-turns", "/admin/queries"]
+
+
+@pytest.fixture
+def admin_token(monkeypatch):
+    monkeypatch.setattr(fishing_chatbot, "ADMIN_TOKEN", "let-me-in")
+    return {fishing_chatbot.ADMIN_HEADER: "let-me-in"}
+
+
+@pytest.mark.parametrize("path", ADMIN_ROUTES)
+def test_admin_routes_are_hidden_without_a_token_setting(client, path):
+    assert client.get(path).status_code == 404
+
+
+@pytest.mark.parametrize("path", ADMIN_ROUTES)
+def test_admin_routes_need_the_token(client, admin_token, path):
+    assert client.get(path).status_code == 401
+    assert client.get(path, headers={fishing_chatbot.ADMIN_HEADER: "guess"}).status_code == 401
+    assert client.get(path, headers=admin_token).status_code == 200
+
+
+def test_slow_turn_reports_leave_out_the_user(client, admin_token, monkeypatch):
+    monkeypatch.setattr(fishing_chatbot.slow_turns, "threshold_ms", 0)
+    token = client.post("/chat", json={"message": "when is the best time to catch hilsa"}).json()["session"]
+    report = client.get("/admin/slow-turns?limit=1", headers=admin_token).json()["turns"][0]
+    session_id = SessionTokens.verify(token)
+    assert report["reason"] == "slow"
+    assert report["session"] == fishing_chatbot.SlowTurns.pseudonym(session_id) != session_id
+    assert "best time" not in str(report)
+    assert report["message_chars"] == len("when is the best time to catch hilsa")
+
@@ -0,0 +1,77 @@
+import gzip
+import json
+import os
+import time
+
+import pytest
+
+import fishing_chatbot
+from fishing_chatbot import CacheWarmer, KnowledgeGraph
+
+
+def turn(**fields):
+    return json.dumps(fields, ensure_ascii=False) + "\n"
+
+
+@pytest.fixture
+def turn_logs(tmp_path, monkeypatch):
+    """A live turn log, a rotated gzipped one and a seed file"""
+    path = tmp_path / "requests.jsonl"
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(turn(entities={"fish": ["Hilsa"]}, topic="Hilsa", intent="season_timing"))
+        f.write(turn(entities={"fish": ["Catfish"]}, intent="economic"))
+        f.write(turn(input_lang="bn", message="ইলিশ কখন ধরব", reply_lang="bn",
+                     reply_en="Hilsa runs in Monsoon.\n\nWant to know more?"))
+        f.write('{"partially written')
+    with gzip.open(tmp_path / "requests-20260101T000000.jsonl.gz", "wt", encoding="utf-8") as f:
+        f.write(turn(entities={"fish": ["Hilsa"]}, input_lang="bn", message="ইলিশ কখন ধরব",
+                     reply_lang="bn", reply_en="Want to know more?"))
+    os.utime(tmp_path / "requests-20260101T000000.jsonl.gz", (0, 0))  # Rotated long ago
+    seed = tmp_path / "seed.json"
+    seed.write_text(json.dumps({"entities": ["Salmon"]}))
+    monkeypatch.setattr(fishing_chatbot, "TURN_LOG_PATH", str(path))
+    monkeypatch.setattr(fishing_chatbot, "WARMUP_SEED_PATH", str(seed))
+    return tmp_path
+
+
+def test_collect_ranks_logged_traffic_after_the_seed(turn_logs):
+    targets = CacheWarmer.collect()
+    assert targets["entities"] == ["Salmon", "Hilsa", "Catfish", "Income"]
+    assert targets["bn_phrases"] == ["ইলিশ কখন ধরব"]
+    assert targets["reply_fragments"] == ["Want to know more?", "Hilsa runs in Monsoon."]
+
+
+def test_only_the_newest_logs_and_records_are_read(turn_logs, monkeypatch):
+    assert len(list(CacheWarmer.read_records(CacheWarmer.recent_log_files()))) == 4
+    assert len(list(CacheWarmer.read_records(CacheWarmer.recent_log_files(), limit=2))) == 2
+    monkeypatch.setattr(fishing_chatbot, "WARMUP_LOG_FILES", 1)
+    assert CacheWarmer.recent_log_files() == [str(turn_logs / "requests.jsonl")]
+
+
+def test_run_warms_each_category(turn_logs, monkeypatch):
+    warmed = []
+    monkeypatch.setattr(KnowledgeGraph, "get_comprehensive_info", staticmethod(warmed.append))
+    monkeypatch.setattr(CacheWarmer, "_translate", staticmethod(lambda text, src, dest, cache: warmed.append(text)))
+    assert CacheWarmer.run(5) == {"entities": 4, "bn_phrases": 1, "reply_fragments": 2}
+    assert warmed[:4] == ["Salmon", "Hilsa", "Catfish", "Income"]
+
+
+def test_run_stops_at_its_budget(turn_logs, monkeypatch):
+    def slow(entity):
+        time.sleep(0.05)
+
+    monkeypatch.setattr(KnowledgeGraph, "get_comprehensive_info", staticmethod(slow))
+    monkeypatch.setattr(CacheWarmer, "_translate", staticmethod(lambda *args: pytest.fail("past the budget")))
+    started = time.monotonic()
+    warmed = CacheWarmer.run(0.08)
+    assert time.monotonic() - started < 0.08 + 0.05 + 0.1  # At most one item runs past the budget
+    assert 1 <= warmed["entities"] <= 2 and warmed["bn_phrases"] == warmed["reply_fragments"] == 0
+
+
+def test_unavailable_dependency_ends_its_category(turn_logs, monkeypatch):
+    def down(*args):
+        raise fishing_chatbot.DependencyUnavailable("translator open")
+
+    monkeypatch.setattr(KnowledgeGraph, "get_comprehensive_info", staticmethod(lambda entity: None))
+    monkeypatch.setattr(CacheWarmer, "_translate", staticmethod(down))
+    assert CacheWarmer.run(5) == {"entities": 4, "bn_phrases": 0, "reply_fragments": 0}
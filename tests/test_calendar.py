@@ -0,0 +1,50 @@
+from datetime import datetime
+
+import pytest
+
+import fishing_chatbot
+from fishing_chatbot import CalendarIndex, ConversationMemory, KnowledgeGraph
+
+
+@pytest.mark.parametrize("day, month", [
+    ((2025, 4, 13), "Choitro"),
+    ((2025, 4, 14), "Boisakh"),
+    ((2025, 7, 20), "Srabon"),
+    ((2025, 12, 31), "Poush"),
+    ((2026, 1, 1), "Poush"),
+    ((2026, 1, 15), "Magh"),
+    ((2024, 2, 29), "Falgun"),
+])
+def test_dates_map_to_bangla_months(day, month):
+    assert CalendarIndex.MONTHS[CalendarIndex.month_of(datetime(*day))][0] == month
+
+
+def test_every_day_of_the_year_has_a_month():
+    assert len(CalendarIndex.DAY_TABLE) == 366
+    assert set(CalendarIndex.DAY_TABLE.values()) == set(range(12))
+
+
+def test_months_collect_what_their_season_links_to():
+    assert KnowledgeGraph.get_calendar(3) == {
+        "month": "Srabon", "season": "Monsoon", "catch": ["Hilsa"], "conditions": ["Heavy Rain"]}
+    assert KnowledgeGraph.get_calendar(8)["catch"] == ["Catfish", "Salmon"]
+
+
+def ask(message):
+    return fishing_chatbot.process_conversation(message, "calendar-test", memory=ConversationMemory())
+
+
+def test_named_month_is_answered_from_the_calendar():
+    reply = ask("what can I catch in srabon")
+    assert "Fishing Calendar: Srabon (Monsoon)" in reply
+    assert "Hilsa" in reply and "Heavy Rain" in reply
+
+
+def test_now_and_next_month_follow_todays_date(monkeypatch):
+    monkeypatch.setattr(CalendarIndex, "today", staticmethod(lambda: datetime(2025, 12, 20)))
+    assert "Fishing Calendar: Poush" in ask("what can I catch right now")
+    assert "Fishing Calendar: Magh" in ask("what can I catch next month")
+
+
+def test_months_without_data_say_so():
+    assert "I don't have calendar data for Kartik" in ask("what can I catch in kartik")
@@ -0,0 +1,18 @@
+from fishing_chatbot import KnowledgeGraph
+
+
+def test_causes_are_walked_over_several_hops():
+    chains = KnowledgeGraph.get_causal_chains("Hilsa", "causes")
+    assert chains[:2] == [["Hilsa", "Fish Scarcity"], ["Hilsa", "Murky Water"]]
+    assert ["Hilsa", "Murky Water", "Heavy Rain"] in chains
+    assert KnowledgeGraph.get_causal_chains("Hilsa", "effects") == []
+
+
+def test_caused_by_edges_are_read_backwards():
+    assert KnowledgeGraph.get_causal_chains("Pollution", "effects") == [
+        ["Pollution", "Fish Scarcity"], ["Pollution", "Fish Scarcity", "Hilsa"]]
+    assert KnowledgeGraph.get_causal_chains("Pollution", "causes") == []
+
+
+def test_unknown_entity_has_no_chains():
+    assert KnowledgeGraph.get_causal_chains("Kraken", "causes") == []
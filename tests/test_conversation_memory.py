@@ -0,0 +1,58 @@
+import sys
+
+from fishing_chatbot import ConversationMemory
+
+
+def converse(memory, turns):
+    for n in range(turns):
+        memory.update_stage()
+        memory.discuss("Hilsa" if n % 2 else "Catfish")
+        memory.add_turn(f"question {n}", "season_timing")
+        memory.last_intent = "season_timing"
+
+
+def test_history_keeps_the_last_turns_oldest_first():
+    memory = ConversationMemory()
+    assert memory.messages == []
+    converse(memory, 8)
+    messages = memory.messages
+    assert len(messages) == 2 * ConversationMemory.HISTORY_TURNS
+    assert [m["content"] for m in messages if m["role"] == "user"] == [f"question {n}" for n in range(3, 8)]
+    assert messages[-1] == {"role": "assistant", "topic": "Hilsa", "intent": "season_timing",
+                            "timestamp": messages[-1]["timestamp"]}
+
+
+def test_stage_follows_turn_count():
+    memory = ConversationMemory()
+    stages = []
+    for _ in range(8):
+        memory.add_turn("q", None)
+        memory.update_stage()
+        stages.append(memory.stage)
+    assert stages == ["greeting", "exploring", "exploring", "deep_dive", "deep_dive", "deep_dive",
+                      "expert", "expert"]
+
+
+def test_topics_are_recorded_once_and_interned():
+    memory = ConversationMemory()
+    memory.discuss("".join(["Hil", "sa"]))
+    memory.discuss("Catfish")
+    memory.discuss("".join(["Hil", "sa"]))
+    memory.add_topic("Monsoon")
+    memory.add_topic("Monsoon")
+    assert memory.entities_discussed == {"Hilsa", "Catfish"}
+    assert memory.topics_discussed == {"Monsoon"}
+    assert memory.discussed() == {"Hilsa", "Catfish", "Monsoon"}
+    assert memory.current_topic is sys.intern("Hilsa")
+
+
+def test_unknown_intents_are_kept_as_none():
+    memory = ConversationMemory()
+    memory.last_intent = "not-an-intent"
+    memory.add_turn("q", "not-an-intent")
+    assert memory.last_intent is None
+    assert memory.messages[0]["intent"] is None
+
+
+def test_no_per_instance_dict():
+    assert not hasattr(ConversationMemory(), "__dict__")
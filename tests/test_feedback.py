@@ -0,0 +1,129 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+import fishing_chatbot
+from fishing_chatbot import FeedbackRollups
+
+
+def test_increments_count_type_reason_and_intent():
+    feedback = {"type": "dislike", "reason": "wrong", "intent": "season_timing", "timestamp": datetime.now()}
+    assert FeedbackRollups.increments(feedback) == {
+        "total": 1, "type.dislike": 1, "reason.wrong": 1, "intent.season_timing.dislike": 1}
+
+
+def test_increments_keep_client_values_out_of_field_paths():
+    feedback = {"type": "like", "reason": "$set.x" + "y" * 100, "intent": "not-an-intent"}
+    inc = FeedbackRollups.increments(feedback)
+    reason = next(path for path in inc if path.startswith("reason."))
+    assert reason.count(".") == 1 and "$" not in reason
+    assert len(reason) == len("reason.") + FeedbackRollups.MAX_KEY_LENGTH
+    assert not any(path.startswith("intent.") for path in inc)
+
+
+def test_rebuild_is_operator_only(client, monkeypatch):
+    path = "/admin/feedbacks/rebuild-summary"
+    assert client.post(path).status_code == 404
+    monkeypatch.setattr(fishing_chatbot, "ADMIN_TOKEN", "let-me-in")
+    assert client.post(path).status_code == 401
+
+
+class Collection:
+    """Enough of a Mongo collection for the rollup queries"""
+
+    def __init__(self, *docs):
+        self.docs = [dict(doc) for doc in docs]
+
+    @staticmethod
+    def matches(doc, query):
+        for field, want in query.items():
+            if field == "$or":
+                if not any(Collection.matches(doc, q) for q in want):
+                    return False
+            elif isinstance(want, dict):
+                for op, arg in want.items():
+                    if not {"$ne": lambda: doc.get(field) != arg,
+                            "$in": lambda: doc.get(field) in arg,
+                            "$lt": lambda: field in doc and doc[field] < arg,
+                            "$exists": lambda: (field in doc) == arg}[op]():
+                        return False
+            elif doc.get(field) != want:
+                return False
+        return True
+
+    def find(self, query, projection=None):
+        return [dict(doc) for doc in self.docs if self.matches(doc, query)]
+
+    def find_one(self, query, projection=None):
+        return next(iter(self.find(query)), None)
+
+    def update_one(self, query, update, upsert=False):
+        doc = next((doc for doc in self.docs if self.matches(doc, query)), None)
+        if doc is None:
+            if not upsert:
+                return SimpleNamespace(modified_count=0)
+            doc = {"_id": query["_id"], **update.get("$setOnInsert", {})}
+            self.docs.append(doc)
+        for path, value in update.get("$set", {}).items():
+            doc[path] = value
+        for path, value in update.get("$min", {}).items():
+            doc[path] = min(doc.get(path, value), value)
+        for path, n in update.get("$inc", {}).items():
+            *parents, leaf = path.split(".")
+            target = doc
+            for part in parents:
+                target = target.setdefault(part, {})
+            target[leaf] = target.get(leaf, 0) + n
+        return SimpleNamespace(modified_count=1)
+
+
+@pytest.fixture
+def mongo(monkeypatch):
+    live_since = datetime(2026, 3, 10, 12)
+    rollups = Collection(
+        {"_id": "all", "total": 1, "type": {"like": 1}, "live_since": live_since},
+        {"_id": "day:2026-03-10", "day": "2026-03-10", "total": 1, "type": {"like": 1}},
+    )
+    feedbacks = Collection(
+        {"type": "dislike", "reason": "wrong", "timestamp": datetime(2026, 3, 9, 8)},
+        {"type": "like", "timestamp": datetime(2026, 3, 10, 9)},
+        {"type": "like", "timestamp": live_since},  # Already counted by record()
+    )
+    monkeypatch.setattr(fishing_chatbot, "get_feedback_rollups", lambda: rollups)
+    monkeypatch.setattr(fishing_chatbot, "get_feedback_collection", lambda: feedbacks)
+    return rollups
+
+
+def test_summary_never_scans(mongo, monkeypatch):
+    def backfill():
+        raise AssertionError("summary() ran the backfill")
+
+    monkeypatch.setattr(FeedbackRollups, "backfill", staticmethod(backfill))
+    summary = FeedbackRollups.summary(7)
+    assert summary["total"] == 1 and summary["backfilled"] is False
+    assert len(summary["days"]) == 7
+
+
+def test_summary_of_an_empty_store(monkeypatch):
+    monkeypatch.setattr(fishing_chatbot, "get_feedback_rollups", lambda: Collection())
+    summary = FeedbackRollups.summary(1)
+    assert summary["total"] == 0 and summary["backfilled"] is False
+
+
+def test_backfill_adds_older_feedback_to_the_live_counts(mongo):
+    assert FeedbackRollups.backfill() is True
+    overall = mongo.find_one({"_id": "all"})
+    assert overall["total"] == 3 and overall["backfilled"] is True
+    assert overall["type"] == {"like": 2, "dislike": 1} and overall["reason"] == {"wrong": 1}
+    assert mongo.find_one({"_id": "day:2026-03-10"})["total"] == 2
+    assert mongo.find_one({"_id": "day:2026-03-09"})["type"] == {"dislike": 1}
+
+    assert FeedbackRollups.backfill() is False  # Once only
+    assert mongo.find_one({"_id": "all"})["total"] == 3
+
+
+def test_backfill_leaves_a_live_claim_alone(mongo):
+    mongo.update_one({"_id": "all"}, {"$set": {"backfill_started": datetime.now()}})
+    assert FeedbackRollups.backfill() is False
+    assert mongo.find_one({"_id": "all"})["total"] == 1
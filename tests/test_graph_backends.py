@@ -0,0 +1,43 @@
+import pytest
+
+from fishing_chatbot import GraphSnapshot, SQLiteBackend
+
+
+@pytest.fixture
+def snapshot():
+    nodes = [
+        {"id": 10, "name": "Hilsa", "labels": ["Fish"], "aliases": ["ilish"]},
+        {"id": 11, "name": "Monsoon", "labels": ["Season"]},
+        {"id": 12, "name": "Unlabelled", "labels": []},
+    ]
+    edges = [
+        {"from": 10, "to": 11, "type": "SEASONALLY_AVAILABLE_IN"},
+        {"from": 12, "to": 10, "type": "AFFECTED_BY"},
+    ]
+    return GraphSnapshot(nodes, edges)
+
+
+@pytest.fixture
+def sqlite(tmp_path, snapshot):
+    backend = SQLiteBackend(str(tmp_path / "graph.db"), seed_path=None)
+    backend.import_snapshot(snapshot)
+    yield backend
+    backend.close()
+
+
+def test_sqlite_export_matches_the_snapshot(sqlite, snapshot):
+    assert sqlite.export() == snapshot.export()
+    assert {"id": 12, "label": "Node"} in sqlite.export()["nodes"]
+
+
+@pytest.mark.parametrize("stored", ["[ ]", "null"])
+def test_sqlite_export_decodes_labels(sqlite, stored):
+    conn = sqlite._connection()
+    conn.execute("UPDATE nodes SET labels = ? WHERE id = 12", (stored,))
+    conn.commit()
+    assert {"id": 12, "label": "Node"} in sqlite.export()["nodes"]
+
+
+def test_sqlite_round_trips_the_snapshot(sqlite, snapshot):
+    assert sqlite.snapshot().nodes == snapshot.nodes
+    assert sqlite.snapshot().edges == snapshot.edges
@@ -0,0 +1,36 @@
+import os
+
+from fishing_chatbot import GraphLayout, GraphSnapshot, SnapshotStore
+
+
+def test_graph_export_carries_positions(client, graph):
+    full = client.get("/graph").json()
+    assert full["layout_version"] == graph.version
+    assert all(isinstance(node["x"], float) and isinstance(node["y"], float) for node in full["nodes"])
+    
+    compact = client.get("/graph?format=compact").json()
+    assert len(compact["xy"]) == 2 * len(compact["ids"])
+    assert compact["xy"][:2] == [full["nodes"][0]["x"], full["nodes"][0]["y"]]
+
+
+def test_same_graph_same_layout(graph, tmp_path):
+    first = GraphLayout.build(graph, path=str(tmp_path / "a.json"))
+    assert first is SnapshotStore.index("layout")
+    SnapshotStore.indexes.pop("layout")
+    try:
+        again = GraphLayout.build(graph, path=str(tmp_path / "b.json"))
+    finally:
+        SnapshotStore.indexes["layout"] = first
+    assert (again.positions == first.positions).all()
+    assert abs(again.positions).max() <= GraphLayout.SCALE + 1e-6
+
+
+def test_new_nodes_leave_known_ones_in_place(graph, tmp_path):
+    path = str(tmp_path / "layout.json")
+    nodes = graph.nodes + [{"id": 100, "name": "Padma", "labels": ["Location"]}]
+    edges = graph.edges + [{"from": 0, "to": 100, "type": "FOUND_IN"}]
+    layout = GraphLayout.build(GraphSnapshot(nodes, edges), path=path)
+    previous = SnapshotStore.index("layout")
+    assert (layout.positions[:len(graph.nodes)] == previous.positions).all()
+    assert os.path.exists(path)
+    assert GraphLayout.load(path).version == layout.version
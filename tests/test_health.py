@@ -0,0 +1,74 @@
+import time
+
+import pytest
+
+import fishing_chatbot
+
+
+@pytest.fixture
+def checks(monkeypatch):
+    """Backends that answer unless told otherwise, with no health checked yet"""
+    calls = {"graph": 0, "mongo": 0}
+    behaviour = {"graph": None, "mongo": None}
+
+    def check(name):
+        def run():
+            calls[name] += 1
+            if behaviour[name] is not None:
+                behaviour[name]()
+        return run
+
+    for name in calls:
+        monkeypatch.setitem(fishing_chatbot.backend_health, name, {"ok": False, "checked_at": 0.0, "error": "not started"})
+    monkeypatch.setattr(fishing_chatbot, "check_graph", check("graph"))
+    monkeypatch.setattr(fishing_chatbot, "check_mongo", check("mongo"))
+    return calls, behaviour
+
+
+def test_liveness_never_checks_the_backends(client, checks):
+    calls, _ = checks
+    assert client.get("/healthz").json() == {"status": "ok"}
+    assert calls == {"graph": 0, "mongo": 0}
+
+
+def test_ready_when_both_backends_answer(client, checks):
+    response = client.get("/readyz")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "ready"
+    assert all(status["ok"] for status in body["backends"].values())
+    assert "graph_export" in body["breakers"]
+
+
+def test_unavailable_when_a_backend_fails(client, checks):
+    _, behaviour = checks
+
+    def down():
+        raise ConnectionError("mongo is down")
+
+    behaviour["mongo"] = down
+    response = client.get("/readyz")
+    assert response.status_code == 503
+    assert response.json()["backends"]["mongo"] == {
+        "ok": False, "checked_at": pytest.approx(time.time(), abs=5), "error": "mongo is down"}
+
+
+def test_a_hung_check_is_abandoned(client, checks, monkeypatch):
+    _, behaviour = checks
+    monkeypatch.setattr(fishing_chatbot, "HEALTH_CHECK_TIMEOUT", 0.05)
+    behaviour["graph"] = lambda: time.sleep(0.5)
+    started = time.monotonic()
+    response = client.get("/readyz")
+    assert time.monotonic() - started < 0.4
+    assert response.status_code == 503
+    assert "no reply within" in response.json()["backends"]["graph"]["error"]
+
+
+def test_results_are_reused_within_the_ttl(client, checks, monkeypatch):
+    calls, _ = checks
+    client.get("/readyz")
+    client.get("/readyz")
+    assert calls == {"graph": 1, "mongo": 1}
+    monkeypatch.setattr(fishing_chatbot, "HEALTH_CHECK_TTL", 0)
+    client.get("/readyz")
+    assert calls == {"graph": 2, "mongo": 2}
@@ -0,0 +1,56 @@
+import os
+
+import fishing_chatbot
+
+
+def test_dynamic_json_is_compressed(client):
+    response = client.get("/graph", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json()["nodes"]
+
+
+def test_refused_codings_are_not_used(client):
+    response = client.get("/graph", headers={"Accept-Encoding": "br;q=0, gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    response = client.get("/graph", headers={"Accept-Encoding": "gzip;q=0"})
+    assert "content-encoding" not in response.headers
+
+
+def test_small_responses_are_not_compressed(client):
+    response = client.get("/healthz", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+
+
+def test_range_requests_are_not_compressed(client):
+    with open(os.path.join(fishing_chatbot.static_root(), "js", "script.js"), "rb") as f:
+        source = f.read()
+    response = client.get("/js/script.js", headers={"Accept-Encoding": "gzip", "Range": "bytes=100-1099"})
+    assert response.status_code == 206
+    assert "content-encoding" not in response.headers
+    assert response.headers["content-range"] == f"bytes 100-1099/{len(source)}"
+    assert response.content == source[100:1100]
+
+
+def test_failing_export_leaves_chat_lookups_alone(client, monkeypatch):
+    def export():
+        raise RuntimeError("export too slow")
+    monkeypatch.setattr(fishing_chatbot.get_graph_backend(), "export", export)
+    try:
+        for _ in range(fishing_chatbot.BREAKER_FAILURE_THRESHOLD + 1):
+            assert client.get("/graph").status_code == 503
+        assert fishing_chatbot.graph_export_breaker.state == "open"
+        assert fishing_chatbot.graph_breaker.state == "closed"
+    finally:
+        fishing_chatbot.graph_export_breaker.record_success()
+
+
+def test_module_app_is_built_once_on_first_use(monkeypatch):
+    built = []
+    monkeypatch.delattr(fishing_chatbot, "app", raising=False)
+    monkeypatch.setattr(fishing_chatbot, "create_app", lambda: built.append(object()) or built[-1])
+    try:
+        assert fishing_chatbot.app is fishing_chatbot.app is built[0]
+        assert len(built) == 1
+    finally:
+        vars(fishing_chatbot).pop("app", None)
@@ -0,0 +1,108 @@
+import json
+
+import pytest
+
+import ingest_graph
+
+
+def write(path, text):
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture
+def files(tmp_path):
+    nodes = write(tmp_path / "fish.csv", "name,label,aliases,habitat\n"
+                                         "Hilsa,Fish,ilish|elish,river\n"
+                                         "Catfish,Fish,,pond\n")
+    more = write(tmp_path / "places.jsonl", '{"name": "Kurigram", "label": "Location"}\n'
+                                            '\n'
+                                            '{"name": "Monsoon", "label": "Season", "properties": {"months": 4}}\n')
+    edges = write(tmp_path / "edges.csv", "source,relation,target,target_label\n"
+                                          "Hilsa,FOUND_IN,Kurigram,\n"
+                                          "Hilsa,SEASONALLY_AVAILABLE_IN,Monsoon,\n"
+                                          "Catfish,FOUND_IN,Padma,Location\n")
+    return tmp_path, [nodes, more], [edges]
+
+
+def test_endpoints_outside_the_node_files_need_a_label(files):
+    tmp_path, nodes, edges = files
+    unlabeled = write(tmp_path / "unlabeled.csv", "source,relation,target\nCatfish,FOUND_IN,Padma\n")
+    errors, _, unknown = ingest_graph.validate(nodes, edges)
+    assert errors == [] and unknown == {"Padma"}
+    errors, _, _ = ingest_graph.validate(nodes, [unlabeled])
+    assert errors == [f"{unlabeled}:2: target 'Padma' isn't in the node files; set target_label"]
+
+
+def test_edges_are_always_matched_by_label():
+    cypher = ingest_graph.edge_cypher("FOUND_IN", "Fish", "Location")
+    assert "MATCH (a:`Fish` {name: row.source})" in cypher and "MATCH (b:`Location` {name: row.target})" in cypher
+    with pytest.raises(ValueError):
+        ingest_graph.edge_cypher("FOUND_IN", "Fish", "")
+
+
+def test_validate_reports_every_bad_row(files):
+    tmp_path, nodes, edges = files
+    bad_nodes = write(tmp_path / "bad.jsonl", '{"name": "Shark", "label": "Big Fish"}\n'
+                                              '{"label": "Fish"}\n')
+    bad_edges = write(tmp_path / "bad_edges.csv", "source,relation,target\n"
+                                                  "Hilsa,EATS,Catfish\n"
+                                                  "Hilsa,FOUND_IN,\n")
+    errors, labels, _ = ingest_graph.validate(nodes + [bad_nodes], edges + [bad_edges])
+    assert errors == [
+        f"{bad_nodes}:1: label 'Big Fish' is not a valid identifier",
+        f"{bad_nodes}:2: missing name",
+        f"{bad_edges}:2: unknown relation 'EATS'",
+        f"{bad_edges}:3: missing source or target",
+    ]
+    assert labels == {"Hilsa": "Fish", "Catfish": "Fish", "Kurigram": "Location", "Monsoon": "Season"}
+
+
+def test_checkpoint_resumes_until_the_file_changes(files):
+    tmp_path, nodes, _ = files
+    path = str(tmp_path / "state" / "checkpoint.json")
+    ingest_graph.Checkpoint(path).advance(nodes[0], 1)
+
+    assert ingest_graph.Checkpoint(path).offset(nodes[0]) == 1
+    assert ingest_graph.Checkpoint(path, restart=True).offset(nodes[0]) == 0
+    assert ingest_graph.Checkpoint(path).offset(nodes[1]) == 0
+
+    with open(nodes[0], "a", encoding="utf-8") as f:
+        f.write("Salmon,Fish,,sea\n")
+    assert ingest_graph.Checkpoint(path).offset(nodes[0]) == 0
+
+
+def test_load_skips_checkpointed_rows_and_batches_by_statement(files):
+    tmp_path, nodes, edges = files
+    checkpoint = ingest_graph.Checkpoint(str(tmp_path / "checkpoint.json"))
+    checkpoint.advance(nodes[0], 1)
+    _, labels, _ = ingest_graph.validate(nodes, edges)
+    ingestor = ingest_graph.Ingestor(labels, batch_size=2, checkpoint=checkpoint, dry_run=True)
+    for path in nodes:
+        ingestor.load(None, path, "nodes")
+    ingestor.load(None, edges[0], "edges")
+    # Catfish; Kurigram and Monsoon (two labels, so two statements); three edges in batches of two
+    assert ingestor.written == {"nodes": 3, "edges": 3, "transactions": 1 + 2 + 3}
+
+
+def test_offline_run_writes_the_snapshot(files):
+    tmp_path, nodes, edges = files
+    snapshot = str(tmp_path / "out" / "graph_snapshot.json")
+    assert ingest_graph.main(["--offline", "--nodes", *nodes, "--edges", *edges, "--snapshot", snapshot]) == 0
+    with open(snapshot, encoding="utf-8") as f:
+        data = json.load(f)
+    assert [node["name"] for node in data["nodes"]] == ["Hilsa", "Catfish", "Kurigram", "Monsoon"]
+    assert data["nodes"][0] == {"id": 0, "name": "Hilsa", "labels": ["Fish"], "aliases": ["ilish", "elish"]}
+    # Padma isn't in the node files, so its edge is left to the database
+    assert data["edges"] == [{"from": 0, "to": 2, "type": "FOUND_IN"},
+                             {"from": 0, "to": 3, "type": "SEASONALLY_AVAILABLE_IN"}]
+    assert data["version"]
+
+
+def test_invalid_input_writes_nothing(files, capsys):
+    tmp_path, nodes, _ = files
+    edges = write(tmp_path / "edges.csv", "source,relation,target\nHilsa,EATS,Catfish\n")
+    snapshot = tmp_path / "graph_snapshot.json"
+    assert ingest_graph.main(["--offline", "--nodes", *nodes, "--edges", edges, "--snapshot", str(snapshot)]) == 1
+    assert not snapshot.exists()
+    assert "1 invalid rows; nothing written" in capsys.readouterr().err
@@ -0,0 +1,61 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import fishing_chatbot
+from fishing_chatbot import KnowledgeGraph, process_conversation
+
+
+def test_comprehensive_info_without_entity_is_empty():
+    assert KnowledgeGraph.get_comprehensive_info(None) == {
+        "entity": None, "labels": [], "outgoing": [], "incoming": []}
+    assert KnowledgeGraph.get_comprehensive_info("")["entity"] is None
+
+
+def test_comprehensive_info_reads_the_graph():
+    info = KnowledgeGraph.get_comprehensive_info("hilsa")
+    assert info["entity"] == "Hilsa"
+    assert {"relation": "SEASONALLY_AVAILABLE_IN", "target": "Monsoon", "labels": ["Season"]} in info["outgoing"]
+
+
+def test_weather_question_without_entity():
+    assert "Condition: Weather" in process_conversation("windy", "weather-no-entity")
+
+
+def test_water_question_without_entity():
+    reply = process_conversation("water quality", "water-no-entity")
+    assert "Water Condition: General" in reply
+
+
+def test_stale_records_are_served_while_the_graph_is_down(monkeypatch):
+    fresh = KnowledgeGraph.get_comprehensive_info("hilsa")
+    fishing_chatbot.graph_cache._local.clear()
+
+    def down(call):
+        raise fishing_chatbot.DependencyUnavailable("graph open")
+
+    monkeypatch.setattr(fishing_chatbot.graph_breaker, "call", down)
+    monkeypatch.setattr(fishing_chatbot.SnapshotStore, "snapshot", None)
+    assert KnowledgeGraph.get_comprehensive_info("Hilsa") == fresh
+    with pytest.raises(fishing_chatbot.DependencyUnavailable):
+        KnowledgeGraph.get_comprehensive_info("Catfish")
+
+
+def test_stale_cache_stays_bounded_under_concurrent_refreshes(monkeypatch):
+    monkeypatch.setattr(fishing_chatbot, "STALE_CACHE_SIZE", 3)
+    monkeypatch.setattr(fishing_chatbot.graph_cache, "get", lambda key: None)  # Every call refreshes
+    names = ["Hilsa", "Catfish", "Salmon", "Monsoon", "Winter", "Freshwater", "Saltwater", "Income"]
+
+    def refresh(n):
+        for name in names[n % 4:] + names[:n % 4]:
+            KnowledgeGraph.get_comprehensive_info(name)
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # Switch threads as often as possible
+    try:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(refresh, range(64)))  # Re-raises anything a worker raised
+    finally:
+        sys.setswitchinterval(interval)
+    assert len(KnowledgeGraph._stale_cache) == 3
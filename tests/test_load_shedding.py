@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+import fishing_chatbot
+from fishing_chatbot import AdmissionController, Overloaded, RateLimiter
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(fishing_chatbot.time, "monotonic", clock)
+    return clock
+
+
+def test_bucket_allows_a_burst_then_refills(clock):
+    limiter = RateLimiter("test", per_minute=60, burst=3)
+    assert [limiter.acquire("a") for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.acquire("a") == pytest.approx(1.0)
+    assert limiter.acquire("b") == 0.0  # Buckets are per key
+    clock.now += 1
+    assert limiter.acquire("a") == 0.0
+    assert limiter.snapshot()["limited"] == 1
+
+
+def test_least_recent_keys_are_dropped(clock):
+    limiter = RateLimiter("test", per_minute=60, burst=1, max_keys=2)
+    for key in ("a", "b", "c"):
+        limiter.acquire(key)
+    assert limiter.snapshot()["keys"] == 2
+    assert limiter.acquire("a") == 0.0  # Forgotten, so a full bucket again
+
+
+def test_zero_rate_disables_the_limit():
+    limiter = RateLimiter("test", per_minute=0, burst=0)
+    assert all(limiter.acquire("a") == 0.0 for _ in range(100))
+
+
+def test_returning_sessions_are_served_first():
+    async def scenario():
+        admission = AdmissionController(max_active=1, max_queue=4, queue_timeout=5, new_session_share=0.5)
+        held = await admission.enter(priority=False)
+        order = []
+
+        async def turn(name, priority):
+            started = await admission.enter(priority)
+            order.append(name)
+            admission.leave(started)
+
+        waiting = [asyncio.create_task(turn("new", False)), asyncio.create_task(turn("returning", True))]
+        await asyncio.sleep(0)
+        assert admission.waiting == 2
+        admission.leave(held)
+        await asyncio.gather(*waiting)
+        return order, admission.snapshot()
+
+    order, snapshot = asyncio.run(scenario())
+    assert order == ["returning", "new"]
+    assert snapshot["active"] == 0 and snapshot["queued"] == 2
+
+
+def test_new_sessions_only_get_their_share_of_the_queue():
+    async def scenario():
+        admission = AdmissionController(max_active=1, max_queue=2, queue_timeout=5, new_session_share=0.5)
+        await admission.enter(priority=False)
+        asyncio.create_task(admission.enter(priority=False))
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded, match="queue full") as shed:
+            await admission.enter(priority=False)
+        asyncio.create_task(admission.enter(priority=True))  # Returning sessions may still queue
+        await asyncio.sleep(0)
+        return shed.value.retry_after, admission.waiting
+
+    retry_after, waiting = asyncio.run(scenario())
+    assert retry_after >= 1 and waiting == 2
+
+
+def test_queue_wait_times_out():
+    async def scenario():
+        admission = AdmissionController(max_active=1, max_queue=2, queue_timeout=0.01)
+        await admission.enter(priority=True)
+        with pytest.raises(Overloaded, match="queue timeout"):
+            await admission.enter(priority=True)
+        return admission.waiting, admission.counts["shed_timeout"]
+
+    assert asyncio.run(scenario()) == (0, 1)
+
+
+def test_chat_answers_429_with_retry_after(client, monkeypatch):
+    monkeypatch.setattr(fishing_chatbot, "session_limiter", RateLimiter("session", per_minute=6, burst=1))
+    token = client.post("/chat", json={"message": "hi"}).json()["session"]
+    response = client.post("/chat", json={"message": "hi"}, headers={fishing_chatbot.SESSION_HEADER: token})
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "10"
@@ -0,0 +1,54 @@
+import threading
+
+import pytest
+
+import fishing_chatbot
+from fishing_chatbot import CacheWarmer, KnowledgeGraph, Prefetcher
+
+
+@pytest.fixture
+def stalled_graph(monkeypatch):
+    """Graph lookups that wait until the test releases them"""
+    release = threading.Event()
+    fetched = []
+
+    def lookup(entity):
+        release.wait(5)
+        fetched.append(entity)
+        return {"entity": entity, "labels": [], "outgoing": [], "incoming": []}
+
+    monkeypatch.setattr(KnowledgeGraph, "get_comprehensive_info", staticmethod(lookup))
+    monkeypatch.setattr(CacheWarmer, "_translate", staticmethod(lambda text, src, dest, cache: None))
+    yield release, fetched
+    release.set()
+
+
+def test_pending_prefetches_are_bounded(stalled_graph):
+    release, fetched = stalled_graph
+    prefetcher = Prefetcher(workers=1, max_pending=2)
+    for entity in ("Hilsa", "Catfish", "Salmon", "Winter"):
+        prefetcher.schedule(entity)
+    assert (prefetcher.scheduled, prefetcher.dropped) == (2, 2)
+
+    release.set()
+    prefetcher._pool.shutdown(wait=True)
+    assert sorted(fetched) == ["Catfish", "Hilsa"]
+    assert not prefetcher._in_flight
+
+
+def test_a_topic_in_flight_is_not_fetched_twice(stalled_graph):
+    release, fetched = stalled_graph
+    prefetcher = Prefetcher(workers=2, max_pending=10)
+    prefetcher.schedule("Hilsa")
+    prefetcher.schedule("hilsa")
+    prefetcher.schedule("Hilsa", bengali=True)  # The Bengali variant is its own job
+    assert (prefetcher.scheduled, prefetcher.dropped) == (2, 1)
+    release.set()
+    prefetcher._pool.shutdown(wait=True)
+
+
+def test_nothing_is_scheduled_while_the_graph_breaker_is_open(stalled_graph, monkeypatch):
+    monkeypatch.setattr(fishing_chatbot.graph_breaker, "state", "open")
+    prefetcher = Prefetcher(workers=1, max_pending=10)
+    prefetcher.schedule("Hilsa")
+    assert (prefetcher.scheduled, prefetcher.dropped) == (0, 1)
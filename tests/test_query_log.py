@@ -0,0 +1,32 @@
+import time
+
+from fishing_chatbot import QueryLog
+
+
+def test_runs_fold_into_their_template():
+    log = QueryLog(slow_ms=1e9)
+    for entity in ("Hilsa", "Catfish"):
+        log.record("sqlite", "SELECT *\n  FROM nodes WHERE name = ?", {"entity": entity}, time.perf_counter(), 1)
+    log.record("sqlite", "SELECT 1", {}, time.perf_counter(), 1)
+    templates = {stats["query"]: stats for stats in log.snapshot()["templates"]}
+    assert templates["SELECT * FROM nodes WHERE name = ?"]["count"] == 2
+    assert templates["SELECT 1"]["count"] == 1
+    assert templates["SELECT 1"]["slow"] == 0
+
+
+def test_slow_runs_capture_a_plan_once_per_interval():
+    log = QueryLog(slow_ms=0, plan_interval=3600)
+    explained = []
+    
+    def explain(params):
+        explained.append(params)
+        return {"operators": [{"depth": 0, "operator": "SCAN nodes"}]}
+    
+    for entity in ("Hilsa", "Catfish"):
+        log.record("sqlite", "SELECT * FROM nodes WHERE name = ?", {"entity": entity}, time.perf_counter(), 1,
+                   explain=explain)
+    log._planner.shutdown(wait=True)
+    stats = log.snapshot()["templates"][0]
+    assert stats["slow"] == 2
+    assert explained == [{"entity": "Hilsa"}]
+    assert stats["plans"][0]["params"] == {"entity": "Hilsa"}
@@ -0,0 +1,56 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import fishing_chatbot
+from fishing_chatbot import ResponseGenerator, Template, process_conversation
+
+CONVERSATION = ["hi", "tell me about hilsa", "yes", "where can i find catfish", "kurigram",
+                "murky water", "compare hilsa and catfish", "what can i catch this month", "bye"]
+
+# Replays CONVERSATION in a fresh interpreter, printing one reply per line
+REPLAY = f"""
+import sys
+sys.path.insert(0, {os.path.dirname(os.path.abspath(__file__))!r})
+import conftest, fishing_chatbot
+fishing_chatbot.SnapshotStore.load_file()
+fishing_chatbot.REPLY_SEED = "fixed"
+for message in {CONVERSATION!r}:
+    print(repr(fishing_chatbot.process_conversation(message, "replay")))
+"""
+
+
+def test_template_renders_fields():
+    template = Template("{fish} is best caught during {season}.")
+    assert template.render({"fish": "Hilsa", "season": "Monsoon"}) == "Hilsa is best caught during Monsoon."
+    assert template.render({"fish": "Hilsa"}) == "Hilsa is best caught during {season}."
+    assert Template("No fields").render({}) == "No fields"
+    with pytest.raises(ValueError):
+        Template("{fish!r}")
+
+
+def test_every_compiled_template_matches_str_format():
+    for kind, templates in ResponseGenerator.COMPILED.items():
+        for template in templates:
+            values = {name: f"<{name}>" for _, name in template.fields}
+            assert template.render(values) == template.source.format(**values), kind
+
+
+def test_same_seed_same_replies(monkeypatch):
+    monkeypatch.setattr(fishing_chatbot, "REPLY_SEED", "fixed")
+    first = [process_conversation(message, "first") for message in CONVERSATION]
+    second = [process_conversation(message, "second") for message in CONVERSATION]
+    assert first == second
+
+
+def test_same_seed_same_replies_across_processes():
+    # Worker processes hash strings differently, so nothing in a reply may follow set order
+    replies = []
+    for hash_seed in ("1", "2", "3"):
+        env = dict(os.environ, PYTHONHASHSEED=hash_seed)
+        result = subprocess.run([sys.executable, "-c", REPLAY], env=env, capture_output=True, text=True, check=True)
+        replies.append(result.stdout.splitlines())
+    assert len(replies[0]) == len(CONVERSATION)
+    assert replies[0] == replies[1] == replies[2]
@@ -0,0 +1,43 @@
+from fishing_chatbot import (
+    GraphSnapshot, RetrievalIndex, SessionStore, SnapshotStore, process_conversation,
+)
+
+
+def retrieval():
+    return SnapshotStore.index("retrieval")
+
+
+def test_names_typos_and_aliases_match():
+    assert retrieval().best_match("why is fish scarcity happening") == "Fish Scarcity"
+    assert retrieval().best_match("tell me about kurigam") == "Kurigram"
+    assert retrieval().best_match("the boat owners share") == "Boat Owner"
+
+
+def test_small_graph_keeps_common_features():
+    # "pollution" is on two of the fixture's nodes; a fractional cap would drop it
+    assert retrieval().search("pollution problems")[0][0] == "Pollution"
+
+
+def test_large_graph_prunes_common_features():
+    nodes = [{"id": i, "name": f"Fish {i}", "labels": ["Fish"]} for i in range(3000)]
+    nodes.append({"id": 3000, "name": "Pollution", "labels": ["Cause"]})
+    index = RetrievalIndex.build(GraphSnapshot(nodes, []))
+    assert index.search("fish pollution", k=1)[0][0] == "Pollution"
+
+
+def test_loose_overlap_is_not_a_topic():
+    assert retrieval().search("what about the wind")[0][0] == "Winter"
+    assert retrieval().best_match("what about the wind") is None
+
+
+def test_unmatched_question_resolves_by_retrieval():
+    reply = process_conversation("why is fish scarcity happening", "scarcity")
+    assert "What Causes Fish Scarcity?" in reply
+    assert SessionStore.load("scarcity").current_topic == "Fish Scarcity"
+
+
+def test_follow_up_keeps_the_current_topic():
+    process_conversation("tell me about hilsa", "follow-up")
+    reply = process_conversation("what about the wind", "follow-up")
+    assert "Winter" not in reply
+    assert SessionStore.load("follow-up").current_topic.lower() == "hilsa"
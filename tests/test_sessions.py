@@ -0,0 +1,96 @@
+import json
+import pickle
+import time
+
+import fishing_chatbot
+from fishing_chatbot import ConversationMemory, SessionStore, SessionTokens, process_conversation
+
+
+class DictRedis:
+    """The two calls SessionStore makes on a Redis client"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+
+class Exploit:
+    ran = False
+
+    def __reduce__(self):
+        return setattr, (Exploit, "ran", True)
+
+
+def test_tokens_are_signed():
+    token = SessionTokens.issue()
+    session_id = SessionTokens.verify(token)
+    assert session_id and token.startswith(session_id)
+    assert SessionTokens.verify(f"{session_id}.forged") is None
+    assert SessionTokens.verify(None) is None
+
+
+def test_memory_state_round_trips_through_json():
+    process_conversation("tell me about hilsa", "round-trip")
+    process_conversation("where can i find catfish", "round-trip")
+    memory = SessionStore.load("round-trip")
+    restored = ConversationMemory.from_state(json.loads(json.dumps(memory.to_state())))
+    assert restored.messages == memory.messages
+    assert restored.current_topic == memory.current_topic
+    assert restored.discussed() == memory.discussed()
+    assert (restored.stage, restored.last_intent, restored.turn_count) == (
+        memory.stage, memory.last_intent, memory.turn_count)
+
+
+def test_shared_tier_stores_json_and_never_unpickles(monkeypatch):
+    redis = DictRedis()
+    monkeypatch.setattr(SessionStore, "shard", staticmethod(lambda session_id: redis))
+    process_conversation("tell me about hilsa", "shared")
+    stored = json.loads(redis.data["session:shared"])
+    assert isinstance(stored, list)
+    
+    fishing_chatbot.sessions.clear()
+    assert SessionStore.load("shared").current_topic.lower() == "hilsa"
+    
+    redis.data["session:planted"] = pickle.dumps(Exploit())
+    assert SessionStore.load("planted").turn_count == 0
+    assert not Exploit.ran
+
+
+def test_local_sessions_are_bounded(monkeypatch):
+    monkeypatch.setattr(fishing_chatbot, "SESSION_LOCAL_MAX", 3)
+    for n in range(5):
+        SessionStore.load(f"s{n}")
+    assert list(fishing_chatbot.sessions) == ["s2", "s3", "s4"]
+    SessionStore.load("s2")  # Used again, so s3 is now the oldest
+    SessionStore.load("s5")
+    assert list(fishing_chatbot.sessions) == ["s4", "s2", "s5"]
+
+
+def test_idle_local_sessions_expire():
+    memory = SessionStore.load("idle")
+    memory.current_topic = "Hilsa"
+    fishing_chatbot.sessions["idle"] = (time.time() - fishing_chatbot.SESSION_TTL - 1, memory)
+    SessionStore.load("active")
+    assert "idle" not in fishing_chatbot.sessions
+    assert SessionStore.load("idle").current_topic is None
+
+
+def test_tokenless_clients_cannot_grow_sessions(client, monkeypatch):
+    monkeypatch.setattr(fishing_chatbot, "SESSION_LOCAL_MAX", 5)
+    for _ in range(12):
+        client.cookies.clear()
+        assert client.post("/chat", json={"message": "hi"}).status_code == 200
+    assert len(fishing_chatbot.sessions) == 5
+
+
+def test_session_token_keeps_the_conversation(client):
+    token = client.post("/chat", json={"message": "tell me about hilsa"}).json()["session"]
+    client.cookies.clear()
+    reply = client.post("/chat", json={"message": "yes"}, headers={fishing_chatbot.SESSION_HEADER: token})
+    assert reply.json()["session"] == token
+    assert SessionStore.load(SessionTokens.verify(token)).turn_count == 2
@@ -0,0 +1,102 @@
+import gzip
+import os
+
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.testclient import TestClient
+
+import build_assets
+import fishing_chatbot
+from fishing_chatbot import CachedStaticFiles
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+@pytest.fixture(scope="module")
+def dist(tmp_path_factory):
+    out = str(tmp_path_factory.mktemp("dist"))
+    manifest = build_assets.build(fishing_chatbot.STATIC_DIR, out)
+    # Stand-in brotli variant, so variant selection is testable without the brotli package
+    script = manifest["js/script.js"]
+    with open(os.path.join(out, script + ".br"), "wb") as f:
+        f.write(b"brotli bytes")
+    return out, manifest
+
+
+@pytest.fixture
+def static(dist):
+    out, manifest = dist
+    app = Starlette(routes=[Mount("/", CachedStaticFiles(directory=out, html=True))])
+    return TestClient(app), manifest
+
+
+def test_build_fingerprints_and_rewrites_html(dist):
+    out, manifest = dist
+    assert manifest["js/script.js"].startswith("js/script.") and manifest["js/script.js"].endswith(".js")
+    with open(os.path.join(out, "index.html"), encoding="utf-8") as f:
+        html = f.read()
+    assert f'src="{manifest["js/script.js"]}"' in html and 'href="css/styles.css"' not in html
+    assert os.path.isfile(os.path.join(out, manifest["css/styles.css"] + ".gz"))
+
+
+def test_fingerprinted_names_are_immutable(static):
+    client, manifest = static
+    assert client.get("/" + manifest["css/styles.css"]).headers["cache-control"] == IMMUTABLE
+    original = client.get("/css/styles.css").headers["cache-control"]
+    assert original == f"public, max-age={fishing_chatbot.STATIC_MAX_AGE}"
+
+
+def test_html_is_revalidated(static):
+    client, _ = static
+    response = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["cache-control"] == "no-cache"
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-type"].startswith("text/html")
+
+
+def fetch(client, path, accept):
+    """Headers and the body as sent, before the client decodes it"""
+    with client.stream("GET", path, headers={"Accept-Encoding": accept}) as response:
+        return response.headers, b"".join(response.iter_raw())
+
+
+def test_precompressed_variant_follows_accept_encoding(static):
+    client, manifest = static
+    path = "/" + manifest["js/script.js"]
+    with open(os.path.join(fishing_chatbot.STATIC_DIR, "js", "script.js"), "rb") as f:
+        source = f.read()
+
+    headers, body = fetch(client, path, "gzip, br")
+    assert headers["content-encoding"] == "br" and body == b"brotli bytes"
+    assert headers["vary"] == "Accept-Encoding"
+
+    # A refused coding is never served, even though its name appears in the header
+    headers, body = fetch(client, path, "br;q=0, gzip")
+    assert headers["content-encoding"] == "gzip" and gzip.decompress(body) == source
+
+    headers, body = fetch(client, path, "identity")
+    assert "content-encoding" not in headers and body == source
+
+
+def test_precompressed_variant_answers_304(static):
+    client, manifest = static
+    path = "/" + manifest["js/script.js"]
+    etag = client.get(path, headers={"Accept-Encoding": "gzip"}).headers["etag"]
+    response = client.get(path, headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["cache-control"] == IMMUTABLE
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, br", ["br", "gzip"]),
+    ("br;q=0, gzip", ["gzip"]),
+    ("gzip;q=1.0, br;q=0.5", ["gzip", "br"]),
+    ("*;q=0, GZIP", ["gzip"]),
+    ("*", ["br", "gzip"]),
+    ("br;q=oops", []),
+    ("identity", []),
+    ("", []),
+])
+def test_accept_encoding_is_read_with_q_values(header, expected):
+    assert fishing_chatbot.accepted_encodings(header, ("br", "gzip")) == expected
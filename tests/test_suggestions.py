@@ -0,0 +1,18 @@
+from fishing_chatbot import KnowledgeGraph, SnapshotStore
+
+
+def test_ranked_suggestions_skip_discussed_topics():
+    assert KnowledgeGraph.get_suggestions("Hilsa", set()) == ["Freshwater", "Saltwater", "Monsoon"]
+    assert KnowledgeGraph.get_suggestions("Hilsa", {"monsoon"}) == ["Freshwater", "Saltwater", "Boisakh"]
+
+
+def test_ranking_is_a_slice_of_the_index():
+    index = SnapshotStore.index("suggestions")
+    ranked = index.suggest("hilsa")
+    assert ranked[:3] == ["Freshwater", "Saltwater", "Monsoon"]
+    assert "Hilsa" not in ranked
+    assert index.suggest("Kraken") is None
+
+
+def test_unknown_entity_has_no_suggestions():
+    assert KnowledgeGraph.get_suggestions("Kraken", set()) == []
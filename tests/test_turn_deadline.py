@@ -0,0 +1,41 @@
+import asyncio
+import time
+from concurrent.futures import Future
+
+import pytest
+
+import fishing_chatbot
+from fishing_chatbot import ConversationMemory, ConversationalResponseBuilder, TurnDeadline, turn_deadline
+
+
+def test_wait_gives_up_once_the_deadline_passes():
+    async def scenario():
+        deadline = TurnDeadline(0.05)
+        assert await deadline.wait(asyncio.sleep(0, result="fast")) == "fast"
+        with pytest.raises(asyncio.TimeoutError):
+            await deadline.wait(asyncio.sleep(1))
+        return deadline.remaining()
+
+    assert asyncio.run(scenario()) == 0.0
+
+
+def test_late_suggestions_are_left_out():
+    pending = Future()  # Never completes
+    token = turn_deadline.set(TurnDeadline(0.01))
+    try:
+        reply = ConversationalResponseBuilder._add_suggestions("Hilsa runs in Monsoon.", pending, ConversationMemory())
+    finally:
+        turn_deadline.reset(token)
+    assert reply == "Hilsa runs in Monsoon."
+
+
+def test_chat_answers_504_when_the_turn_runs_out_of_time(client, monkeypatch):
+    def slow(message, session_id, lang="en", memory=None):
+        time.sleep(0.5)
+        return "too late"
+
+    monkeypatch.setattr(fishing_chatbot, "process_conversation", slow)
+    monkeypatch.setattr(fishing_chatbot, "TurnDeadline", lambda: TurnDeadline(0.05))
+    response = client.post("/chat", json={"message": "when to catch hilsa"})
+    assert response.status_code == 504
+    assert response.headers["retry-after"] == "5"
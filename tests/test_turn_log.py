@@ -0,0 +1,73 @@
+import glob
+import gzip
+import json
+import os
+
+from fishing_chatbot import TurnLogger
+
+
+def read_jsonl(data: bytes):
+    return [json.loads(line) for line in data.decode("utf-8").splitlines()]
+
+
+def test_records_are_written_in_batches(tmp_path):
+    logger = TurnLogger(str(tmp_path / "turns.jsonl"), batch_size=4, flush_seconds=0.05)
+    batches = []
+    write = logger._write
+    logger._write = lambda batch: (batches.append(len(batch)), write(batch))
+    for n in range(10):
+        logger._queue.put({"n": n})  # Queued before the writer starts, so it drains full batches
+    logger.start()
+    logger.stop()
+    assert batches == [4, 4, 2]
+    with open(tmp_path / "turns.jsonl", "rb") as f:
+        assert [record["n"] for record in read_jsonl(f.read())] == list(range(10))
+
+
+def test_log_starts_the_writer_and_stop_flushes(tmp_path):
+    logger = TurnLogger(str(tmp_path / "logs" / "turns.jsonl"), flush_seconds=0.05)
+    logger.log({"reply": "হিলসা", "at": tmp_path})
+    logger.stop()
+    with open(tmp_path / "logs" / "turns.jsonl", "rb") as f:
+        assert read_jsonl(f.read()) == [{"reply": "হিলসা", "at": str(tmp_path)}]
+
+
+def test_size_rotation_gzips_the_full_file(tmp_path):
+    path = str(tmp_path / "turns.jsonl")
+    logger = TurnLogger(path, max_bytes=1, rotate_seconds=3600, compress=True)
+    for n in range(3):
+        logger._write([{"n": n}])
+    rotated = sorted(glob.glob(str(tmp_path / "turns-*.jsonl.gz")))
+    assert len(rotated) == 2  # Distinct names, though rotated within the same second
+    assert not glob.glob(str(tmp_path / "turns-*.jsonl"))
+    archived = []
+    for name in rotated:
+        with gzip.open(name) as f:
+            archived += read_jsonl(f.read())
+    assert sorted(record["n"] for record in archived) == [0, 1]
+    with open(path, "rb") as f:
+        assert read_jsonl(f.read()) == [{"n": 2}]
+
+
+def test_time_rotation_keeps_plain_files_without_compress(tmp_path):
+    path = str(tmp_path / "turns.jsonl")
+    logger = TurnLogger(path, max_bytes=10 ** 9, rotate_seconds=60, compress=False)
+    logger._write([{"n": 0}])
+    logger._write([{"n": 1}])
+    assert not glob.glob(str(tmp_path / "turns-*"))  # Young and small: still one file
+    logger._opened_at -= 61
+    logger._write([{"n": 2}])
+    rotated = glob.glob(str(tmp_path / "turns-*.jsonl"))
+    assert len(rotated) == 1
+    with open(rotated[0], "rb") as f:
+        assert read_jsonl(f.read()) == [{"n": 0}, {"n": 1}]
+    assert os.path.getsize(path) > 0
+
+
+def test_records_are_dropped_when_the_queue_is_full(tmp_path):
+    logger = TurnLogger(str(tmp_path / "turns.jsonl"), queue_size=2)
+    logger.start = lambda: None  # A writer that has fallen behind
+    for n in range(5):
+        logger.log({"n": n})
+    assert logger.dropped == 3
+    assert logger._queue.qsize() == 2